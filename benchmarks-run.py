@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import os
+import sys
+import unittest
+
+if __name__ == "__main__":
+    start_dir = os.path.dirname(__file__)
+    pattern = sys.argv[1] if len(sys.argv) > 1 else 'bench*.py'
+    print("Loader discover start_dir: '%s', pattern: '%s'"
+          % (start_dir, pattern))
+    loader = unittest.TestLoader()
+    cases = loader.discover(start_dir=start_dir, pattern=pattern)
+    tests = unittest.TestSuite()
+    tests.addTests(cases)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(tests)
@@ -61,6 +61,7 @@ import numpy
 from .. import tools
 from ..cores.converter import Converter, clog
 from ..cores.digger import Digger, dlog
+from .gtc import stage_rr
 
 _all_Converters = ['Data1dConverter']
 _all_Diggers = ['Data1dFluxDigger', 'Data1dFieldDigger',
@@ -174,6 +175,67 @@ class Data1dConverter(Converter):
         return sd
 
 
+def _stage_data1d_axes(pckloader, key, tstepkey, ndiagkey):
+    '''Digger stage, data of *key*, time X, mpsi Y and time step.'''
+    data, tstep, ndiag = pckloader.get_many(key, tstepkey, ndiagkey)
+    y, x = data.shape
+    dt = tstep * ndiag
+    X, Y = numpy.arange(1, x + 1) * dt, numpy.arange(0, y)
+    X = numpy.around(X, 8)
+    return data, X, Y, dt
+
+
+def _stage_data1d_cutoff(pckloader, keys, tcutoff, pcutoff, use_ra):
+    '''
+    Digger stage, cutoff data of *keys*, shared by data1d diggers.
+    Return results without title, and accepted kwargs items.
+    '''
+    data, X, Y, dt = pckloader.get_derived(
+        'data1d-axes', _stage_data1d_axes, *keys)
+    y, x = data.shape
+    acckwargs = {'tcutoff': [X[0], X[-1]], 'pcutoff': [Y[0], Y[-1]],
+                 'use_ra': False}
+    x0, x1 = 0, X.size
+    if tcutoff is not None:
+        t0, t1 = tcutoff
+        index = numpy.where((X >= t0) & (X < t1 + dt))[0]
+        if index.size > 0:
+            x0, x1 = index[0], index[-1]+1
+            acckwargs['tcutoff'] = [X[x0], X[x1-1]]
+            X = X[x0:x1]
+        else:
+            dlog.warning('Cannot cutoff: %s <= time <= %s!' % (t0, t1))
+    y0, y1 = 0, Y.size
+    if pcutoff is not None:
+        p0, p1 = pcutoff
+        index = numpy.where((Y >= p0) & (Y < p1+1))[0]
+        if index.size > 0:
+            y0, y1 = index[0], index[-1]+1
+            acckwargs['pcutoff'] = [Y[y0], Y[y1-1]]
+            Y = Y[y0:y1]
+        else:
+            dlog.warning('Cannot cutoff: %s <= ipsi <= %s!' % (p0, p1))
+    ylabel = r'$\psi$(mpsi)'
+    # use_ra, arr2 [1,mpsi-1], so y0>=1, y1<=mpsi
+    if use_ra:
+        try:
+            rr = pckloader.get_derived(
+                'gtc-rr', stage_rr, 'gtc/arr2', 'gtc/a_minor')
+            if y0 < 1:
+                y0 = 1
+            if y1 > y - 1:
+                y1 = y - 1
+            Y = rr[y0-1:y1-1]
+        except Exception:
+            dlog.warning("Cannot use r/a!", exc_info=1)
+        else:
+            ylabel = r'$r/a$'
+            acckwargs['use_ra'] = True
+    # update
+    data = data[y0:y1, x0:x1]
+    return dict(X=X, Y=Y, Z=data, ylabel=ylabel), tuple(acckwargs.items())
+
+
 class _Data1dDigger(Digger):
     '''
     :meth:`_dig` for Data1dFluxDigger, Data1dFieldDigger
@@ -193,13 +255,10 @@ class _Data1dDigger(Digger):
         *use_ra*: bool
             use psi or r/a, default False
         '''
-        data, tstep, ndiag = self.pckloader.get_many(
-            self.srckeys[0], *self.extrakeys)
-        y, x = data.shape
-        dt = tstep * ndiag
-        X, Y = numpy.arange(1, x + 1) * dt, numpy.arange(0, y)
-        X = numpy.around(X, 8)
+        keys = (self.srckeys[0], *self.extrakeys)
         if self.kwoptions is None:
+            _, X, Y, dt = self.stage(
+                'data1d-axes', _stage_data1d_axes, *keys)
             self.kwoptions = dict(
                 tcutoff=dict(widget='FloatRangeSlider',
                              rangee=[X[0], X[-1], dt],
@@ -212,48 +271,17 @@ class _Data1dDigger(Digger):
                 use_ra=dict(widget='Checkbox',
                             value=False,
                             description='Y: r/a'))
-        acckwargs = {'tcutoff': [X[0], X[-1]], 'pcutoff': [Y[0], Y[-1]],
-                     'use_ra': False}
-        x0, x1 = 0, X.size
-        if 'tcutoff' in kwargs:
-            t0, t1 = kwargs['tcutoff']
-            index = numpy.where((X >= t0) & (X < t1 + dt))[0]
-            if index.size > 0:
-                x0, x1 = index[0], index[-1]+1
-                acckwargs['tcutoff'] = [X[x0], X[x1-1]]
-                X = X[x0:x1]
-            else:
-                dlog.warning('Cannot cutoff: %s <= time <= %s!' % (t0, t1))
-        y0, y1 = 0, Y.size
-        if 'pcutoff' in kwargs:
-            p0, p1 = kwargs['pcutoff']
-            index = numpy.where((Y >= p0) & (Y < p1+1))[0]
-            if index.size > 0:
-                y0, y1 = index[0], index[-1]+1
-                acckwargs['pcutoff'] = [Y[y0], Y[y1-1]]
-                Y = Y[y0:y1]
-            else:
-                dlog.warning('Cannot cutoff: %s <= ipsi <= %s!' % (p0, p1))
-        ylabel = r'$\psi$(mpsi)'
-        # use_ra, arr2 [1,mpsi-1], so y0>=1, y1<=mpsi
-        if kwargs.get('use_ra', False):
-            try:
-                arr2, a = self.pckloader.get_many('gtc/arr2', 'gtc/a_minor')
-                rr = arr2[:, 1] / a  # index [0, mpsi-2]
-                if y0 < 1:
-                    y0 = 1
-                if y1 > y - 1:
-                    y1 = y - 1
-                Y = rr[y0-1:y1-1]
-            except Exception:
-                dlog.warning("Cannot use r/a!", exc_info=1)
-            else:
-                ylabel = r'$r/a$'
-                acckwargs['use_ra'] = True
-        # update
-        data = data[y0:y1, x0:x1]
-        return dict(X=X, Y=Y, Z=data, ylabel=ylabel,
-                    title=self._get_title()), acckwargs
+        tcutoff, pcutoff = kwargs.get('tcutoff'), kwargs.get('pcutoff')
+        results, acckwargs = self.stage(
+            'data1d-cutoff', _stage_data1d_cutoff, keys,
+            None if tcutoff is None else tuple(tcutoff),
+            None if pcutoff is None else tuple(pcutoff),
+            bool(kwargs.get('use_ra', False)))
+        # copy shared stage results
+        results = dict(results, title=self._get_title())
+        acckwargs = {k: list(v) if isinstance(v, list) else v
+                     for k, v in acckwargs}
+        return results, acckwargs
 
     def _post_dig(self, results):
         results.update(xlabel=r'time($R_0/c_s$)')
@@ -321,6 +349,19 @@ class _Data1dMeanDigger(_Data1dDigger):
     '''
     __slots__ = []
     post_template = 'tmpl_z111p'
+    refine_kwargs = ['mean_iflux', 'mean_z_abs', 'mean_smooth',
+                     'mean_z_weight_order']
+
+    def _compute_peak(self, kwargs):
+        '''Return argmax of Z, and masked Y, Z near peak of all time steps.'''
+        results, acckwargs = super(_Data1dMeanDigger, self)._dig(kwargs)
+        Y, Z = results['Y'], results['Z']
+        peak_limit = kwargs.get('mean_peak_limit', 1.0/numpy.e)
+        peak_greedy = bool(kwargs.get('mean_peak_greedy', False))
+        nY, ntZ = tools.near_peak(
+            Z, X=Y, intersection=True, lowerlimit=peak_limit,
+            select='one', greedy=peak_greedy, axis=0)
+        return Z.argmax(axis=0), nY, ntZ
 
     def _dig(self, kwargs):
         '''*mean_select*: str 'iflux' or 'peak'
@@ -375,26 +416,28 @@ class _Data1dMeanDigger(_Data1dDigger):
             downY = numpy.linspace(Y[i0], Y[i0], len(X))
             midY, maxY = None, None
         else:
-            maxZ = Z.max(axis=0)
-            maxidx = Z.argmax(axis=0)
-            meanZ, upY, downY, midY = [], [], [], []
+            # all time steps at once, masked out of peak
+            maxidx, nY, ntZ = self.compute(self._compute_peak, kwargs)
             maxY = Y[maxidx]
-            for t in range(len(X)):
-                tZ = Z[:, t]
-                nY, ntZ = tools.near_peak(
-                    tZ, X=Y, intersection=True, lowerlimit=peak_limit,
-                    select='one', greedy=peak_greedy)
-                if z_abs:
-                    ntZ = numpy.abs(ntZ)
-                    weight = numpy.gradient(nY) * ntZ**weight_order
-                else:
-                    weight = numpy.gradient(nY) * numpy.abs(ntZ)**weight_order
-                upY.append(nY[-1])
-                downY.append(nY[0])
-                midY.append(numpy.average(nY, weights=weight))
-                meanZ.append(numpy.average(ntZ, weights=weight))
-            upY, downY = numpy.array(upY), numpy.array(downY)
-            midY, meanZ = numpy.array(midY), numpy.array(meanZ)
+            if z_abs:
+                ntZ = numpy.abs(ntZ)
+            # numpy.gradient(nY) of each masked column
+            dnY = numpy.ma.diff(nY, axis=0)
+            forward = numpy.ma.masked_all(nY.shape)
+            forward[:-1] = dnY
+            backward = numpy.ma.masked_all(nY.shape)
+            backward[1:] = dnY
+            dnY = numpy.ma.array([forward, backward]).mean(axis=0)
+            weight = (dnY * numpy.abs(ntZ)**weight_order).filled(0)
+            valid = ~numpy.ma.getmaskarray(nY)
+            first = valid.argmax(axis=0)
+            last = valid.shape[0] - 1 - valid[::-1].argmax(axis=0)
+            cols = numpy.arange(len(X))
+            upY, downY = nY.data[last, cols], nY.data[first, cols]
+            midY = numpy.ma.average(nY, axis=0, weights=weight).filled(
+                numpy.nan)
+            meanZ = numpy.ma.average(ntZ, axis=0, weights=weight).filled(
+                numpy.nan)
             if smooth:
                 upY = tools.savgolay_filter(numpy.array(upY), info='up')
                 downY = tools.savgolay_filter(numpy.array(downY), info='down')
@@ -493,17 +536,12 @@ class _Data1dFFTDigger(_Data1dDigger):
     '''
     __slots__ = []
     post_template = 'tmpl_z111p'
+    refine_kwargs = ['fft_ymaxlimit', 'fft_autoxlimit']
 
-    def _dig(self, kwargs):
-        '''*fft_tselect*: [t0,t1], t0 float
-            X[x0:x1], data[:,x0:x1] where t0<=X[x0:x1]<=t1
-        *fft_pselect*: [p0,p1], p0 int
-            Y[y0:y1], data[y0:y1,:] where p0<=Y[y0:y1]<=p1
-        *fft_ymaxlimit*: float, default 0
-            if (ymax of power line) < fft_ymaxlimit * (ymax of power lines),
-            then remove it.
-        *fft_autoxlimit*: bool
-            auto set short xlimt for FFT results or not, default True
+    def _compute_fft(self, kwargs):
+        '''
+        Return selected data box, FFT results, and accepted fft_tselect,
+        fft_pselect.
         '''
         results, acckwargs = super(_Data1dFFTDigger, self)._dig(kwargs)
         X, Y, Z = results['X'], results['Y'], results['Z']
@@ -512,30 +550,7 @@ class _Data1dFFTDigger(_Data1dDigger):
         use_ra = acckwargs['use_ra']
         fft_tselect = kwargs.get('fft_tselect', tcutoff)
         fft_pselect = kwargs.get('fft_pselect', pcutoff)
-        fft_ymaxlimit = kwargs.get('fft_ymaxlimit', 0.0)
-        fft_autoxlimit = kwargs.get('fft_autoxlimit', True)
-        if 'fft_tselect' not in self.kwoptions:
-            self.kwoptions.update(dict(
-                fft_tselect=dict(
-                    widget='FloatRangeSlider',
-                    rangee=self.kwoptions['tcutoff']['rangee'].copy(),
-                    value=self.kwoptions['tcutoff']['value'].copy(),
-                    description='FFT time select:'),
-                fft_pselect=dict(
-                    widget='IntRangeSlider',
-                    rangee=self.kwoptions['pcutoff']['rangee'].copy(),
-                    value=self.kwoptions['pcutoff']['value'].copy(),
-                    description='FFT mpsi select:'),
-                fft_ymaxlimit=dict(
-                    widget='FloatSlider',
-                    rangee=(0, 1, 0.05),
-                    value=0.0,
-                    description='FFT ymaxlimit:'),
-                fft_autoxlimit=dict(
-                    widget='Checkbox',
-                    value=True,
-                    description='FFT xlimit: auto'),
-            ))
+        acckwargs = {}
         # fft_tselect
         it0, it1, dt = 0, X.size, X[1] - X[0]
         acckwargs['fft_tselect'] = tcutoff
@@ -581,6 +596,48 @@ class _Data1dFFTDigger(_Data1dDigger):
             select_X = X[[it0, it1-1, it1-1, it0, it0]]
             select_Y = Y[[ip0, ip0, ip1-1, ip1-1, ip0]]
         tf, yf, af, pf = tools.fft2(dt, dy, select_Z)
+        return (select_X, select_Y, tf, yf, pf), acckwargs
+
+    def _dig(self, kwargs):
+        '''*fft_tselect*: [t0,t1], t0 float
+            X[x0:x1], data[:,x0:x1] where t0<=X[x0:x1]<=t1
+        *fft_pselect*: [p0,p1], p0 int
+            Y[y0:y1], data[y0:y1,:] where p0<=Y[y0:y1]<=p1
+        *fft_ymaxlimit*: float, default 0
+            if (ymax of power line) < fft_ymaxlimit * (ymax of power lines),
+            then remove it.
+        *fft_autoxlimit*: bool
+            auto set short xlimt for FFT results or not, default True
+        '''
+        results, acckwargs = super(_Data1dFFTDigger, self)._dig(kwargs)
+        use_ra = acckwargs['use_ra']
+        fft_ymaxlimit = kwargs.get('fft_ymaxlimit', 0.0)
+        fft_autoxlimit = kwargs.get('fft_autoxlimit', True)
+        if 'fft_tselect' not in self.kwoptions:
+            self.kwoptions.update(dict(
+                fft_tselect=dict(
+                    widget='FloatRangeSlider',
+                    rangee=self.kwoptions['tcutoff']['rangee'].copy(),
+                    value=self.kwoptions['tcutoff']['value'].copy(),
+                    description='FFT time select:'),
+                fft_pselect=dict(
+                    widget='IntRangeSlider',
+                    rangee=self.kwoptions['pcutoff']['rangee'].copy(),
+                    value=self.kwoptions['pcutoff']['value'].copy(),
+                    description='FFT mpsi select:'),
+                fft_ymaxlimit=dict(
+                    widget='FloatSlider',
+                    rangee=(0, 1, 0.05),
+                    value=0.0,
+                    description='FFT ymaxlimit:'),
+                fft_autoxlimit=dict(
+                    widget='Checkbox',
+                    value=True,
+                    description='FFT xlimit: auto'),
+            ))
+        computed, fftacckwargs = self.compute(self._compute_fft, kwargs)
+        select_X, select_Y, tf, yf, pf = computed
+        acckwargs.update(fftacckwargs)
         # fft_ymaxlimit
         pf_tmax = pf.max(axis=0)
         pf_ymax = pf.max(axis=1)
@@ -17,6 +17,15 @@ _all_Diggers = []
 __all__ = _all_Converters + _all_Diggers
 
 
+def stage_rr(pckloader, arr2key, akey):
+    '''
+    Digger stage, r/a of radial grid, index [0, mpsi-2] for ipsi [1,mpsi-1].
+    Use it like ``self.stage('gtc-rr', stage_rr, 'gtc/arr2', 'gtc/a_minor')``.
+    '''
+    arr2, a = pckloader.get_many(arr2key, akey)
+    return arr2[:, 1] / a
+
+
 class GtcConverter(Converter):
     '''
     Parameters in gtc.out
@@ -159,6 +159,28 @@ class HistoryConverter(Converter):
         return sd
 
 
+def _stage_history_time(pckloader, keys, tcutoff):
+    '''
+    Digger stage, cutoff time of history, shared by history diggers.
+    Return time, x0, x1, time step and accepted tcutoff.
+    '''
+    ndstep, tstep, ndiag = pckloader.get_many(*keys)
+    dt = tstep * ndiag
+    time = np.around(np.arange(1, ndstep + 1) * dt, 8)
+    acctcutoff = (time[0], time[-1])
+    x0, x1 = 0, time.size
+    if tcutoff is not None:
+        t0, t1 = tcutoff
+        index = np.where((time >= t0) & (time < t1 + dt))[0]
+        if index.size > 0:
+            x0, x1 = index[0], index[-1]+1
+            acctcutoff = (time[x0], time[x1-1])
+            time = time[x0:x1]
+        else:
+            dlog.warning('Cannot cutoff: %s <= time <= %s!' % (t0, t1))
+    return time, x0, x1, dt, acctcutoff
+
+
 class _TimeCutoff(Digger):
     '''
     :meth:`_dig` for HistoryParticleDigger, HistoryFieldDigger, HistoryFieldModeDigger
@@ -173,27 +195,20 @@ class _TimeCutoff(Digger):
         *tcutoff*: [t0,t1], t0 float
             t0<=time[x0:x1]<=t1
         '''
-        ndstep, tstep, ndiag = self.pckloader.get_many(*self.extrakeys[:3])
-        dt = tstep * ndiag
-        time = np.around(np.arange(1, ndstep + 1) * dt, 8)
+        keys = tuple(self.extrakeys[:3])
         if self.kwoptions is None:
+            time, _, _, dt, _ = self.stage(
+                'history-time', _stage_history_time, keys, None)
             self.kwoptions = dict(
                 tcutoff=dict(widget='FloatRangeSlider',
                              rangee=[time[0], time[-1], dt],
                              value=[time[0], time[-1]],
                              description='time cutoff:'))
-        acckwargs = {'tcutoff': [time[0], time[-1]]}
-        x0, x1 = 0, time.size
-        if 'tcutoff' in kwargs:
-            t0, t1 = kwargs['tcutoff']
-            index = np.where((time >= t0) & (time < t1 + dt))[0]
-            if index.size > 0:
-                x0, x1 = index[0], index[-1]+1
-                acckwargs['tcutoff'] = [time[x0], time[x1-1]]
-                time = time[x0:x1]
-            else:
-                dlog.warning('Cannot cutoff: %s <= time <= %s!' % (t0, t1))
-        return time, x0, x1, acckwargs
+        tcutoff = kwargs.get('tcutoff')
+        time, x0, x1, _, acctcutoff = self.stage(
+            'history-time', _stage_history_time, keys,
+            None if tcutoff is None else tuple(tcutoff))
+        return time, x0, x1, {'tcutoff': list(acctcutoff)}
 
 
 class HistoryParticleDigger(_TimeCutoff):
@@ -307,6 +322,87 @@ class HistoryFieldDigger(_TimeCutoff):
                     xlabel=r'time($R_0/c_s$)', xlim=[0, np.max(r['time'])])
 
 
+def _history_growth_fit(time, logya, start, end):
+    '''Fit log(amplitude) in growth region, return fitya, growth.'''
+    resparm, fitya = tools.line_fit(
+        time[start:end+1], logya[start:end+1], 1,
+        info='[%s,%s] growth time' % (time[start], time[end]))
+    return fitya, resparm[0][0]
+
+
+def _history_get_omega(y, time, growth, start, end, normy=None):
+    '''
+    Normalize amplitude *y* by growth rate, if *normy* not given,
+    then measure real frequency in growth region.
+    '''
+    if normy is None:
+        normy = tools.savgolay_filter(
+            np.divide(y, np.exp(growth * time)), info='Amp_normalized')
+    index = [i for i in tools.argrelextrema(normy, m='both')
+             if 0.9*start + 0.1 * end <= i < 0.1*start + 0.9 * end]
+    if len(index) >= 2:
+        idx1, idx2, nT = index[0], index[-1], (len(index) - 1) / 2
+        omega = 2 * np.pi * nT / (time[idx2] - time[idx1])
+    else:
+        idx1, idx2, nT, omega = 0, 1, 0, 0
+    return normy, idx1, idx2, nT, omega
+
+
+def _history_field_modes(pckloader, srckeys, x0, x1, dt, ndstep):
+    '''
+    Dig all modes of a field in one pass over the 2D arrays,
+    with default growth time. Return dict of arrays, one row one mode.
+    Digger stage, so figlabels of the same field and time cutoff share it.
+    '''
+    yreal, yimag = pckloader.get_many(*srckeys)
+    yreal, yimag = yreal[:, x0:x1], yimag[:, x0:x1]
+    time = np.around(np.arange(1, ndstep + 1) * dt, 8)[x0:x1]
+    ya = np.sqrt(yreal**2 + yimag**2)
+    nonzero = ya.any(axis=1)
+    # ya all zeros, keep zeros
+    logya = ya.copy()
+    if nonzero.any():
+        with np.errstate(divide='ignore'):
+            logya[nonzero] = tools.savgolay_filter(
+                np.log(ya[nonzero]), info='log(Amp)', axis=-1)
+    modes = []
+    for i in range(ya.shape[0]):
+        if nonzero[i]:
+            start, region_len = tools.findgrowth(logya[i], 1e-4)
+            if region_len == 0:
+                start, region_len = 0, max(ndstep // 4, 2)
+            end = start + region_len - 1
+            fitya, growth = _history_growth_fit(time, logya[i], start, end)
+        else:
+            start, end, fitya, growth = 0, 1, logya[i, :2], 0
+        modes.append(dict(nonzero=nonzero[i], start=start, end=end,
+                          fitya=fitya, growth=growth))
+    # amplitude normalized by growth rate
+    growth = np.array([md['growth'] for md in modes]).reshape(-1, 1)
+    normyreal = tools.savgolay_filter(
+        np.divide(yreal, np.exp(growth * time)), axis=-1,
+        info='Amp_normalized')
+    normyimag = tools.savgolay_filter(
+        np.divide(yimag, np.exp(growth * time)), axis=-1,
+        info='Amp_normalized')
+    for i, md in enumerate(modes):
+        if md['nonzero']:
+            md['omega_real'] = _history_get_omega(
+                yreal[i], time, md['growth'], md['start'], md['end'],
+                normy=normyreal[i])
+            md['omega_imag'] = _history_get_omega(
+                yimag[i], time, md['growth'], md['start'], md['end'],
+                normy=normyimag[i])
+        else:
+            md['omega_real'] = yreal[i], 0, 1, 0, 0
+            md['omega_imag'] = yimag[i], 0, 1, 0, 0
+    # power spectrum
+    _tf, _af, _pf = tools.fft(dt, yreal + 1j*yimag, axis=-1)
+    return dict(yreal=yreal, yimag=yimag, logya=logya, modes=modes,
+                spectrum_x=_tf, spectrum_p=_pf,
+                spectrum_index=np.argmax(_pf, axis=-1))
+
+
 class HistoryFieldModeDigger(_TimeCutoff):
     '''field modes: phi, apara, fluidne, 1-8'''
     __slots__ = ['_idx']
@@ -333,9 +429,8 @@ class HistoryFieldModeDigger(_TimeCutoff):
         _timedata = super(HistoryFieldModeDigger, self)._dig(kwargs)
         time, x0, x1, acckwargs = _timedata
         fstr = field_tex_str[self.section[1]]
-        yreal, yimag, ndstep, tstep, ndiag, nmodes, mmodes, rho0 = \
-            self.pckloader.get_many(*self.srckeys, *self.extrakeys[:-2])
-        yreal, yimag = yreal[self._idx-1, x0:x1], yimag[self._idx-1, x0:x1]
+        ndstep, tstep, ndiag, nmodes, mmodes, rho0 = \
+            self.pckloader.get_many(*self.extrakeys[:-2])
         dt = tstep * ndiag
         n = nmodes[self._idx-1]
         m = mmodes[self._idx-1]
@@ -345,6 +440,13 @@ class HistoryFieldModeDigger(_TimeCutoff):
             dlog.parm("Get k_theta_rho0: %.6f" % ktr)
         except Exception:
             ktr = None
+        # all modes of this field, with default growth time
+        allmodes = self.stage(
+            'history-field-modes', _history_field_modes,
+            tuple(self.srckeys), x0, x1, dt, ndstep)
+        i = self._idx - 1
+        yreal, yimag = allmodes['yreal'][i], allmodes['yimag'][i]
+        mode = allmodes['modes'][i]
         # 1 original
         results = dict(time=time, yreal=yreal, yimag=yimag,
                        n=n, m=m, kthetarho0=ktr,
@@ -353,42 +455,31 @@ class HistoryFieldModeDigger(_TimeCutoff):
         title2 = r'smooth(log(amplitude))'
         if ktr:
             title2 += r', $k_{\theta}\rho_0$=%.6f' % ktr
-        ya = np.sqrt(yreal**2 + yimag**2)
-        if ya.any():
-            logya = tools.savgolay_filter(np.log(ya), info='log(Amp)')
-            start, end = None, None
-            if 'growth_time' in kwargs:
-                start, end = kwargs['growth_time']
-                index = np.where((time >= start) & (time <= end))[0]
-                if index.size > 0:
-                    start, end = index[0], index[-1]
-                    # dlog.debug('growth_time_end(1): %s ' % time[end])
-                else:
-                    dlog.warning('Cannot set growth time: %s <= time <= %s!'
-                                 % (start, end))
-                    start, end = None, None
-            # dlog.debug('growth_time: start=%s ' % start)
-            if start is None:
-                start, region_len = tools.findgrowth(logya, 1e-4)
-                if region_len == 0:
-                    start, region_len = 0, max(ndstep // 4, 2)
-                end = start + region_len - 1
-                # dlog.debug('growth_time_end(2): %s ' % time[end])
+        logya = allmodes['logya'][i]
+        start, end = mode['start'], mode['end']
+        fitya, growth = mode['fitya'], mode['growth']
+        normyreal, reg3, reg4, nT1, omega1 = mode['omega_real']
+        normyimag, reg5, reg6, nT2, omega2 = mode['omega_imag']
+        if mode['nonzero'] and 'growth_time' in kwargs:
+            t0, t1 = kwargs['growth_time']
+            index = np.where((time >= t0) & (time <= t1))[0]
+            if index.size > 0:
+                start, end = index[0], index[-1]
+                fitya, growth = _history_growth_fit(time, logya, start, end)
+                normyreal, reg3, reg4, nT1, omega1 = _history_get_omega(
+                    yreal, time, growth, start, end)
+                normyimag, reg5, reg6, nT2, omega2 = _history_get_omega(
+                    yimag, time, growth, start, end)
+            else:
+                dlog.warning('Cannot set growth time: %s <= time <= %s!'
+                             % (t0, t1))
+        if mode['nonzero']:
             acckwargs['growth_time'] = [time[start], time[end]]
             dlog.parm("Find growth time: [%s,%s], index: [%s,%s]."
                       % (time[start], time[end], start, end))
-            # polyfit growth region
-            resparm, fitya = tools.line_fit(
-                time[start:end+1], logya[start:end+1], 1,
-                info='[%s,%s] growth time' % (time[start], time[end]))
-            growth = resparm[0][0]
             dlog.parm("Get growth rate: %.6f" % growth)
-        else:
-            # ya all zeros
-            logya = ya
-            start, end = 0, 1
-            fitya = logya[:2]
-            growth = 0
+            dlog.parm("Get frequency: %.6f (r), %.6f (i)"
+                      % (omega1, omega2))
         if 'growth_time' not in self.kwoptions:
             fixend = (time.size - 1) if end > time.size - 1 else end
             self.kwoptions['growth_time'] = dict(
@@ -404,15 +495,6 @@ class HistoryFieldModeDigger(_TimeCutoff):
             title2=title2,
         )
         # 3 amplitude normalized by growth rate, real frequency
-        if ya.any():
-            normyreal, reg3, reg4, nT1, omega1 = self.__get_omega(
-                yreal, time, growth, start, end)
-            normyimag, reg5, reg6, nT2, omega2 = self.__get_omega(
-                yimag, time, growth, start, end)
-            dlog.parm("Get frequency: %.6f (r), %.6f (i)" % (omega1, omega2))
-        else:
-            normyreal, reg3, reg4, nT1, omega1 = yreal, 0, 1, 0, 0
-            normyimag, reg5, reg6, nT2, omega2 = yimag, 0, 1, 0, 0
         results.update(
             normyreal=normyreal,
             normyimag=normyimag,
@@ -427,15 +509,12 @@ class HistoryFieldModeDigger(_TimeCutoff):
             title3='smooth normalized amplitude',
         )
         # 4 power spectrum
-        #sgn = np.array([np.complex(r, i) for r, i in zip(normyreal, normyimag)])
-        sgn = np.array([np.complex(r, i) for r, i in zip(yreal, yimag)])
-        _tf, _af, _pf = tools.fft(dt, sgn)
-        index = np.argmax(_pf)
-        omega3 = _tf[index]
+        index = allmodes['spectrum_index'][i]
+        omega3 = allmodes['spectrum_x'][index]
         dlog.parm("Get frequency: %s, %.6f" % (index, omega3))
         results.update(
-            spectrum_x=_tf,
-            spectrum_p=_pf,
+            spectrum_x=allmodes['spectrum_x'],
+            spectrum_p=allmodes['spectrum_p'][i],
             spectrum_omega=omega3,
             spectrum_index=index,
             title4=r'$\phi=e^{-i(\omega*t+m*\theta-n*\zeta)}$',
@@ -443,18 +522,6 @@ class HistoryFieldModeDigger(_TimeCutoff):
         dlog.debug('output kwargs: %s ' % acckwargs)
         return results, acckwargs
 
-    def __get_omega(self, y, time, growth, start, end):
-        normy = tools.savgolay_filter(
-            np.divide(y, np.exp(growth * time)), info='Amp_normalized')
-        index = [i for i in tools.argrelextrema(normy, m='both')
-                 if 0.9*start + 0.1 * end <= i < 0.1*start + 0.9 * end]
-        if len(index) >= 2:
-            idx1, idx2, nT = index[0], index[-1], (len(index) - 1) / 2
-            omega = 2 * np.pi * nT / (time[idx2] - time[idx1])
-        else:
-            idx1, idx2, nT, omega = 0, 1, 0, 0
-        return normy, idx1, idx2, nT, omega
-
     def _post_dig(self, results):
         r = results
         ax1_calc = dict(
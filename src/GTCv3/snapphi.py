@@ -27,6 +27,7 @@ import numpy as np
 from ..cores.converter import Converter, clog
 from ..cores.digger import Digger, dlog
 from .snapshot import _snap_get_timestr, SnapshotFieldmDigger
+from .gtc import stage_rr
 from .. import tools
 
 _all_Converters = ['SnapPhiZetaPsiConverter']
@@ -60,25 +61,28 @@ class SnapPhiZetaPsiConverter(Converter):
 
     def _convert(self):
         '''Read 'phi_dir/phi_zeta_psi_snap%05d_tor%04d.out'.'''
-        phi = []
-        # tor0000.out
-        f = self.files[0]
-        with self.rawloader.get(f) as fid:
-            # parameters
+        # tor0000.out, parameters
+        with self.rawloader.get(self.files[0]) as fid:
             mzeach, mpsi1, nj = (int(fid.readline()) for j in range(3))
-            shape = (mzeach, mpsi1, nj)
             j_list = [int(fid.readline()) for j in range(nj)]
-            # data
-            outdata = np.array([float(n.strip()) for n in fid.readlines()])
-            phi.extend(outdata.reshape(shape, order='F'))
-        # tor0001.out ...
-        for f in self.files[1:]:
-            with self.rawloader.get(f) as fid:
-                outdata = np.array([float(n.strip()) for n in fid.readlines()])
-                phi.extend(outdata.reshape(shape, order='F'))
-        phi = np.array(phi)
+            text0 = fid.read()
         mtoroidal = len(self.files)
-        assert phi.shape == (mzeach*mtoroidal, mpsi1, nj)
+        # j-planes are contiguous, phi[idx] is phi(zeta,psi) of j_list[idx]
+        phi = np.empty((nj, mzeach*mtoroidal, mpsi1))
+
+        def fill(idx, text):
+            outdata = np.fromstring(text, dtype=np.float64, sep=' ')
+            phi[:, idx*mzeach:(idx+1)*mzeach, :] = outdata.reshape(
+                (mzeach, mpsi1, nj), order='F').transpose(2, 0, 1)
+
+        def read_fill(idx):
+            with self.rawloader.get(self.files[idx]) as fid:
+                fill(idx, fid.read())
+
+        fill(0, text0)
+        del text0
+        # tor0001.out ...
+        self._map_files(read_fill, range(1, mtoroidal))
         # 1. parameters
         clog.debug("Filling datakeys: %s ..." % str(self._datakeys[:3]))
         sd = dict(mzeach=mzeach, msnap_nj=nj, j_list=j_list)
@@ -86,7 +90,7 @@ class SnapPhiZetaPsiConverter(Converter):
         for idx, j in enumerate(j_list):
             key = self._datakeys[-1] % j
             clog.debug("Filling datakeys: %s ..." % key)
-            sd[key] = phi[:, :, idx]
+            sd[key] = phi[idx]
         return sd
 
 
@@ -126,8 +130,8 @@ class SnapPhiZetaPsiDigger(Digger):
         # use_ra, arr2 [1,mpsi-1], so y0>=1, y1<=mpsi
         if kwargs.get('use_ra', False):
             try:
-                arr2, a = self.pckloader.get_many('gtc/arr2', 'gtc/a_minor')
-                rr = arr2[:, 1] / a  # index [0, mpsi-2]
+                rr = self.stage(
+                    'gtc-rr', stage_rr, 'gtc/arr2', 'gtc/a_minor')
                 x0 = 1
                 x1 = x - 1
                 X = rr[x0-1:x1-1]
@@ -174,8 +178,8 @@ class SnapPhiCorrLenDigger(SnapPhiZetaPsiDigger):
         # use_ra, arr2 [1,mpsi-1], so y0>=1, y1<=mpsi
         if kwargs.get('use_ra', True):
             try:
-                arr2, a = self.pckloader.get_many('gtc/arr2', 'gtc/a_minor')
-                rr = arr2[:, 1] / a  # index [0, mpsi-2]
+                rr = self.stage(
+                    'gtc-rr', stage_rr, 'gtc/arr2', 'gtc/a_minor')
                 Z = Z[:, 1:x-1]
                 y, x = Z.shape
             except Exception:
@@ -185,19 +189,8 @@ class SnapPhiCorrLenDigger(SnapPhiZetaPsiDigger):
                 use_ra = True
         else:
             use_ra = False
-        # if Z size is too large, cal corr will be very slow
-        max_x, max_y = 400, 1536
-        step_x = round(x/max_x) if x > max_x else 1
-        step_y = round(y/max_y) if y > max_y else 1
-        if step_x != 1 or step_y != 1:
-            if use_ra:
-                rr = rr[::step_x]
-            Z = Z[::step_y, ::step_x]
-            dlog.parm('Too large data of phi(zeta,psi), slice it: %s -> %s'
-                      % ((y, x), Z.shape))
-            y, x = Z.shape
-        else:
-            dlog.parm('Data shape of phi(zeta,psi) is %s.' % ((y, x),))
+        # full data, tools.correlation uses FFT
+        dlog.parm('Data shape of phi(zeta,psi) is %s.' % ((y, x),))
         maxmdpsi, maxmdzeta = int(x/2+1), int(y/2+1)
         mdpsi, mdzeta = kwargs.get('mdpsi', None), kwargs.get('mdzeta', None)
         if not (isinstance(mdpsi, int) and mdpsi <= maxmdpsi):
@@ -228,10 +221,10 @@ class SnapPhiCorrLenDigger(SnapPhiZetaPsiDigger):
                 use_ra=dict(widget='Checkbox',
                             value=True,
                             description='X: r/a'))
-        Xpsi = np.arange(0, mdpsi) * step_x
-        Y = np.arange(0, mdzeta) * step_y / y * 2 * np.pi
+        Xpsi = np.arange(0, mdpsi)
+        Y = np.arange(0, mdzeta) / y * 2 * np.pi
         if use_ra:
-            # print(rr, rr.size, Z.shape, step_x)
+            # print(rr, rr.size, Z.shape)
             title1 = r'Correlation $\phi(\Delta\zeta,\Delta r)$, %s, %s' % (
                 self.theta, self.timestr)
             xlabel = r'$\Delta r/a$'
@@ -309,23 +302,28 @@ class SnapPhiFieldnDigger(SnapshotFieldmDigger):
         self._fignum = 'phi_%03d_fieldn' % round(self._part*360)
         self.kwoptions = None
 
+    def _compute_fieldm(self, kwargs):
+        '''Return r/a and field_n of all ipsi, None if invalid data.'''
+        data, j_list, mpsi1, dt = self.pckloader.get_many(
+            *self.srckeys, *self.common[:-2])
+        Lz, Lr = data.shape
+        if Lr != mpsi1:
+            dlog.error("Invalid phi(zeta,psi) shape!")
+            return None
+        rr = self.stage('gtc-rr', stage_rr, *self.common[-2:])
+        # all ipsi in [1, mpsi-1] at once, along toroidal axis
+        dy_ft = np.fft.rfft(data[:, 1:mpsi1 - 1], axis=0)[:Lz//2]
+        fieldn = np.abs(dy_ft) * Lz / 8  # why *Lz / 8
+        return rr, fieldn
+
     def _dig(self, kwargs):
         timestr = _snap_get_timestr(self.group, self.pckloader)
         theta = r'$\theta=%.2f=%g^\circ$' % (
             round(self._part*2*np.pi, ndigits=2), self._part*360)
-        data, j_list, mpsi1, dt, arr2, a = self.pckloader.get_many(
-            *self.srckeys, *self.common)
-        Lz, Lr = data.shape
-        if Lr != mpsi1:
-            log.error("Invalid phi(zeta,psi) shape!")
+        computed = self.compute(self._compute_fieldm, kwargs)
+        if computed is None:
             return
-        rr = arr2[:, 1] / a
-        fieldn = []
-        for ipsi in range(1, mpsi1 - 1):
-            y = data[:, ipsi]
-            dy_ft = np.fft.fft(y)*Lz / 8  # why *Lz / 8
-            fieldn.append(abs(dy_ft[:Lz//2]))
-        fieldn = np.array(fieldn).T
+        rr, fieldn = computed
         zlist, acckwargs, envY, envXp, envYp, envXmax, envYmax = \
             self._remove_add_some_lines(fieldn, rr, kwargs)
         return dict(
@@ -36,10 +36,12 @@ import numpy as np
 from .. import tools
 from ..cores.converter import Converter, clog
 from ..cores.digger import Digger, dlog
+from .gtc import stage_rr
 
 _all_Converters = ['SnapshotConverter']
 _all_Diggers = ['SnapshotProfilePdfDigger', 'SnapshotFieldFluxDigger',
                 'SnapshotFieldPoloidalDigger', 'SnapshotFieldSpectrumDigger',
+                'SnapshotFieldSpectrumSeriesDigger',
                 'SnapshotFieldProfileDigger', 'SnapshotFieldmDigger']
 __all__ = _all_Converters + _all_Diggers
 
@@ -310,8 +312,7 @@ class SnapshotFieldPoloidalDigger(Digger):
         circle_r = 0
         if circle_iflux:
             try:
-                arr2, a = self.pckloader.get_many(*self.common[-2:])
-                rr = arr2[:, 1] / a  # arr2 [1,mpsi-1]
+                rr = self.stage('gtc-rr', stage_rr, *self.common[-2:])
                 circle_r = np.round(rr[circle_iflux-1], decimals=3)
             except Exception:
                 pass
@@ -343,6 +344,69 @@ class SnapshotFieldPoloidalDigger(Digger):
         return dict(zip_results=zip_results)
 
 
+def _snap_fold_modes(power, n, m, nmode):
+    '''
+    Fold *power* of real FFT with *n* points along last axis,
+    add mode j and mode m-j, j in [1, nmode).
+    '''
+    j = np.arange(1, nmode)
+    k = m - j
+    # |yy[k]| == |yy[n-k]| for real input
+    k = np.minimum(k, n - k)
+    Y = np.empty(power.shape[:-1] + (nmode,))
+    Y[..., 0] = power[..., 0]
+    Y[..., 1:] = power[..., j] + power[..., k]
+    return Y
+
+
+def _snap_field_spectra(fluxdata, mmode, pmode):
+    '''
+    Poloidal and parallel spectra of *fluxdata*, shape is
+    (mtgrid+1, mtoroidal) or (nsnap, mtgrid+1, mtoroidal).
+    '''
+    mtgrid1, mtoroidal = fluxdata.shape[-2:]
+    mtgrid = mtgrid1 - 1
+    # poloidal, sum over all toroidal planes
+    yy = np.fft.rfft(fluxdata, axis=-2)
+    power = np.sum(yy.real**2 + yy.imag**2, axis=-1)
+    Y1 = _snap_fold_modes(power, mtgrid1, mtgrid, mmode)
+    Y1 = np.sqrt(Y1 / mtoroidal) / mtgrid
+    # parallel, sum over poloidal grids [0, mtgrid)
+    yy = np.fft.rfft(fluxdata[..., :mtgrid, :], axis=-1)
+    power = np.sum(yy.real**2 + yy.imag**2, axis=-2)
+    Y2 = _snap_fold_modes(power, mtoroidal, mtoroidal, pmode)
+    Y2 = np.sqrt(Y2 / mtgrid) / mtoroidal
+    return Y1, Y2
+
+
+def _snap_spectrum_kwoptions(mmode, pmode, maxmmode, maxpmode):
+    return dict(
+        mmode=dict(
+            widget='IntSlider',
+            rangee=(1, maxmmode, 1),
+            value=mmode,
+            description='mmode:'),
+        pmode=dict(
+            widget='IntSlider',
+            rangee=(1, maxpmode, 1),
+            value=pmode,
+            description='pmode:'))
+
+
+def _snap_spectrum_modes(kwargs, mtgrid, mtoroidal):
+    '''Get mmode, pmode from *kwargs*, and their maximal values.'''
+    maxmmode = int(mtgrid / 2 + 1)
+    maxpmode = int(mtoroidal / 2 + 1)
+    mmode, pmode = kwargs.get('mmode', None), kwargs.get('pmode', None)
+    if not (isinstance(mmode, int) and mmode <= maxmmode):
+        mmode = mtgrid // 5
+    if not (isinstance(pmode, int) and pmode <= maxpmode):
+        pmode = mtoroidal // 3
+    dlog.parm("Poloidal and parallel range: m=%s, p=%s. Maximal m=%s, p=%s"
+              % (mmode, pmode, maxmmode, maxpmode))
+    return mmode, pmode, maxmmode, maxpmode
+
+
 class SnapshotFieldSpectrumDigger(Digger):
     '''field or density poloidal and parallel spectra.'''
     __slots__ = []
@@ -368,45 +432,16 @@ class SnapshotFieldSpectrumDigger(Digger):
         '''
         fluxdata, mtgrid1, mtoroidal = self.pckloader.get_many(*self.srckeys)
         if fluxdata.shape != (mtgrid1, mtoroidal):
-            log.error("Invalid fluxdata shape!")
+            dlog.error("Invalid fluxdata shape!")
             return
-        mtgrid = mtgrid1 - 1
-        maxmmode = int(mtgrid / 2 + 1)
-        maxpmode = int(mtoroidal / 2 + 1)
-        mmode, pmode = kwargs.get('mmode', None), kwargs.get('pmode', None)
-        if not (isinstance(mmode, int) and mmode <= maxmmode):
-            mmode = mtgrid // 5
-        if not (isinstance(pmode, int) and pmode <= maxpmode):
-            pmode = mtoroidal // 3
+        mmode, pmode, maxmmode, maxpmode = _snap_spectrum_modes(
+            kwargs, mtgrid1 - 1, mtoroidal)
         acckwargs = dict(mmode=mmode, pmode=pmode)
-        dlog.parm("Poloidal and parallel range: m=%s, p=%s. Maximal m=%s, p=%s"
-                  % (mmode, pmode, maxmmode, maxpmode))
         if self.kwoptions is None:
-            self.kwoptions = dict(
-                mmode=dict(
-                    widget='IntSlider',
-                    rangee=(1, maxmmode, 1),
-                    value=mmode,
-                    description='mmode:'),
-                pmode=dict(
-                    widget='IntSlider',
-                    rangee=(1, maxpmode, 1),
-                    value=pmode,
-                    description='pmode:'))
-        X1, Y1 = np.arange(1, mmode + 1), np.zeros(mmode)
-        X2, Y2 = np.arange(1, pmode + 1), np.zeros(pmode)
-        for i in range(mtoroidal):
-            yy = np.fft.fft(fluxdata[:, i])
-            Y1[0] = Y1[0] + (abs(yy[0]))**2
-            for j in range(1, mmode):
-                Y1[j] = Y1[j] + (abs(yy[j]))**2 + (abs(yy[mtgrid - j]))**2
-        Y1 = np.sqrt(Y1 / mtoroidal) / mtgrid
-        for i in range(mtgrid):
-            yy = np.fft.fft(fluxdata[i, :])
-            Y2[0] = Y2[0] + (abs(yy[0]))**2
-            for j in range(1, pmode):
-                Y2[j] = Y2[j] + (abs(yy[j]))**2 + (abs(yy[mtoroidal - j]))**2
-        Y2 = np.sqrt(Y2 / mtgrid) / mtoroidal
+            self.kwoptions = _snap_spectrum_kwoptions(
+                mmode, pmode, maxmmode, maxpmode)
+        X1, X2 = np.arange(1, mmode + 1), np.arange(1, pmode + 1)
+        Y1, Y2 = _snap_field_spectra(fluxdata, mmode, pmode)
         fstr = field_tex_str[self.section[1]]
         timestr = _snap_get_timestr(self.group, self.pckloader)
         return dict(
@@ -429,6 +464,70 @@ class SnapshotFieldSpectrumDigger(Digger):
         ], suptitle=r'%s, m=%d, p=%d' % (r['title'], r['mmode'], r['pmode']))
 
 
+class SnapshotFieldSpectrumSeriesDigger(Digger):
+    '''field or density poloidal and parallel spectra of all snapshots.'''
+    __slots__ = []
+    nitems = '+'
+    itemspattern = [
+        '^snap\d{5,7}'
+        + '/fluxdata-(?P<section>(?:phi|apara|fluidne|densityi|densitye))$']
+    commonpattern = ['gtc/tstep', '^snap\d{5,7}/mtgrid\+1$',
+                     '^snap\d{5,7}/mtoroidal$']
+    post_template = 'tmpl_z111p'
+
+    def _set_group(self):
+        self._group = 'snapshot'
+
+    def _set_fignum(self, numseed=None):
+        self._fignum = '%s_spectrum' % self.section[0]
+        self.kwoptions = None
+
+    def _dig(self, kwargs):
+        '''
+        kwargs
+        ------
+        *mmode*, *pmode*: int
+            set poloidal or parallel range
+        '''
+        keys = sorted(self.srckeys, key=lambda k: int(k[4:k.index('/')]))
+        snaps = [k[:k.index('/')] for k in keys]
+        tstep, mtgrid1, mtoroidal = self.pckloader.get_many(
+            'gtc/tstep', '%s/mtgrid+1' % snaps[0], '%s/mtoroidal' % snaps[0])
+        fluxdata = np.array(self.pckloader.get_many(*keys))
+        if fluxdata.shape[1:] != (mtgrid1, mtoroidal):
+            dlog.error("Invalid fluxdata shape!")
+            return
+        mmode, pmode, maxmmode, maxpmode = _snap_spectrum_modes(
+            kwargs, mtgrid1 - 1, mtoroidal)
+        acckwargs = dict(mmode=mmode, pmode=pmode)
+        if self.kwoptions is None:
+            self.kwoptions = _snap_spectrum_kwoptions(
+                mmode, pmode, maxmmode, maxpmode)
+        time = np.array([int(s.replace('snap', '')) for s in snaps]) * tstep
+        Y1, Y2 = _snap_field_spectra(fluxdata, mmode, pmode)
+        return dict(
+            time=time, jtgrid=np.arange(1, mmode + 1), poloidal_spectrum=Y1,
+            ktoroidal=np.arange(1, pmode + 1), parallel_spectrum=Y2,
+            mmode=mmode, pmode=pmode,
+            title=r'$%s$ spectra' % field_tex_str[self.section[0]],
+        ), acckwargs
+
+    def _post_dig(self, results):
+        r = results
+        ax1_calc = dict(X=r['time'], Y=r['jtgrid'],
+                        Z=r['poloidal_spectrum'].T,
+                        xlabel=r'time($R_0/c_s$)', ylabel='mtgrid',
+                        title='poloidal spectrum')
+        ax2_calc = dict(X=r['time'], Y=r['ktoroidal'],
+                        Z=r['parallel_spectrum'].T,
+                        xlabel=r'time($R_0/c_s$)', ylabel='mtoroidal',
+                        title='parallel spectrum')
+        return dict(zip_results=[
+            ('tmpl_contourf', 211, ax1_calc),
+            ('tmpl_contourf', 212, ax2_calc),
+        ], suptitle=r'%s, m=%d, p=%d' % (r['title'], r['mmode'], r['pmode']))
+
+
 class SnapshotFieldProfileDigger(Digger):
     '''field and rms or density radius poloidal profile'''
     __slots__ = []
@@ -524,26 +623,32 @@ class SnapshotFieldmDigger(Digger):
         '^(?P<s>snap\d{5,7})/mtgrid\+1']
     commonpattern = ['gtc/tstep', 'gtc/arr2', 'gtc/a_minor']
     post_template = 'tmpl_line'
+    refine_kwargs = ['ymaxlimit', 'envelope', 'kind']
 
     def _set_fignum(self, numseed=None):
         self._fignum = '%s_fieldm' % self.section[1]
         self.kwoptions = None
 
+    def _compute_fieldm(self, kwargs):
+        '''Return r/a and field_m of all ipsi, None if invalid data.'''
+        pdata, mpsi1, mtgrid1, dt = self.pckloader.get_many(
+            *self.srckeys, *self.common[:-2])
+        if pdata.shape != (mtgrid1, mpsi1):
+            dlog.error("Invalid poloidata shape!")
+            return None
+        rr = self.stage('gtc-rr', stage_rr, *self.common[-2:])
+        # all ipsi in [1, mpsi-1] at once, along poloidal axis
+        dy_ft = np.fft.rfft(pdata[:, 1:mpsi1 - 1], axis=0)[:mtgrid1//2]
+        fieldm = np.abs(dy_ft) / mtgrid1 * 2  # why /mtgrid1 * 2
+        return rr, fieldm
+
     def _dig(self, kwargs):
         timestr = _snap_get_timestr(self.group, self.pckloader)
         fstr = field_tex_str[self.section[1]]
-        pdata, mpsi1, mtgrid1, dt, arr2, a = self.pckloader.get_many(
-            *self.srckeys, *self.common)
-        if pdata.shape != (mtgrid1, mpsi1):
-            log.error("Invalid poloidata shape!")
+        computed = self.compute(self._compute_fieldm, kwargs)
+        if computed is None:
             return
-        rr = arr2[:, 1] / a
-        fieldm = []
-        for ipsi in range(1, mpsi1 - 1):
-            y = pdata[:, ipsi]
-            dy_ft = np.fft.fft(y)/mtgrid1 * 2  # why /mtgrid1 * 2
-            fieldm.append(abs(dy_ft[:mtgrid1//2]))
-        fieldm = np.array(fieldm).T
+        rr, fieldm = computed
         jlist, acckwargs, envY, envXp, envYp, envXmax, envYmax = \
             self._remove_add_some_lines(fieldm, rr, kwargs)
         return dict(rr=rr, fieldm=fieldm, jlist=jlist,
@@ -590,19 +695,15 @@ class SnapshotFieldmDigger(Digger):
             maxfm = fieldm.max(axis=0)
             tmp = np.gradient(maxfm, rr)
             zerolimit = tmp.max()*1e-6
-            add_indexs = []
-            # increase
-            for i in range(len(tmp)//2):
-                if tmp[i] >= - zerolimit:
-                    add_indexs.append(i)
-                else:
-                    break
-            # decrease
-            for i in range(len(tmp)-1, len(tmp)//2, -1):
-                if tmp[i] <= zerolimit:
-                    add_indexs.append(i)
-                else:
-                    break
+            half = len(tmp)//2
+            # increase, leading indexes in [0, half)
+            inc = tmp[:half] >= - zerolimit
+            ninc = inc.size if inc.all() else np.argmin(inc)
+            # decrease, trailing indexes in (half, len(tmp))
+            dec = tmp[:half:-1] <= zerolimit
+            ndec = dec.size if dec.all() else np.argmin(dec)
+            add_indexs = list(range(ninc)) + list(
+                range(len(tmp)-1, len(tmp)-1-ndec, -1))
             Y = tools.high_envelope(
                 maxfm, X=rr, kind=kind, add_indexs=add_indexs)
             newX, newY = tools.near_peak(
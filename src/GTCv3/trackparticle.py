@@ -25,11 +25,12 @@ tracking.F90, subroutine write_tracked_particles:270:278-289
 
 import types
 import numpy as np
+from .. import accel
 from ..cores.converter import Converter, clog
 from ..cores.digger import Digger, dlog
 
 _all_Converters = ['TrackParticleConverter']
-_all_Diggers = ['TrackParticleOrbitDigger']
+_all_Diggers = ['TrackParticleOrbitDigger', 'TrackParticleStackOrbitDigger']
 __all__ = _all_Converters + _all_Diggers
 
 
@@ -41,50 +42,96 @@ class TrackParticleConverter(Converter):
        Shape of the array data is (mstep/ndiag,7).
        7 quantities of particle:
        istep, X, Z, zeta, rho_para, weight, sqrt(mu).
+    2) If :attr:`stacked` is True, one array per species, key 'ion',
+       rows sorted by tags then istep, and an index table 'ion-index',
+       shape (number of particles, 4), columns: tag1, tag2, start, stop.
+       So data of particle 'ion-31-2' is ion[start:stop].
     '''
     __slots__ = []
     nitems = '+'
     itemspattern = ['^(?P<section>trackp)_dir/TRACKP\.\d{5}$',
                     '.*/(?P<section>trackp)_dir/TRACKP\.\d{5}$']
     _short_files_subs = (0, '^(.*trackp_dir/TRACKP\.)\d{5}$', r'\1*')
+    #: save one stacked array per species, instead of one per particle
+    stacked = False
+    _species = ['ion', 'electron', 'fastion']
+
+    @staticmethod
+    def _trackp_shape(lines):
+        '''Get nspecies and nparam from lines of a TRACKP file.'''
+        nspecies = len(lines[1].split())
+        i = 0
+        while i + 1 < len(lines):
+            n = sum(int(c) for c in lines[i+1].split())
+            if n > 0:
+                # one particle in two lines
+                return nspecies, len(lines[i+2].split() + lines[i+3].split())
+            i += 2 + 2 * n
+        return nspecies, None
+
+    def _read_records(self, f):
+        '''
+        Read one TRACKP file *f* into a record array, one row per record.
+        Fields: species, tag1, tag2, data (istep and other quantities).
+        Return None if *f* has no record.
+        '''
+        with self.rawloader.get(f) as fid:
+            clog.debug("Read file '%s'." % f)
+            text = fid.read()
+        # shape from head lines, or all lines
+        lines = text.split('\n', 4096)
+        if len(lines) < 2:
+            return None
+        nspecies, nparam = self._trackp_shape(lines)
+        if nparam is None and len(lines) > 4096:
+            nspecies, nparam = self._trackp_shape(text.split('\n'))
+        if nparam is None:
+            return None
+        tokens = np.fromstring(text, dtype=np.float64, sep=' ')
+        species, records = accel.trackp_records(tokens, nspecies, nparam)
+        rec = np.empty(species.size, dtype=[
+            ('species', np.int8), ('tag1', np.int64), ('tag2', np.int64),
+            ('data', np.float64, (nparam - 1,))])
+        rec['species'] = species
+        rec['tag1'] = records[:, -1]
+        rec['tag2'] = records[:, -2]
+        rec['data'] = records[:, :-2]
+        return rec
 
     def _convert(self):
         '''Read 'trackp_dir/TRACKP.%05d' % mype.'''
-        ion = {}
-        electron = {}
-        fastion = {}
-        Particles = [ion, electron, fastion]
-        keyprefix = ['ion', 'electron', 'fastion']
-        for f in self.files:
-            with self.rawloader.get(f) as fid:
-                clog.debug("Read file '%s'." % f)
-                istep = fid.readline()
-                while istep:
-                    nums = [int(n) for n in fid.readline().split()]
-                    for p, n in enumerate(nums):
-                        particle = Particles[p]
-                        for i in range(n):
-                            line = (istep + fid.readline() +
-                                    fid.readline()).split()
-                            key = keyprefix[p]
-                            for k in line[:-3:-1]:
-                                key += '-' + str(int(float(k)))
-                            line = [int(line[0])] + [float(l)
-                                                     for l in line[1:-2]]
-                            if key in particle:
-                                particle[key].append(line)
-                            else:
-                                particle[key] = [line]
-                    istep = fid.readline()
+        recs = self._map_files(self._read_records)
+        recs = [r for r in recs if r is not None]
         sd = {}
-        for particle in Particles:
-            for key in particle.keys():
-                particle[key].sort()
-                particle[key] = np.array(particle[key])
-            if particle.keys():
-                clog.debug("Filling datakeys: %s ..." %
-                           str(tuple(particle.keys())))
-                sd.update(particle)
+        if not recs:
+            return sd
+        rec = np.concatenate(recs)
+        # grouped sort by (species, tag1, tag2), then rows
+        data = rec['data']
+        order = np.lexsort(tuple(data[:, ::-1].T)
+                           + (rec['tag2'], rec['tag1'], rec['species']))
+        rec = rec[order]
+        keys = np.column_stack((rec['species'], rec['tag1'], rec['tag2']))
+        start = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+        start = np.concatenate(([0], start))
+        stop = np.append(start[1:], len(rec))
+        if self.stacked:
+            for p, name in enumerate(self._species):
+                sel = keys[start, 0] == p
+                if not sel.any():
+                    continue
+                pstart, pstop = start[sel], stop[sel]
+                offset = pstart[0]
+                sd[name] = rec['data'][offset:pstop[-1]]
+                sd[name + '-index'] = np.column_stack((
+                    keys[pstart, 1], keys[pstart, 2],
+                    pstart - offset, pstop - offset))
+        else:
+            data = rec['data']
+            for i, j in zip(start, stop):
+                p, t1, t2 = keys[i]
+                sd['%s-%d-%d' % (self._species[p], t1, t2)] = data[i:j]
+        clog.debug("Filling datakeys: %s ..." % str(tuple(sd.keys())))
         return sd
 
 
@@ -121,6 +168,10 @@ class TrackParticleOrbitDigger(Digger):
                     description='cal_dr of trapped ion'))
         pdata, r0 = self.pckloader.get_many(self.srckeys[0], 'gtc/r0')
         title = 'orbit of %s %s' % self.section[1:]
+        return self._dig_orbit(pdata, r0, title, kwargs, acckwargs)
+
+    def _dig_orbit(self, pdata, r0, title, kwargs, acckwargs):
+        '''Get orbit results from particle data *pdata*.'''
         results = dict(r0=r0, title='%s %s' % (self.dimension.upper(), title))
         R = pdata[:, 1] * r0
         Z = pdata[:, 2] * r0
@@ -142,12 +193,11 @@ class TrackParticleOrbitDigger(Digger):
     def __trapped_ion_dr(self, R, Z, r0):
         '''find dr = |R1-R2| while z=0'''
         try:
-            fR = []
-            for t in range(0, len(R) - 1):
-                if Z[t] * Z[t + 1] < 0:
-                    fR.append((R[t] + R[t + 1]) / 2)
-            R1 = sum(fR[::2]) / len(fR[::2])
-            R2 = sum(fR[1::2]) / len(fR[1::2])
+            fR = accel.zero_crossings(R, Z)
+            if fR.size < 2:
+                raise ValueError('Need R of at least two z=0 points!')
+            R1 = np.average(fR[::2])
+            R2 = np.average(fR[1::2])
             dr = abs(R1 - R2)
             # theta M
             mpoints = np.array(sorted(zip(R, Z), key=lambda p: p[0])[:4])
@@ -186,3 +236,49 @@ class TrackParticleOrbitDigger(Digger):
             return dict(LINE=[(r['X'], r['Y'], r['Z'])], title=r['title'],
                         xlabel='X(cm)', ylabel='Y(cm)', aspect='equal',
                         lin3d=True, zlabel='Z(cm)', scale_xyz=(sc, sc, sc))
+
+
+class TrackParticleStackOrbitDigger(TrackParticleOrbitDigger):
+    '''particle 2d or 3d orbit, from stacked data of one species.'''
+    __slots__ = []
+    nitems = '+'
+    itemspattern = [r'^(?P<s>trackp)/(?P<particle>(?:ion|electron|fastion))$',
+                    r'^(?P<s>trackp)/(?P<particle>(?:ion|electron|fastion))'
+                    + r'-index$']
+
+    def _set_fignum(self, numseed=None):
+        self._fignum = 'orbit_%s_%s' % (numseed, self.section[1])
+        self.dimension = numseed
+        self.kwoptions = None
+
+    def _dig(self, kwargs):
+        '''
+        kwargs
+        ------
+        *tag*: str
+            tag of particle, like '31-2', default the first one.
+        *cal_dr*: bool
+            calculate delta R of trapped ions in 2d orbit, default False.
+        '''
+        data, index, r0 = self.pckloader.get_many(
+            *self.srckeys, 'gtc/r0')
+        tags = ['%d-%d' % (t1, t2) for t1, t2 in index[:, :2]]
+        if self.kwoptions is None:
+            self.kwoptions = dict(
+                tag=dict(
+                    widget='Dropdown',
+                    options=tags,
+                    value=tags[0],
+                    description='particle tag:'))
+            if self.dimension == '2d':
+                self.kwoptions['cal_dr'] = dict(
+                    widget='Checkbox',
+                    value=False,
+                    description='cal_dr of trapped ion')
+        tag = kwargs.get('tag', tags[0])
+        if tag not in tags:
+            tag = tags[0]
+        acckwargs = {'tag': tag, 'cal_dr': False}
+        start, stop = index[tags.index(tag), 2:]
+        title = 'orbit of %s %s' % (self.section[1], tag)
+        return self._dig_orbit(data[start:stop], r0, title, kwargs, acckwargs)
@@ -37,7 +37,7 @@ def gui_script():
                         help='If no casepath given, '
                              'ask for a sftp directory, not local path.')
     optgrp.add_argument('--parallel', type=str,
-                        choices=['off', 'multiprocess'],  # 'mpi4py'],
+                        choices=['off', 'multiprocess', 'thread'],  # 'mpi4py'],
                         default='off',
                         help="Parallel processing or not, "
                         "(default: %(default)s)")
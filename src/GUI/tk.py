@@ -37,7 +37,7 @@ class GTkApp(object):
         ask_sftp: bool
             if no path given, ask for a sftp(not local) path, default False
         parallel: str
-            'off', 'multiprocess' or 'mpi4py', default 'off'
+            'off', 'multiprocess', 'thread' or 'mpi4py', default 'off'
         '''
         root = tkinter.Tk(className='gdpy3-gui')
         img = tkinter.PhotoImage(file=os.path.join(
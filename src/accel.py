@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Optional numba acceleration of some numeric loops.
+
+Every :class:`Kernel` has a NumPy version and a plain loop version.
+The loop version is compiled by :func:`numba.njit` at the first call,
+when numba is installed and the switch allows it,
+otherwise the NumPy version is used.
+Use :func:`set_accel` (also :func:`gdpy3.tools.set_accel`) to force
+either path.
+'''
+
+import numpy as np
+
+from .glogger import getGLogger
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+__all__ = ['Kernel', 'set_accel', 'get_accel',
+           'max_subarray', 'near_peak_bounds', 'zero_crossings',
+           'trackp_records']
+log = getGLogger('C')
+_accel_mode = 'auto'
+
+
+def set_accel(mode='auto'):
+    '''
+    Set which path kernels use.
+
+    Parameters
+    ----------
+    mode: str
+        'auto', use numba if it is installed, else NumPy;
+        'numba', force numba, raise ImportError if not installed;
+        'numpy', force NumPy.
+    '''
+    global _accel_mode
+    if mode not in ('auto', 'numba', 'numpy'):
+        raise ValueError("Invalid accel mode: %s!" % mode)
+    if mode == 'numba' and numba is None:
+        raise ImportError("Accel mode 'numba' needs package 'numba'!")
+    _accel_mode = mode
+
+
+def get_accel():
+    '''Return the path kernels use now, 'numba' or 'numpy'.'''
+    if _accel_mode == 'auto':
+        return 'numpy' if numba is None else 'numba'
+    return _accel_mode
+
+
+class Kernel(object):
+    '''
+    Numeric kernel with a NumPy version and a numba-compiled loop version.
+
+    Attributes
+    ----------
+    loop_func: function, compiled by numba lazily
+    numpy_func: function, NumPy version
+    '''
+    __slots__ = ['loop_func', 'numpy_func', '_jitted']
+
+    def __init__(self, loop_func, numpy_func):
+        self.loop_func = loop_func
+        self.numpy_func = numpy_func
+        self._jitted = None
+
+    @property
+    def jitted(self):
+        if self._jitted is None:
+            log.debug("Compiling kernel %s ..." % self.loop_func.__name__)
+            self._jitted = numba.njit(self.loop_func)
+        return self._jitted
+
+    def __call__(self, *args):
+        if get_accel() == 'numba':
+            return self.jitted(*args)
+        return self.numpy_func(*args)
+
+
+def _loop_max_subarray(A):
+    max_ending_here = max_so_far = A[0]
+    for i in range(1, A.size):
+        max_ending_here = max(A[i], max_ending_here + A[i])
+        max_so_far = max(max_so_far, max_ending_here)
+    return max_so_far
+
+
+def _numpy_max_subarray(A):
+    '''
+    Maximum subarray sum of 1D array *A*,
+    max(prefix sum - min of prior prefix sums).
+    '''
+    P = np.cumsum(np.concatenate(([0], A)))
+    return np.max(P[1:] - np.minimum.accumulate(P[:-1]))
+
+
+max_subarray = Kernel(_loop_max_subarray, _numpy_max_subarray)
+
+
+def _loop_near_peak_bounds(Y, idx, limit, greedy):
+    if greedy:
+        left = 0
+        for i in range(idx):
+            if Y[i] >= limit:
+                left = i
+                break
+        right = Y.size - 1
+        for i in range(Y.size - 1, idx, -1):
+            if Y[i] >= limit:
+                right = i
+                break
+    else:
+        left = idx
+        for i in range(idx, -1, -1):
+            if Y[i] >= limit:
+                left = i
+            else:
+                break
+        right = idx
+        for i in range(idx, Y.size):
+            if Y[i] >= limit:
+                right = i
+            else:
+                break
+    return left, right
+
+
+def _numpy_near_peak_bounds(Y, idx, limit, greedy):
+    '''
+    Return left and right index of 1D *Y* values >= *limit* around *idx*.
+    If *greedy*, search from edges, else from *idx*.
+    '''
+    if greedy:
+        ge = np.flatnonzero(Y[:idx] >= limit)
+        left = ge[0] if ge.size else 0
+        ge = np.flatnonzero(Y[idx+1:] >= limit)
+        right = idx + 1 + ge[-1] if ge.size else Y.size - 1
+    else:
+        lt = np.flatnonzero(Y[:idx+1] < limit)
+        left = lt[-1] + 1 if lt.size else 0
+        lt = np.flatnonzero(Y[idx:] < limit)
+        right = idx + lt[0] - 1 if lt.size else Y.size - 1
+        # Y[idx] < limit
+        left, right = min(left, idx), max(right, idx)
+    return int(left), int(right)
+
+
+near_peak_bounds = Kernel(_loop_near_peak_bounds, _numpy_near_peak_bounds)
+
+
+def _loop_zero_crossings(R, Z):
+    out = np.empty(R.size, dtype=np.float64)
+    n = 0
+    for t in range(R.size - 1):
+        if Z[t] * Z[t + 1] < 0:
+            out[n] = (R[t] + R[t + 1]) / 2
+            n += 1
+    return out[:n]
+
+
+def _numpy_zero_crossings(R, Z):
+    '''Return middle R of points where 1D Z changes its sign.'''
+    idx = np.flatnonzero(Z[:-1] * Z[1:] < 0)
+    return (R[idx] + R[idx + 1]) / 2
+
+
+zero_crossings = Kernel(_loop_zero_crossings, _numpy_zero_crossings)
+
+
+def _loop_trackp_records(tokens, nspecies, nparam):
+    # count records first
+    total, pos = 0, 0
+    while pos < tokens.size:
+        n = 0
+        for p in range(nspecies):
+            n += int(tokens[pos+1+p])
+        total += n
+        pos += 1 + nspecies + n * nparam
+    species = np.empty(total, dtype=np.int8)
+    records = np.empty((total, 1 + nparam), dtype=np.float64)
+    pos, r = 0, 0
+    while pos < tokens.size:
+        istep = tokens[pos]
+        counts = tokens[pos+1:pos+1+nspecies]
+        pos += 1 + nspecies
+        for p in range(nspecies):
+            for i in range(int(counts[p])):
+                species[r] = p
+                records[r, 0] = istep
+                for j in range(1, 1 + nparam):
+                    records[r, j] = tokens[pos]
+                    pos += 1
+                r += 1
+    return species, records
+
+
+def _numpy_trackp_records(tokens, nspecies, nparam):
+    '''
+    Split numbers of a TRACKP file into records.
+    Each block is: istep, *nspecies* numbers of particles,
+    then *nparam* numbers per particle.
+
+    Returns
+    -------
+    species: 1D int8 array, index of species, 0 ion, 1 electron, 2 fastion
+    records: 2D array, shape (N, 1 + *nparam*), first column is istep
+    '''
+    species, records = [], []
+    pos = 0
+    while pos < tokens.size:
+        istep = tokens[pos]
+        counts = tokens[pos+1:pos+1+nspecies].astype(int)
+        n = counts.sum()
+        pos += 1 + nspecies
+        block = tokens[pos:pos+n*nparam].reshape(n, nparam)
+        species.append(np.repeat(
+            np.arange(nspecies, dtype=np.int8), counts))
+        records.append(np.column_stack((np.full(n, istep), block)))
+        pos += n * nparam
+    if not records:
+        return np.empty(0, dtype=np.int8), np.empty((0, 1 + nparam))
+    return np.concatenate(species), np.concatenate(records)
+
+
+trackp_records = Kernel(_loop_trackp_records, _numpy_trackp_records)
@@ -8,11 +8,16 @@ Command Line Interface(CLI), entry points of console_scripts.
 
 import os
 import sys
+import glob
 import time
 import argparse
+import multiprocessing
+import concurrent.futures
 
 from .glogger import logfile, getGLogger
 from .processors import Processor_Names, Processor_Alias, get_processor
+from .processors.processor import Processor
+from .processors.digstats import get_digstats
 from .__about__ import __gversion__
 
 __all__ = ['cli_script']
@@ -60,10 +65,14 @@ def get_parser_base():
                         help="Assign processor to work, "
                         "(default: %(default)s)")
     optgrp.add_argument('--parallel', type=str,
-                        choices=['off', 'multiprocess'],  # 'mpi4py'],
+                        choices=['off', 'multiprocess', 'thread', 'mpi4py'],
                         default='multiprocess',
                         help="Parallel processing or not, "
                         "(default: %(default)s)")
+    optgrp.add_argument('-j', '--jobs', type=int, metavar='N', default=1,
+                        help="Batch mode, N worker processes shared by all "
+                        "cases and figures, --parallel is ignored, "
+                        "(default: %(default)s)")
     optgrp.add_argument('-h', '--help', action='store_true',
                         help='Show this help message and exit')
     return parser
@@ -89,6 +98,17 @@ def get_parser_convert(subparsers, parents=[]):
                         help="Extension of savefile, (default: %(default)s)")
     optgrp.add_argument('--overwrite', action='store_true',
                         help='Overwrite existing savefile')
+    optgrp.add_argument('--warm', type=float, metavar='Seconds',
+                        help="Warm up dig results of default figures after "
+                        "converting, at most Seconds (<=0: no limit), "
+                        "not in batch mode")
+    optgrp.add_argument('--warm_select', type=str,
+                        action='append', metavar='Pattern',
+                        help="Patterns for selecting figures to warm up, "
+                        "(default: all)")
+    optgrp.add_argument('--warm_workers', type=int, metavar='N', default=1,
+                        help="Number of warm-up threads, "
+                        "(default: %(default)s)")
     return parser
 
 
@@ -118,6 +138,9 @@ def get_parser_plot(subparsers, parents=[]):
                         choices=['png', 'pdf', 'ps', 'eps', 'svg', 'jpg'],
                         help="Extension of saved figures, "
                         "(default:  %(default)s)")
+    optgrp.add_argument('--resume', action='store_true',
+                        help="Reuse the latest figures directory, "
+                        "and skip figures already saved in it")
     return parser
 
 
@@ -130,6 +153,203 @@ def get_parser():
     return {'top': top, 'convert': convert, 'plot': plot}
 
 
+def get_figdir(pckpath, resume=False):
+    '''
+    Return figures directory beside pickled data *pckpath*, create it if
+    needed. If *resume* is True, return the latest one if it exists.
+    '''
+    prefix = os.path.splitext(pckpath)[0]
+    prefix = os.path.splitext(prefix)[0]
+    if resume:
+        olddirs = sorted(d for d in glob.glob(
+            '%s-figures-*' % glob.escape(prefix)) if os.path.isdir(d))
+        if olddirs:
+            return olddirs[-1]
+    figdir = '%s-figures-%s' % (prefix, time.strftime('%F-%H'))
+    # other MPI ranks or batch workers may create it at the same time
+    os.makedirs(figdir, exist_ok=True)
+    return figdir
+
+
+def warm_script(gdp, args):
+    '''
+    Warm up dig results of *gdp* with options in *args*,
+    wait for it, cancel it by Ctrl-C.
+    '''
+    handle = gdp.warm(args.warm_select or ['.*'],
+                      budget_seconds=args.warm, workers=args.warm_workers)
+    try:
+        handle.wait()
+    except KeyboardInterrupt:
+        log.info("Cancel warm-up, wait for the running digs ...")
+        handle.cancel()
+        handle.wait()
+    log.info("Warm-up: %d done, %d failed, %d skipped."
+             % (len(handle.done), len(handle.failed), len(handle.skipped)))
+
+
+# # Start Batch Part
+
+_batch_lock = None
+_batch_options = None
+_batch_processors = {}
+
+
+def _batch_initializer(lock, options):
+    '''Set the results file lock and processor options in workers.'''
+    global _batch_lock, _batch_options
+    _batch_lock, _batch_options = lock, options
+
+
+def _batch_filesave_new_dig(self, *args, **kwargs):
+    '''Save dig results in file, with the lock shared by all workers.'''
+    with _batch_lock:
+        Processor._filesave_new_dig(self, *args, **kwargs)
+
+
+def _batch_get_processor(path, overwrite=False):
+    '''Get processor of case *path*, cached in each worker.'''
+    if path in _batch_processors:
+        return _batch_processors[path]
+    opts = _batch_options
+    gdpcls = get_processor(name=opts['name'], parallel='off')
+    # same class name, only file saving is locked
+    gdpcls = type(gdpcls.__name__, (gdpcls,), {
+        '__slots__': [], '_filesave_new_dig': _batch_filesave_new_dig})
+    gdp = gdpcls(
+        path,
+        add_desc=opts['add_desc'],
+        filenames_filter=opts['filenames_filter'],
+        savetype=opts['savetype'],
+        overwrite=overwrite,
+        Sid=opts['Sid'],
+        datagroups_filter=opts['datagroups_filter'],
+        add_visplter=opts['add_visplter'],
+    )
+    if not opts['Sid'] and gdp.visplter:
+        gdp.visplter.subprocess_fix_backend_etc(mpl_backend='agg')
+        if opts['style']:
+            gdp.visplter.style = gdp.visplter.check_style(opts['style'])
+    _batch_processors[path] = gdp
+    return gdp
+
+
+def _batch_prepare(path, overwrite, select):
+    '''
+    Convert case *path* if needed. Return pickled data path and
+    sorted figlabels matching *select*, or None and reason if failed.
+    '''
+    gdp = _batch_get_processor(path, overwrite=overwrite)
+    if _batch_options['Sid']:
+        if gdp.pcksaver is None or not os.path.isfile(gdp.pcksaver.path):
+            return None, 'Failed to convert'
+        return gdp.pcksaver.path, []
+    if gdp.pckloader is None or gdp.visplter is None:
+        return None, 'Failed to pick up'
+    figurelabels = set()
+    for pattern in select:
+        figurelabels.update(gdp.refind(pattern))
+    return gdp.pckloader.path, sorted(figurelabels)
+
+
+def _batch_plot(path, figlabel, figpath):
+    '''Plot *figlabel* of case *path*, save it in *figpath*.'''
+    gdp = _batch_get_processor(path)
+    accfiglabel = gdp.visplt(figlabel, show=False)
+    try:
+        if not accfiglabel:
+            raise ValueError("Failed to create figure %s!" % figlabel)
+        gdp.visplter.save_figure(accfiglabel, figpath)
+    finally:
+        gdp.visplter.close_figure('all')
+    return figpath
+
+
+def batch_script(args):
+    '''
+    Convert and plot all cases in *args.casepath* with *args.jobs*
+    worker processes. Figures of a case are queued as soon as the case
+    is converted, so converting and plotting of cases overlap.
+    Converted data and figures already saved (with *args.resume*)
+    are skipped.
+    '''
+    N, plot = len(args.casepath), args.subcmd == 'plot'
+    name = Processor_Alias.get(args.processor, args.processor)
+    digstats = get_digstats()
+    options = dict(
+        name=name,
+        add_desc=args.add_desc,
+        filenames_filter=args.filenames_filter,
+        savetype=args.savetype,
+        Sid=not plot,
+        datagroups_filter=args.datagroups_filter if plot else None,
+        add_visplter='mpl::' if plot else None,
+        style=args.style if plot else None,
+    )
+    log.info("Batch: %d cases, %d worker processes." % (N, args.jobs))
+    start, done, failed, skipped = time.time(), 0, 0, 0
+    with concurrent.futures.ProcessPoolExecutor(
+            args.jobs, initializer=_batch_initializer,
+            initargs=(multiprocessing.Lock(), options)) as executor:
+        tasks = {}
+        for path in args.casepath:
+            fut = executor.submit(_batch_prepare, path, args.overwrite,
+                                  args.select if plot else [])
+            tasks[fut] = (path, None)
+        total = len(tasks)
+        while tasks:
+            finished, _ = concurrent.futures.wait(
+                tasks, return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in finished:
+                path, figlabel = tasks.pop(fut)
+                done += 1
+                try:
+                    res = fut.result()
+                except Exception:
+                    failed += 1
+                    if figlabel:
+                        log.error("Failed to plot %s in case %s!"
+                                  % (figlabel, path), exc_info=1)
+                    else:
+                        log.error("Failed to pick up case %s!" % path,
+                                  exc_info=1)
+                    continue
+                if figlabel:
+                    log.debug("Saved %s" % res)
+                    continue
+                pckpath, figurelabels = res
+                if pckpath is None:
+                    failed += 1
+                    log.error("%s %s!" % (figurelabels, path))
+                    continue
+                if not figurelabels:
+                    continue
+                figdir = get_figdir(pckpath, resume=args.resume)
+                # longest first, by history of visplt time
+                order = digstats.schedule([digstats.predict(
+                    'visplt:%s/%s' % (name, _fl)) for _fl in figurelabels],
+                    args.jobs)[0]
+                for idx in order:
+                    _fl = figurelabels[idx]
+                    figpath = os.path.join(figdir, '%s.%s' % (
+                        _fl.replace('/', '-'), args.figext))
+                    if os.path.isfile(figpath):
+                        skipped += 1
+                        continue
+                    fut = executor.submit(_batch_plot, path, _fl, figpath)
+                    tasks[fut] = (path, _fl)
+                    total += 1
+            elapsed = time.time() - start
+            eta = elapsed / done * (total - done)
+            log.info("Batch: %d/%d tasks done, %d failed, %d skipped, "
+                     "elapsed %.1fs, ETA %.1fs."
+                     % (done, total, failed, skipped, elapsed, eta))
+    log.info("Batch: %d tasks done in %.1fs, %d failed, %d skipped."
+             % (done, time.time() - start, failed, skipped))
+
+# # End Batch Part
+
+
 def cli_script():
     '''Entry point for gdpy3'''
     parserlib = get_parser()
@@ -173,6 +393,10 @@ def cli_script():
                 sys.exit()
         plot_style = None
 
+    if args.jobs > 1:
+        batch_script(args)
+        sys.exit()
+
     N = len(args.casepath)
     for i, path in enumerate(args.casepath, 1):
         log.info("Case(%d/%d) path: %s" % (i, N, path))
@@ -191,6 +415,17 @@ def cli_script():
                 if (gdp.pcksaver is None
                         or not os.path.isfile(gdp.pcksaver.path)):
                     log.error("Failed to convert %s!" % path)
+                elif args.warm is not None:
+                    gdp = get_processor(
+                        gdp.pcksaver.path,
+                        name=args.processor,
+                        parallel=args.parallel,
+                        add_visplter=None,
+                    )
+                    if gdp.pckloader is None:
+                        log.error("Failed to warm up %s!" % path)
+                    else:
+                        warm_script(gdp, args)
             elif args.subcmd == 'plot':
                 gdp = get_processor(
                     path,
@@ -207,6 +442,8 @@ def cli_script():
                 if gdp.pckloader is None or gdp.visplter is None:
                     log.error("Failed to plot %s!" % path)
                     continue
+                if args.warm is not None:
+                    warm_script(gdp, args)
                 # plot figures
                 figurelabels = set()
                 for select in args.select:
@@ -220,11 +457,17 @@ def cli_script():
                         plot_style = []
                 if plot_style:
                     gdp.visplter.style = plot_style
-                prefix = os.path.splitext(gdp.pckloader.path)[0]
-                prefix = os.path.splitext(prefix)[0]
-                figdir = '%s-figures-%s' % (prefix, time.strftime('%F-%H'))
-                if not os.path.isdir(figdir):
-                    os.mkdir(figdir)
+                figdir = get_figdir(gdp.pckloader.path, resume=args.resume)
+                if args.resume:
+                    figurelabels = {_fl for _fl in figurelabels
+                                    if not os.path.isfile(os.path.join(
+                                        figdir, '%s.%s' % (
+                                            _fl.replace('/', '-'),
+                                            args.figext)))}
+                    if len(figurelabels) == 0:
+                        log.info("Case(%d/%d), all figures are saved in %s."
+                                 % (i, N, figdir))
+                        continue
                 M = len(figurelabels)
                 if args.parallel == 'off':
                     for j, _fl in enumerate(sorted(figurelabels), 1):
@@ -9,13 +9,171 @@ Contains core base class.
 import re
 import types
 import functools
+import threading
 
 from ..glogger import getGLogger
 
-__all__ = ['BaseCore']
+__all__ = ['BaseCore', 'ItemsIndex']
 log = getGLogger('G')
 
 
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    '''Return compiled regular expression of str *pattern*.'''
+    return re.compile(pattern)
+
+
+def _slashfree_class(content):
+    '''Check characters set *content* in '[...]' cannot match '/'.'''
+    if not content or content.startswith('^') or '\\' in content:
+        return False
+    if '/' in content:
+        return False
+    for k in range(1, len(content) - 1):
+        if content[k] == '-' and content[k-1] <= '/' <= content[k+1]:
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def split_pattern(pattern):
+    '''
+    Split *pattern* at its first top-level '/' to (head, tail),
+    compiled head for the group part of items, tail for the name part.
+    Return None if head can match '/', or it is not sure.
+    Tail is None if it may depend on head, like backreferences.
+    '''
+    i, depth, head = 0, 0, None
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            if head is None and pattern[i+1:i+2] not in tuple('dws._-'):
+                return None
+            i += 2
+            continue
+        elif c == '[':
+            j = pattern.find(']', i + 2)
+            if j < 0:
+                return None
+            if head is None and not _slashfree_class(pattern[i+1:j]):
+                return None
+            i = j + 1
+            continue
+        elif c == '(':
+            depth += 1
+            if pattern.startswith('(?', i):
+                if pattern.startswith('(?P<', i):
+                    i = pattern.find('>', i)
+                elif pattern.startswith('(?:', i):
+                    i += 2
+                elif head is None or not pattern.startswith(
+                        ('(?=', '(?!', '(?<', '(?P='), i):
+                    # inline flags, etc.
+                    return None
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return None
+        elif head is None:
+            if c in '.$':
+                return None
+            elif c == '/':
+                if depth != 0:
+                    return None
+                head, tailstart = pattern[:i], i + 1
+        i += 1
+    if head is None:
+        return None
+    tail = pattern[tailstart:]
+    try:
+        head = re.compile(head)
+        if re.search(r'\\[1-9]|\(\?P=|\(\?<[=!]', tail):
+            tail = None
+        else:
+            tail = re.compile(tail)
+    except re.error:
+        return None
+    return head, tail
+
+
+class ItemsIndex(object):
+    '''
+    Index of items, like loader keys, to match regular expressions.
+
+    Items are bucketed by group, the part before first '/',
+    and by name, the rest part. Head and tail of a pattern are matched
+    with groups and names first, then the full pattern is only matched
+    with the remaining items.
+
+    Attributes
+    ----------
+    items: tuple or list
+    '''
+    __slots__ = ['items', '_group', '_name', '_bygroup', '_byname']
+    _lock = threading.Lock()
+    _last = None
+
+    def __init__(self, items):
+        self.items = items
+        self._group, self._name = [], []
+        self._bygroup, self._byname = {}, {}
+        for i, it in enumerate(items):
+            g, sep, n = it.partition('/')
+            if sep:
+                self._bygroup.setdefault(g, []).append(i)
+                self._byname.setdefault(n, []).append(i)
+            else:
+                g = n = None
+            self._group.append(g)
+            self._name.append(n)
+
+    @classmethod
+    def get(cls, items):
+        '''
+        Return index of *items*.
+        Index of the last tuple *items* is reused.
+        '''
+        if not isinstance(items, tuple):
+            return cls(items)
+        with cls._lock:
+            if cls._last is None or cls._last.items is not items:
+                cls._last = cls(items)
+            return cls._last
+
+    def _candidates(self, head, tail):
+        groups = [g for g in self._bygroup if head.fullmatch(g)]
+        size = sum(len(self._bygroup[g]) for g in groups)
+        if tail is not None:
+            names = [n for n in self._byname if tail.match(n)]
+            if sum(len(self._byname[n]) for n in names) < size:
+                groups = set(groups)
+                idx = [i for n in names for i in self._byname[n]
+                       if self._group[i] in groups]
+            else:
+                names = set(names)
+                idx = [i for g in groups for i in self._bygroup[g]
+                       if self._name[i] in names]
+        else:
+            idx = [i for g in groups for i in self._bygroup[g]]
+        idx.sort()
+        return [self.items[i] for i in idx]
+
+    def match(self, pattern):
+        '''Return list of (item, match object) matched with *pattern*.'''
+        split = split_pattern(pattern)
+        if split is None:
+            candidates = self.items
+        else:
+            candidates = self._candidates(*split)
+        regex = compile_pattern(pattern)
+        res = []
+        for it in candidates:
+            m = regex.match(it)
+            if m:
+                res.append((it, m))
+        return res
+
+
 class BaseCore(object):
     '''
     Base core class for Converter, Digger, Exporter.
@@ -59,22 +217,30 @@ class BaseCore(object):
         in list *all_items*.
         After (S1, S2), (S1, S2.1) found, (S1) will join in all of them.
         '''
+        index = ItemsIndex.get(all_items)
         res = {}
+        # element -> sections containing it, for joining partial sections
+        elemsect = {}
         for pat in cls.itemspattern:
-            for it in all_items:
-                m = re.match(pat, it)
-                if m:
-                    sect = m.groups()
-                    if sect in res:
-                        res[sect].append(it)
-                    else:
-                        subkey = False
-                        for key in res.keys():
-                            if set(sect).issubset(set(key)):
-                                res[key].append(it)
-                                subkey = True
-                        if not subkey:
-                            res[sect] = [it]
+            for it, m in index.match(pat):
+                sect = m.groups()
+                if sect in res:
+                    res[sect].append(it)
+                    continue
+                if sect:
+                    elems = set(sect)
+                    candidates = min((elemsect.get(e, ()) for e in elems),
+                                     key=len)
+                    keys = [k for k in candidates if elems.issubset(k)]
+                else:
+                    keys = list(res)
+                if keys:
+                    for key in keys:
+                        res[key].append(it)
+                else:
+                    res[sect] = [it]
+                    for e in set(sect):
+                        elemsect.setdefault(e, []).append(sect)
         return res
 
     @classmethod
@@ -82,11 +248,10 @@ class BaseCore(object):
         '''
         Return items matched with :attr:`commonpattern` in list *all_items*.
         '''
+        index = ItemsIndex.get(all_items)
         res = []
         for pat in cls.commonpattern:
-            for it in all_items:
-                if re.match(pat, it):
-                    res.append(it)
+            res.extend(it for it, m in index.match(pat))
         return res
 
     @classmethod
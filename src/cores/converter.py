@@ -6,7 +6,9 @@
 Contains Converter core class.
 '''
 
+import os
 import re
+import concurrent.futures
 
 from .base import BaseCore, AppendDocstringMeta
 from ..glogger import getGLogger
@@ -29,8 +31,11 @@ class Converter(BaseCore, metaclass=AppendDocstringMeta):
         group name of pickled data
     short_files: str
         short files if :attr:`files` list is too long
+    multithread: int
+        max number of threads to read files in :meth:`_map_files`
     '''
     __slots__ = ['_files', '_group']
+    multithread = min(32, (os.cpu_count() or 1) + 4)
 
     @property
     def rawloader(self):
@@ -100,6 +105,22 @@ class Converter(BaseCore, metaclass=AppendDocstringMeta):
             self._files = self.items
         self._group = '/'.join(self.section)
 
+    def _map_files(self, func, files=None):
+        '''
+        Return list of func(f) for f in *files*, default :attr:`files`.
+        Use threads if :attr:`rawloader` is thread-safe,
+        raw data in a directory or zip archive.
+        '''
+        files = self.files if files is None else files
+        nworkers = min(self.multithread, len(files))
+        if (nworkers > 1 and
+                self.rawloader.loader_type in ('directory', 'zipfile')):
+            clog.debug('%d threads to read files!' % nworkers)
+            with concurrent.futures.ThreadPoolExecutor(nworkers) as executor:
+                return list(executor.map(func, files))
+        else:
+            return [func(f) for f in files]
+
     def _convert(self):
         '''Convert raw data.'''
         raise NotImplementedError()
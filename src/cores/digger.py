@@ -6,16 +6,46 @@
 Contains Digger core class.
 '''
 
-import re
+import sys
 import time
+import hashlib
+import inspect
+import functools
 
-from .base import BaseCore, AppendDocstringMeta
+from .base import BaseCore, AppendDocstringMeta, compile_pattern
 from ..glogger import getGLogger
+from .. import __gversion__
 
 __all__ = ['Digger']
 dlog = getGLogger('D')
 
 
+@functools.lru_cache(maxsize=None)
+def _modules_digest(modnames):
+    '''Return digest of the source code of modules *modnames*.'''
+    sha1 = hashlib.sha1()
+    for name in modnames:
+        try:
+            source = inspect.getsource(sys.modules[name])
+        except Exception:
+            source = '%s %s' % (name, __gversion__)
+        sha1.update(source.encode())
+    return sha1.hexdigest()
+
+
+def _freeze(value):
+    '''Return hashable *value*, lists and dicts to tuples.'''
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
 class Digger(BaseCore, metaclass=AppendDocstringMeta):
     '''
     Calculate pickled data in pckloader needed by figure.
@@ -44,12 +74,28 @@ class Digger(BaseCore, metaclass=AppendDocstringMeta):
         kwargs option info for building widgets
     post_template: str
         chosen template in :meth:`post_dig`
+    version: None or str
+        declared version of the dig code, see :meth:`code_version`
+    refine_kwargs: list
+        names of :meth:`dig` kwargs only used by cheap post-processing,
+        see :meth:`compute`
+
+    Notes
+    -----
+    1. Intermediate results shared by diggers can be declared as named
+       stages, see :meth:`stage`. Stages which use other stages form a
+       DAG, and each stage is computed once per set of arguments.
+    2. :meth:`_dig` can run its heavy part by :meth:`compute`, which is
+       cached separately from :attr:`refine_kwargs`. So changing only
+       them, like GUI slider moves, just redoes the cheap rest.
     '''
     __slots__ = ['_group', '_fignum', 'kwoptions']
     nitems = '?'
     neededpattern = 'ALL'
     numseeds = None
     post_template = ''
+    version = None
+    refine_kwargs = []
 
     @property
     def pckloader(self):
@@ -77,34 +123,58 @@ class Digger(BaseCore, metaclass=AppendDocstringMeta):
         return '%s/%s' % (self._group, self._fignum)
 
     @classmethod
-    def generate_cores(cls, pckloader):
-        '''Return generated Core instances for *pckloader*.'''
+    def generate_specs(cls, pckloader):
+        '''
+        Return list of (core, numseed) matched in *pckloader*.
+        Cores are not initialized by :meth:`__second_init__`,
+        so no data is read.
+        '''
         dcss = super(Digger, cls).generate_cores(
             pckloader, pckloader.datakeys, duplicate=cls.numseeds)
         res = []
-        figlabels = []
         if cls.numseeds:
             for dcs in dcss:
                 assert len(cls.numseeds) == len(dcs)
                 # only check first one
                 if dcs[0].check_needed_datakeys():
-                    for idx, dc in enumerate(dcs):
-                        if dc.__second_init__(numseed=cls.numseeds[idx]):
-                            res.append(dc)
-                            figlabels.append(dc.figlabel)
-
+                    res.extend(zip(dcs, cls.numseeds))
         else:
             for dc in dcss:
                 if dc.check_needed_datakeys():
-                    if dc.__second_init__():
-                        res.append(dc)
-                        figlabels.append(dc.figlabel)
+                    res.append((dc, None))
+        return res
+
+    @classmethod
+    def generate_cores(cls, pckloader):
+        '''Return generated Core instances for *pckloader*.'''
+        res = []
+        figlabels = []
+        for dc, numseed in cls.generate_specs(pckloader):
+            if dc.__second_init__(numseed=numseed):
+                res.append(dc)
+                figlabels.append(dc.figlabel)
         if res:
             dlog.debug("%s: loader, %s; %d figlabels, %s."
                        % (res[0].clsname, pckloader.path,
                           len(figlabels), figlabels))
         return res
 
+    @classmethod
+    def code_version(cls):
+        '''
+        Return :attr:`version` if declared, otherwise a digest of the
+        source code of modules which define this class and its bases.
+        Results of different versions are not shared.
+        '''
+        if cls.version is not None:
+            return str(cls.version)
+        modnames = []
+        for c in cls.__mro__:
+            if (issubclass(c, Digger) and c is not Digger
+                    and c.__module__ not in modnames):
+                modnames.append(c.__module__)
+        return _modules_digest(tuple(modnames))
+
     def __second_init__(self, numseed=None):
         try:
             self.kwoptions = {}
@@ -129,12 +199,8 @@ class Digger(BaseCore, metaclass=AppendDocstringMeta):
             neededpattern = self.neededpattern
         keys = self.srckeys + self.extrakeys
         for pat in neededpattern:
-            match = False
-            for it in keys:
-                if re.match(pat, it):
-                    match = True
-                    break
-            if not match:
+            regex = compile_pattern(pat)
+            if not any(regex.match(it) for it in keys):
                 return False
         return True
 
@@ -189,6 +255,30 @@ class Digger(BaseCore, metaclass=AppendDocstringMeta):
         end = time.time()
         return results, self.str_dig_kwargs(acckwargs), end-start
 
+    def stage(self, name, func, *args):
+        '''
+        Get intermediate result of stage *name*, ``func(pckloader, *args)``.
+        It is cached in :attr:`pckloader` by *name* and hashable *args*,
+        so all diggers using the same stage compute it only once.
+        *func* can get other stages by ``pckloader.get_derived``.
+        Results are shared, do not change them in place.
+        '''
+        return self.pckloader.get_derived(name, func, *args)
+
+    def compute(self, func, kwargs):
+        '''
+        Get results of the heavy part of :meth:`_dig`, ``func(kwargs)``.
+        It is a stage of :attr:`figlabel`, cached by the accepted *kwargs*
+        which are not in :attr:`refine_kwargs`, so *func* must not use
+        them. Results are shared, do not change them in place.
+        '''
+        key = _freeze({k: v for k, v in kwargs.items()
+                       if k not in self.refine_kwargs
+                       and self.dig.__doc__.find('*%s*' % k) > 0})
+        return self.pckloader.get_derived(
+            'compute:%s' % self.figlabel, lambda loader, key: func(kwargs),
+            key)
+
     def _post_dig(self, results):
         '''post-dig results'''
         raise NotImplementedError()
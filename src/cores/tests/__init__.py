@@ -5,6 +5,7 @@
 
 class RawLoader(object):
     path = 'test/rawlodaer'
+    loader_type = 'directory'
     filenames = [
         'g.out', 'eq.out', 's0.out', 's2.out', 's4.out',
         'p/s0_t0.out', 'p/s0_t1.out', 'p/s0_t2.out',
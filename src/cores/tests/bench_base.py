@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Benchmark indexed pattern matching against the old loop version.
+Run it by ``python benchmarks-run.py bench_base.py``.
+'''
+
+import re
+import time
+import unittest
+
+from ..base import BaseCore, ItemsIndex
+
+NSNAP, NKEY, NTRACKP = 4000, 24, 4000
+
+
+def _old_match_items(cls, all_items):
+    res = {}
+    for pat in cls.itemspattern:
+        for it in all_items:
+            m = re.match(pat, it)
+            if m:
+                sect = m.groups()
+                if sect in res:
+                    res[sect].append(it)
+                else:
+                    subkey = False
+                    for key in res.keys():
+                        if set(sect).issubset(set(key)):
+                            res[key].append(it)
+                            subkey = True
+                    if not subkey:
+                        res[sect] = [it]
+    return res
+
+
+def _old_match_common(cls, all_items):
+    res = []
+    for pat in cls.commonpattern:
+        for it in all_items:
+            if re.match(pat, it):
+                res.append(it)
+    return res
+
+
+class _SnapCore(BaseCore):
+    nitems = '+'
+    itemspattern = ['^(?P<section>snap\d{5})/(?P<f>(?:phi|apara))-flux$',
+                    '^(?P<section>snap\d{5})/mtgrid\+1$']
+    commonpattern = ['gtc/tstep', 'gtc/arr2']
+
+
+class _PhiCore(BaseCore):
+    nitems = '+'
+    itemspattern = ['^(?P<section>snap\d{5})/phi_zeta_psi_(?P<j>\d+)',
+                    '^(?P<section>snap\d{5})/j_list']
+    commonpattern = ['gtc/tstep']
+
+
+class _TrackCore(BaseCore):
+    nitems = '?'
+    itemspattern = [r'^(?P<s>trackp)/(?P<particle>(?:ion|electron))'
+                    + r'-(?P<tag>\d+-\d+)$']
+    commonpattern = ['gtc/r0']
+
+
+class BenchItemsIndex(unittest.TestCase):
+    '''
+    Indexed match_items, match_common, same results as old loop versions.
+    '''
+
+    def setUp(self):
+        names = ['phi-flux', 'apara-flux', 'mtgrid+1', 'j_list',
+                 'phi_zeta_psi_4', 'phi_zeta_psi_8', 'ion-profile']
+        names += ['key%02d' % i for i in range(NKEY - len(names))]
+        keys = ['gtc/tstep', 'gtc/arr2', 'gtc/r0']
+        keys += ['snap%05d/%s' % (s, n) for s in range(NSNAP) for n in names]
+        keys += ['trackp/ion-%d-%d' % (t, t % 7) for t in range(NTRACKP)]
+        self.keys = tuple(keys)
+
+    def test_bench_match(self):
+        told = tnew = 0
+        ItemsIndex.get(self.keys)
+        for cls in (_SnapCore, _PhiCore, _TrackCore):
+            start = time.time()
+            old = (_old_match_items(cls, self.keys),
+                   _old_match_common(cls, self.keys))
+            told += time.time() - start
+            start = time.time()
+            new = cls.match_items(self.keys), cls.match_common(self.keys)
+            tnew += time.time() - start
+            self.assertEqual(old, new)
+        start = time.time()
+        ItemsIndex(self.keys)
+        tindex = time.time() - start
+        print("\nmatch %d keys: old %.3fs, new %.3fs + index %.3fs"
+              % (len(self.keys), told, tnew, tindex))
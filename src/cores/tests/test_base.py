@@ -2,10 +2,11 @@
 
 # Copyright (c) 2020 shmilee
 
+import re
 import unittest
 
 from . import RawLoader, PckLoader
-from ..base import BaseCore
+from ..base import BaseCore, ItemsIndex, split_pattern
 
 
 class TestBaseCore(unittest.TestCase):
@@ -93,3 +94,24 @@ class TestBaseCore(unittest.TestCase):
         self.assertEqual(len(cores), 2)
         self.assertEqual(cores[0].section, ('tp', 'i'))
         self.assertEqual(cores[0].items, ['tp/i-1', 'tp/i-2', 'tp/i-3'])
+
+    def test_items_index(self):
+        self.assertIsNone(split_pattern('.*/(?P<section>eq).out$'))
+        self.assertIsNone(split_pattern('^(?P<s>g)\.out$'))
+        self.assertIsNone(split_pattern('^a/b|c/d'))
+        self.assertIsNone(split_pattern('^[+-0]/b'))
+        self.assertIsNone(split_pattern('(?i)^s\d/p'))
+        head, tail = split_pattern('^(?P<s>s\d)/(?P<p>(?:p|a))$')
+        self.assertTrue(head.fullmatch('s2'))
+        self.assertTrue(tail.match('a'))
+        head, tail = split_pattern(r'^(?P<s>s\d)/(?P=s)')
+        self.assertIsNone(tail)
+        keys = tuple(self.pck.datakeys)
+        index = ItemsIndex.get(keys)
+        self.assertIs(ItemsIndex.get(keys), index)
+        self.assertIsNot(ItemsIndex.get(self.pck.datakeys), index)
+        for pat in ['^(?P<s>s\d)/(?P<p>(?:p|a))$', '^(?P<s>s\d)/(?:x|y)$',
+                    '^tp/(?P<p>(?:i|e))-\d$', '.*/i', '^g/c']:
+            self.assertEqual(
+                [it for it, m in index.match(pat)],
+                [it for it in keys if re.match(pat, it)])
@@ -3,6 +3,7 @@
 # Copyright (c) 2020 shmilee
 
 import unittest
+import threading
 
 from . import RawLoader
 from ..converter import Converter
@@ -59,3 +60,20 @@ class TestConverter(unittest.TestCase):
         self.assertEqual(cores[0].group, 's0')
         self.assertEqual(cores[0].convert(), None)
         self.assertEqual(cores[0].short_files, 'p/s0_t*.out')
+
+    def test_map_files(self):
+        class ImpConverter4(Converter):
+            nitems = '+'
+            itemspattern = ['^p/(?P<section>s\d)_t\d.out$']
+
+        core = ImpConverter4.generate_cores(self.raw)[0]
+        names = set()
+
+        def func(f):
+            names.add(threading.current_thread().name)
+            return f
+        self.assertEqual(core._map_files(func), core.files)
+        self.assertNotIn(threading.current_thread().name, names)
+        core.multithread = 1
+        self.assertEqual(core._map_files(func, range(3)), [0, 1, 2])
+        self.assertIn(threading.current_thread().name, names)
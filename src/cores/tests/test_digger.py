@@ -68,6 +68,37 @@ class ImpDigger4(ImpDigger2):
         self._fignum = '%s_%s' % (self.section[1], numseed)
 
 
+def _stage_count(pckloader, key):
+    _stage_count.calls += 1
+    return pckloader.get(key) + 1
+
+
+class ImpDigger5(ImpDigger1):
+    '''Get four cores like ImpDigger1, sharing one stage of 'g/c'.'''
+
+    def _dig(self, kwargs):
+        return dict(c=self.stage('c+1', _stage_count, 'g/c')), {}
+
+
+class ImpDigger6(ImpDigger1):
+    '''Get four cores like ImpDigger1, with compute and refine kwargs.'''
+    refine_kwargs = ['scale']
+
+    def _compute(self, kwargs):
+        _stage_count.calls += 1
+        return self.pckloader.get(self.srckeys[0]) + kwargs.get('add', 0)
+
+    def _dig(self, kwargs):
+        '''
+        kwargs
+        ------
+        *add*: int, default 0
+        *scale*: int, default 1
+        '''
+        value = self.compute(self._compute, kwargs)
+        return dict(f=value * kwargs.get('scale', 1)), {}
+
+
 class TestDigger(unittest.TestCase):
     '''
     Test class Digger
@@ -109,3 +140,30 @@ class TestDigger(unittest.TestCase):
         self.assertEqual(cores[1].fignum, 'i_a')
         self.assertEqual(cores[2].fignum, 'e_1')
         self.assertEqual(cores[3].fignum, 'e_a')
+
+    def test_shared_stage(self):
+        from ...loaders import get_pckloader
+        pck = get_pckloader(dict(
+            g=dict(c=1), his=dict(n=2),
+            da={'i-p-f': 3, 'i-m-f': 4, 'e-p-f': 5, 'e-m-f': 6}))
+        _stage_count.calls = 0
+        cores = ImpDigger5.generate_cores(pck)
+        self.assertEqual(len(cores), 4)
+        for core in cores:
+            self.assertEqual(core.dig()[0]['c'], 2)
+        self.assertEqual(_stage_count.calls, 1)
+
+    def test_compute_refine_kwargs(self):
+        from ...loaders import get_pckloader
+        pck = get_pckloader(dict(
+            g=dict(c=1), his=dict(n=2),
+            da={'i-p-f': 3, 'i-m-f': 4, 'e-p-f': 5, 'e-m-f': 6}))
+        _stage_count.calls = 0
+        core = ImpDigger6.generate_cores(pck)[0]
+        self.assertEqual(core.dig()[0]['f'], 3)
+        for scale in (2, 3):
+            self.assertEqual(core.dig(scale=scale)[0]['f'], 3 * scale)
+        self.assertEqual(_stage_count.calls, 1)
+        self.assertEqual(core.dig(add=1, scale=2)[0]['f'], 8)
+        self.assertEqual(core.dig(add=1)[0]['f'], 4)
+        self.assertEqual(_stage_count.calls, 2)
@@ -9,6 +9,7 @@ Contains loader base class.
 import os
 import re
 import types
+import threading
 import contextlib
 
 from ..glogger import getGLogger
@@ -270,8 +271,8 @@ class BasePckLoader(BaseLoader):
         a function to filter datagroups
         example, lambda group: False if group in ['ex1', 'ex2'] else True
     '''
-    __slots__ = ['datakeys', 'datagroups',
-                 'desc', 'description', 'cache']
+    __slots__ = ['datakeys', 'datagroups', 'desc', 'description',
+                 'cache', '_lock', '_keylocks', '_groupindex']
 
     def _special_getgroups(self, pathobj):
         '''
@@ -281,6 +282,7 @@ class BasePckLoader(BaseLoader):
 
     def __init__(self, path, datagroups_filter=None):
         super(BasePckLoader, self).__init__(path)
+        self._lock = threading.Lock()
         self.update(datagroups_filter=datagroups_filter)
 
     def update(self, datagroups_filter=None):
@@ -310,6 +312,8 @@ class BasePckLoader(BaseLoader):
             log.error("Failed to read path %s." % self.path, exc_info=1)
             raise
         self.cache = {}
+        self._keylocks = {}
+        self._groupindex = None
 
     def keys(self):
         return self.datakeys
@@ -317,18 +321,85 @@ class BasePckLoader(BaseLoader):
     def groups(self):
         return self.datagroups
 
-    def get(self, key):
+    def _get_groupindex(self):
         '''
-        Get value by ``key`.
+        Return index {group: [keys]}, built once from :attr:`datakeys`
+        and then updated incrementally by :meth:`add_keys`.
+        '''
+        if self._groupindex is None:
+            with self._lock:
+                if self._groupindex is None:
+                    index = {}
+                    for k in self.datakeys:
+                        index.setdefault(os.path.dirname(k), []).append(k)
+                    self._groupindex = index
+        return self._groupindex
+
+    def group_keys(self, group):
+        '''
+        Return the keys in *group*, empty tuple if *group* not found.
+        '''
+        return tuple(self._get_groupindex().get(group, ()))
+
+    def __contains__(self, item):
+        return item in self._get_groupindex().get(os.path.dirname(item), ())
+
+    def add_keys(self, *keys):
+        '''
+        Add *keys* which have been written to path object since opened,
+        without reopening it. Update :attr:`datakeys`, :attr:`datagroups`
+        and the group index, drop old cached values of *keys*.
+        '''
+        index = self._get_groupindex()
+        with self._lock:
+            newkeys, newgroups = [], []
+            for k in keys:
+                self.cache.pop(k, None)
+                group = os.path.dirname(k)
+                if group not in index:
+                    index[group] = []
+                    if group:
+                        newgroups.append(group)
+                if k not in index[group]:
+                    index[group].append(k)
+                    newkeys.append(k)
+            if newkeys:
+                self.datakeys = self.datakeys + tuple(newkeys)
+            if newgroups:
+                self.datagroups = tuple(
+                    sorted(self.datagroups + tuple(newgroups)))
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            if key not in self._keylocks:
+                self._keylocks[key] = threading.Lock()
+            return self._keylocks[key]
+
+    def _get_cache_or_load(self, key):
+        '''
+        Load *key* from path object if it is not cached.
+        A lock per key makes sure that each key is loaded only once
+        when threads ask for it together, while different keys can be
+        loaded in parallel.
         '''
-        if key not in self.datakeys:
-            raise KeyError("%s is not in '%s'" % (key, self.path))
         if key in self.cache:
             return self.cache[key]
-        try:
+        with self._get_key_lock(key):
+            if key in self.cache:
+                return self.cache[key]
             log.debug("Getting key '%s' from %s ..." % (key, self.path))
             value = self._special_get(self.pathobj, key)
             self.cache[key] = value
+            return value
+
+    def get(self, key):
+        '''
+        Get value by ``key`. Thread-safe.
+        '''
+        if key not in self:
+            raise KeyError("%s is not in '%s'" % (key, self.path))
+        try:
+            value = self._get_cache_or_load(key)
         except (IOError, ValueError):
             log.error("Failed to get '%s' from %s!" %
                       (key, self.path), exc_info=1)
@@ -339,7 +410,7 @@ class BasePckLoader(BaseLoader):
 
     def get_many(self, *keys):
         '''
-        Get values by ``keys``. Return a tuple of values.
+        Get values by ``keys``. Return a tuple of values. Thread-safe.
         '''
         result = [self.cache[k] if k in self.cache else None for k in keys]
         idxtodo = [i for i, k in enumerate(result) if k is None]
@@ -348,10 +419,7 @@ class BasePckLoader(BaseLoader):
         try:
             for i in idxtodo:
                 key = keys[i]
-                log.debug("Getting key '%s' from %s ..." % (key, self.path))
-                value = self._special_get(self.pathobj, key)
-                result[i] = value
-                self.cache[key] = value
+                result[i] = self._get_cache_or_load(key)
         except (IOError, ValueError):
             if 'key' in dir():
                 log.error("Failed to get '%s' from %s!" %
@@ -361,5 +429,56 @@ class BasePckLoader(BaseLoader):
             raise
         return tuple(result)
 
+    def get_derived(self, name, func, *args):
+        '''
+        Get value derived from datakeys, ``func(self, *args)``.
+        It is computed only once and cached with the loaded datakeys
+        by key ``(name, *args)``, so *args* must be hashable.
+        Thread-safe, like :meth:`get`.
+        '''
+        key = (name,) + args
+        if key in self.cache:
+            return self.cache[key]
+        with self._get_key_lock(key):
+            if key in self.cache:
+                return self.cache[key]
+            log.debug("Deriving '%s' from %s ..." % (name, self.path))
+            value = func(self, *args)
+            self.cache[key] = value
+            return value
+
+    def _special_getsize(self, pathobj, key):
+        '''
+        Return size of *key* in bytes without loading it, or None.
+        '''
+        return None
+
+    def sizeof(self, *keys):
+        '''
+        Get total size of ``keys`` in bytes, cheap, without loading data.
+        Unknown sizes are counted as 0.
+        '''
+        size = 0
+        for key in keys:
+            if key in self.cache:
+                size += getattr(self.cache[key], 'nbytes', 0)
+                continue
+            try:
+                size += self._special_getsize(self.pathobj, key) or 0
+            except Exception:
+                pass
+        return size
+
     def clear_cache(self):
         self.cache = {}
+
+    def __getstate__(self):
+        # locks cannot be pickled
+        return [(name, value)
+                for name, value in super(BasePckLoader, self).__getstate__()
+                if name not in ('_lock', '_keylocks')]
+
+    def __setstate__(self, state):
+        super(BasePckLoader, self).__setstate__(state)
+        self._lock = threading.Lock()
+        self._keylocks = {}
@@ -64,6 +64,9 @@ class CachePckLoader(BasePckLoader):
     def _special_getgroups(self, pathobj):
         return [k for k in pathobj.keys() if isinstance(pathobj[k], dict)]
 
+    def _special_getsize(self, pathobj, key):
+        return getattr(self._special_get(pathobj, key), 'nbytes', None)
+
     def _special_get(self, pathobj, key):
         gstop = key.rfind('/')
         if gstop == -1:
@@ -73,6 +73,9 @@ class Hdf5PckLoader(BasePckLoader):
     #        if isinstance(obj, h5py.Group) else None)
     #    return mygroups
 
+    def _special_getsize(self, pathobj, key):
+        return pathobj[key].nbytes
+
     def _special_get(self, pathobj, key):
         val = pathobj[key][()]
         if isinstance(val, numpy.void):
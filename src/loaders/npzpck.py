@@ -55,6 +55,9 @@ class NpzPckLoader(BasePckLoader):
     def _special_getkeys(self, pathobj):
         return sorted(dict.fromkeys(pathobj.files))
 
+    def _special_getsize(self, pathobj, key):
+        return pathobj.zip.getinfo('%s.npy' % key).file_size
+
     def _special_get(self, pathobj, key):
         value = pathobj[key]
         if value.size == 1:
@@ -29,3 +29,42 @@ class TestCachePckLoader(unittest.TestCase):
             numpy.array_equal(loader.get('test/array'), DATA['test/array']))
         self.assertEqual(loader.get('test/float'), 3.1415)
         self.assertEqual(loader.get('te/st/int'), 1)
+
+    def test_cacheloader_sizeof(self):
+        loader = self.CachePckLoader(DATA_C)
+        self.assertEqual(loader.sizeof('test/array', 'test/float'),
+                         DATA['test/array'].nbytes)
+
+    def test_cacheloader_add_keys(self):
+        store = {k: (dict(v) if isinstance(v, dict) else v)
+                 for k, v in DATA_C.items()}
+        loader = self.CachePckLoader(store)
+        self.assertTupleEqual(loader.group_keys('te/st'), ('te/st/int',))
+        self.assertEqual(loader.get('te/st/int'), 1)
+        store['te/st']['int'] = 2
+        store['new'] = {'a': 3}
+        loader.add_keys('te/st/int', 'new/a')
+        self.assertEqual(loader.get('te/st/int'), 2)
+        self.assertTrue('new/a' in loader)
+        self.assertTupleEqual(loader.group_keys('new'), ('new/a',))
+        self.assertTupleEqual(loader.datagroups, ('new', 'te/st', 'test'))
+        self.assertEqual(len(loader.datakeys), len(DATA) + 1)
+
+    def test_cacheloader_get_derived(self):
+        loader = self.CachePckLoader(DATA_C)
+        calls = []
+
+        def double(ld, key):
+            calls.append(key)
+            return ld.get(key) * 2
+
+        def quadruple(ld, key):
+            return ld.get_derived('double', double, key) * 2
+
+        self.assertEqual(loader.get_derived('double', double, 'te/st/int'), 2)
+        self.assertEqual(
+            loader.get_derived('quadruple', quadruple, 'te/st/int'), 4)
+        self.assertEqual(calls, ['te/st/int'])
+        loader.clear_cache()
+        loader.get_derived('double', double, 'te/st/int')
+        self.assertEqual(len(calls), 2)
@@ -37,3 +37,19 @@ class TestNpzPckLoader(unittest.TestCase):
             numpy.array_equal(loader.get('test/array'), DATA['test/array']))
         self.assertEqual(loader.get('test/float'), 3.1415)
         self.assertEqual(loader.get('te/st/int'), 1)
+
+    def test_npzloader_sizeof(self):
+        loader = self.NpzPckLoader(self.tmpfile)
+        size = loader.sizeof('test/array')
+        self.assertGreaterEqual(size, DATA['test/array'].nbytes)
+        self.assertEqual(loader.sizeof('test/array', 'not/exist'), size)
+
+    def test_npzloader_get_threads(self):
+        import concurrent.futures
+        loader = self.NpzPckLoader(self.tmpfile)
+        keys = ['test/array', 'test/float', 'te/st/int'] * 8
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            values = list(executor.map(loader.get, keys))
+        self.assertTrue(numpy.array_equal(values[0], DATA['test/array']))
+        self.assertEqual(values[-1], 1)
+        self.assertSetEqual(set(loader.cache), set(keys))
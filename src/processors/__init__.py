@@ -42,7 +42,7 @@ def get_processor(path=None, name='GTCv3', parallel='multiprocess', **kwargs):
         valid names :data:`Processor_Names` or :data:`Processor_Alias`
         default 'GTCv3'
     parallel: str
-        'off', 'multiprocess' or 'mpi4py', default 'multiprocess'
+        'off', 'multiprocess', 'thread' or 'mpi4py', default 'multiprocess'
     kwargs: parameters passed to :meth:`Processor.__init__`
     '''
     if name in Processor_Names:
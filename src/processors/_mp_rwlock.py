@@ -1,17 +1,98 @@
 # -*- coding: utf-8 -*-
 
+# Copyright (c) 2020 shmilee
 # Copyright (c) unhappydog
 '''
 multiprocessing read_write_lock, optional lock for MultiProcessor.
 
-copy from https://github.com/unhappydog/multiprocessing_read_write_lock
-Copyright (c) unhappydog
+1. :class:`MP_RWLock` is built on native multiprocessing primitives,
+   one Condition and two shared ctypes integers, writer-preferring.
+2. :class:`MP_ManagerRWLock` uses a multiprocessing Manager,
+   copy from https://github.com/unhappydog/multiprocessing_read_write_lock
+   Copyright (c) unhappydog
 '''
 
 import os
 import time
+import multiprocessing
+
+__all__ = ['MP_RWLock', 'MP_ManagerRWLock']
+
+
+class _NativeRWLockCore(object):
+    '''
+    Read-write lock core in shared memory, writer-preferring.
+
+    Like other multiprocessing synchronization primitives, it can only
+    be shared with child processes through inheritance, i.e. passed to
+    :class:`multiprocessing.Process` or as *initargs* of
+    :class:`multiprocessing.pool.Pool`, which works for fork and spawn.
+    '''
+
+    def __init__(self, ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.cond = ctx.Condition(ctx.Lock())
+        # positive is shared count, -1 exclusive
+        self.state = ctx.RawValue('i', 0)
+        # number of writers waiting, readers yield to them
+        self.waiting = ctx.RawValue('i', 0)
+
+    def _wait_for(self, predicate, timeout):
+        '''Call it with :attr:`cond` acquired.'''
+        if timeout is None:
+            while not predicate():
+                self.cond.wait()
+            return True
+        endtime = time.monotonic() + timeout
+        result = predicate()
+        while not result:
+            waittime = endtime - time.monotonic()
+            if waittime <= 0:
+                break
+            self.cond.wait(waittime)
+            result = predicate()
+        return result
+
+    def _can_read(self):
+        return self.state.value >= 0 and self.waiting.value == 0
 
-__all__ = ['MP_RWLock']
+    def _can_write(self):
+        return self.state.value == 0
+
+    def acquire_read(self, timeout=None):
+        with self.cond:
+            ok = self._wait_for(self._can_read, timeout)
+            if ok:
+                self.state.value += 1
+            return ok
+
+    def acquire_write(self, timeout=None):
+        with self.cond:
+            self.waiting.value += 1
+            try:
+                ok = self._wait_for(self._can_write, timeout)
+                if ok:
+                    self.state.value = -1
+            finally:
+                self.waiting.value -= 1
+            if not ok and self.waiting.value == 0:
+                # readers blocked by this writer can go on
+                self.cond.notify_all()
+            return ok
+
+    def release(self):
+        with self.cond:
+            if self.state.value > 0:
+                self.state.value -= 1
+            elif self.state.value < 0:
+                self.state.value = 0
+            else:
+                raise RuntimeError("cannot release an un-acquired lock")
+            if self.state.value == 0:
+                self.cond.notify_all()
+
+    def _is_owned(self):
+        raise TypeError("a native RWLock cannot be used with a Condition")
 
 
 class _RWLockCore(object):
@@ -174,7 +255,7 @@ class _WriterLock(_ReaderLock):
         return self.lock._acquire_restore(arg)
 
 
-class MP_RWLock(object):
+class MP_ManagerRWLock(object):
     # Doc shamelessly ripped off from Java
     """
     A RWLock maintains a pair of associated locks, one for read-only operations
@@ -201,3 +282,22 @@ class MP_RWLock(object):
         The lock used for write, or exclusive, access
         """
         return self._writer_lock
+
+
+class MP_RWLock(MP_ManagerRWLock):
+    """
+    A writer-preferring RWLock built on native multiprocessing primitives,
+    no Manager server process is needed. Waiting writers block new readers.
+    The locks are not reentrant.
+
+    Parameters
+    ----------
+    ctx: multiprocessing context, optional
+        default :func:`multiprocessing.get_context`
+    """
+    core = _NativeRWLockCore
+
+    def __init__(self, ctx=None):
+        core = self.core(ctx)
+        self._reader_lock = _ReaderLock(core)
+        self._writer_lock = _WriterLock(core)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains runner of blocking calls for coroutines, used by async API.
+'''
+
+import os
+import time
+import asyncio
+import threading
+import concurrent.futures
+
+__all__ = ['AsyncRunner']
+
+
+class AsyncRunner(object):
+    '''
+    Run blocking calls in a thread pool for coroutines, and share
+    the running call among concurrent requests with the same key.
+
+    Attributes
+    ----------
+    max_workers: int
+        max number of worker threads
+
+    Notes
+    -----
+    1. Progress events are dicts like {'event': 'started', 'label': ...,
+       'time': ...}, passed to *progress* callables in their event loop
+       thread. Events are 'queued', 'shared' (joined a running call),
+       'started', 'done', 'failed', 'cancelled' and 'timeout'.
+    2. Cancelling or timeout of one request only stops its waiting.
+       The call is cancelled if no request waits for it and it has
+       not started, running calls can not be interrupted.
+    3. Thread pool is not pickled, new copies start without it.
+    '''
+    __slots__ = ['max_workers', '_executor', '_inflight', '_lock']
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._executor = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix='gdpy3-async')
+            return self._executor
+
+    @staticmethod
+    def _emit(listeners, event, label, **info):
+        info.update(event=event, label=label, time=time.time())
+        for loop, progress in listeners:
+            try:
+                loop.call_soon_threadsafe(progress, dict(info))
+            except RuntimeError:
+                # loop closed
+                pass
+
+    def _call(self, key, label, func):
+        with self._lock:
+            listeners = list(self._inflight[key]['listeners'])
+        self._emit(listeners, 'started', label)
+        return func()
+
+    def _done(self, key, fut):
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None and entry['future'] is fut:
+                del self._inflight[key]
+
+    def _submit(self, key, label, func, listener):
+        '''Return concurrent future of call *key*, new or shared.'''
+        executor = self.executor
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None:
+                entry['waiters'] += 1
+                if listener:
+                    entry['listeners'].append(listener)
+                    self._emit([listener], 'shared', label)
+                return entry['future']
+            entry = dict(waiters=1, listeners=[listener] if listener else [])
+            if listener:
+                self._emit([listener], 'queued', label)
+            self._inflight[key] = entry
+            entry['future'] = executor.submit(
+                self._call, key, label, func)
+        entry['future'].add_done_callback(
+            lambda fut: self._done(key, fut))
+        return entry['future']
+
+    def _release(self, key, fut, listener):
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is None or entry['future'] is not fut:
+                return
+            entry['waiters'] -= 1
+            if listener in entry['listeners']:
+                entry['listeners'].remove(listener)
+            if entry['waiters'] <= 0 and fut.cancel():
+                del self._inflight[key]
+
+    async def run(self, key, func, label=None, timeout=None, progress=None):
+        '''
+        Await ``func()`` running in the thread pool.
+        Concurrent requests of the same *key* share one call.
+
+        Parameters
+        ----------
+        key: hashable
+            key of the call, like ('dig', 'group/fignum/kwargstr')
+        label: str
+            label in progress events, default str(key)
+        timeout: float
+            seconds to wait, then raise asyncio.TimeoutError
+        progress: callable
+            accept progress events
+        '''
+        label = str(key) if label is None else label
+        loop = asyncio.get_event_loop()
+        listener = (loop, progress) if callable(progress) else None
+        fut = self._submit(key, label, func, listener)
+        afut = asyncio.wrap_future(fut)
+        # errors are raised to waiters, avoid 'never retrieved' warnings
+        afut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            result = await asyncio.wait_for(asyncio.shield(afut), timeout)
+        except asyncio.TimeoutError:
+            self._release(key, fut, listener)
+            if listener:
+                self._emit([listener], 'timeout', label)
+            raise
+        except asyncio.CancelledError:
+            self._release(key, fut, listener)
+            if listener:
+                self._emit([listener], 'cancelled', label)
+            raise
+        except Exception as exc:
+            if listener:
+                self._emit([listener], 'failed', label, error=repr(exc))
+            raise
+        if listener:
+            self._emit([listener], 'done', label)
+        return result
+
+    def shutdown(self, wait=True):
+        '''Shut down the thread pool.'''
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def __getstate__(self):
+        return self.max_workers
+
+    def __setstate__(self, max_workers):
+        self.__init__(max_workers)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains persistent dig results cache, shared across sessions and cases.
+'''
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+from ..__about__ import __ENABLE_USERBASE__, __userbase__
+from ..glogger import getGLogger
+
+__all__ = ['DigCache', 'get_digcache']
+plog = getGLogger('P')
+
+
+class DigCache(object):
+    '''
+    Dig results saved in a size-limited directory, one pickle file
+    per entry, named by its content key.
+
+    Attributes
+    ----------
+    path: str or None
+        cache directory, None means disabled
+    maxsize: int
+        max total size of entries in bytes
+
+    Notes
+    -----
+    1. Key is a digest of case saltstr, figlabel, canonical dig kwargs,
+       digger code version and fingerprints of input datakeys. So any
+       change of data or digger code leads to a new key, and the stale
+       entries are never used again.
+    2. Reading an entry updates its mtime. When saving makes the total
+       size exceed :attr:`maxsize`, the least recently used entries
+       are removed.
+    3. Entries are pickle files, only share the directory with
+       trusted users.
+    '''
+    __slots__ = ['path', 'maxsize']
+
+    def __init__(self, path=None, maxsize=2 * 1024**3):
+        self.path = path
+        self.maxsize = maxsize
+
+    @staticmethod
+    def key(saltstr, figlabel, kwargstr, version, fingerprint):
+        '''Return key of an entry.'''
+        sha1 = hashlib.sha1()
+        for s in (saltstr, figlabel, kwargstr, version, fingerprint):
+            sha1.update(('%s\n' % s).encode())
+        return sha1.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], '%s.pkl' % key)
+
+    def load(self, key):
+        '''Return entry of *key*, or None if not found.'''
+        if not self.path:
+            return None
+        path = self._file(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            plog.warning("Failed to read digcache file %s!" % path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def save(self, key, entry):
+        '''Save *entry* of *key*, then evict old entries if needed.'''
+        if not self.path:
+            return
+        path = self._file(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path),
+                                       prefix='.digcache-')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            plog.warning("Failed to save digcache file %s!" % path,
+                         exc_info=1)
+            return
+        self.evict()
+
+    def _entries(self):
+        '''Return list of (mtime, size, path) of all entries.'''
+        entries = []
+        for root, dirs, files in os.walk(self.path):
+            for name in files:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self):
+        '''Remove least recently used entries until size <= maxsize.'''
+        if not self.path or not os.path.isdir(self.path):
+            return
+        entries = self._entries()
+        total = sum(e[1] for e in entries)
+        if total <= self.maxsize:
+            return
+        for mtime, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            plog.debug("Remove old digcache file %s." % path)
+            total -= size
+            if total <= self.maxsize:
+                break
+
+
+_default_digcache = None
+
+
+def get_digcache():
+    '''
+    Return the default :class:`DigCache` instance. Its directory is
+    environment variable 'GDPY3_DIGCACHE', or 'digcache' in __userbase__
+    if enabled.
+    '''
+    global _default_digcache
+    if _default_digcache is None:
+        path = os.getenv('GDPY3_DIGCACHE', None)
+        if not path and __ENABLE_USERBASE__:
+            path = os.path.join(__userbase__, 'digcache')
+        _default_digcache = DigCache(path or None)
+    return _default_digcache
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains persistent figlabels manifest of diggers, used by lazy diggers.
+'''
+
+import os
+import json
+import hashlib
+import tempfile
+
+from .. import __gversion__
+from ..__about__ import __ENABLE_USERBASE__, __userbase__
+from ..glogger import getGLogger
+
+__all__ = ['DigManifest', 'get_digmanifest']
+plog = getGLogger('P')
+
+
+class DigManifest(object):
+    '''
+    Figlabels of digger cores for pckloaders, saved in JSON files.
+
+    Attributes
+    ----------
+    path: str or None
+        directory of JSON files, None means no persistence
+    manifests: dict
+        {key: {figlabel: [digger class name, section, numseed]}}
+
+    Notes
+    -----
+    1. Key is a digest of processor name, gdpy3 version and the datakeys
+       of pckloader, so any change of them leads to a new manifest.
+    '''
+    __slots__ = ['path', 'manifests']
+
+    def __init__(self, path=None):
+        self.path = path
+        self.manifests = {}
+
+    @staticmethod
+    def key(name, pckloader):
+        '''Return key of processor *name* for *pckloader*.'''
+        sha1 = hashlib.sha1(('%s\n%s\n' % (name, __gversion__)).encode())
+        sha1.update('\n'.join(pckloader.datakeys).encode())
+        return sha1.hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, '%s.json' % key)
+
+    def load(self, key):
+        '''Return manifest of *key*, or None if not found.'''
+        if key in self.manifests:
+            return self.manifests[key]
+        if self.path and os.path.isfile(self._file(key)):
+            try:
+                with open(self._file(key), 'r') as f:
+                    self.manifests[key] = json.load(f)
+                return self.manifests[key]
+            except Exception:
+                plog.warning("Failed to read manifest file %s!"
+                             % self._file(key))
+        return None
+
+    def save(self, key, manifest):
+        '''Save *manifest* of *key*.'''
+        self.manifests[key] = manifest
+        if not self.path:
+            return
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path, prefix='.manifest-')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp, self._file(key))
+        except Exception:
+            plog.warning("Failed to save manifest file %s!"
+                         % self._file(key), exc_info=1)
+
+
+_default_digmanifest = None
+
+
+def get_digmanifest():
+    '''
+    Return the default :class:`DigManifest` instance,
+    saved in __userbase__ if enabled.
+    '''
+    global _default_digmanifest
+    if _default_digmanifest is None:
+        if __ENABLE_USERBASE__:
+            path = os.path.join(__userbase__, 'digmanifest')
+        else:
+            path = None
+        _default_digmanifest = DigManifest(path)
+    return _default_digmanifest
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains persistent dig time statistics, used to schedule tasks.
+'''
+
+import os
+import json
+import heapq
+import tempfile
+
+from ..__about__ import __ENABLE_USERBASE__, __userbase__
+from ..glogger import getGLogger
+
+__all__ = ['DigStats', 'get_digstats']
+plog = getGLogger('P')
+
+
+class DigStats(object):
+    '''
+    Historical execution time and input size of tasks, saved in a JSON file.
+
+    Attributes
+    ----------
+    path: str or None
+        JSON file path, None means no persistence
+    stats: dict
+        {key: [count, time, size]}, time and size are moving averages
+    alpha: float
+        weight of new record in the moving averages
+
+    Notes
+    -----
+    1. Keys are like 'GTCv3/group/fignum' for figlabels, and
+       'GTCv3/DiggerClassName' for classes, used for unseen figlabels.
+    2. Saving merges records in the file, written by other processes.
+    '''
+    __slots__ = ['path', 'stats', '_changed']
+    alpha = 0.5
+
+    def __init__(self, path=None):
+        self.path = path
+        self.stats = {}
+        self._changed = set()
+        self.stats.update(self._read())
+
+    def _read(self):
+        if self.path and os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+            except Exception:
+                plog.warning("Failed to read stats file %s!" % self.path)
+        return {}
+
+    def save(self):
+        '''Merge changed records into :attr:`path`.'''
+        if not self.path or not self._changed:
+            return
+        stats = self._read()
+        stats.update({k: self.stats[k] for k in self._changed})
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path),
+                                       prefix='.digstats-')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(stats, f)
+            os.replace(tmp, self.path)
+        except Exception:
+            plog.warning("Failed to save stats file %s!" % self.path,
+                         exc_info=1)
+        else:
+            self.stats = stats
+            self._changed.clear()
+
+    def record(self, key, time, size=0):
+        '''Add one record of *time* (s) and input *size* (bytes).'''
+        if key in self.stats:
+            count, otime, osize = self.stats[key]
+            time = (1 - self.alpha) * otime + self.alpha * time
+            size = (1 - self.alpha) * osize + self.alpha * size
+            self.stats[key] = [count + 1, time, size]
+        else:
+            self.stats[key] = [1, time, size]
+        self._changed.add(key)
+
+    def predict(self, *keys, size=0):
+        '''
+        Predict time of a task by its first known key in *keys*.
+        Scale the time by input *size* if both sizes are known.
+        Return None if no key found.
+        '''
+        for key in keys:
+            if key in self.stats:
+                count, time, osize = self.stats[key]
+                if size > 0 and osize > 0:
+                    return time * size / osize
+                return time
+        return None
+
+    def count(self, *keys):
+        '''Return records count of the first known key in *keys*, or 0.'''
+        for key in keys:
+            if key in self.stats:
+                return self.stats[key][0]
+        return 0
+
+    @staticmethod
+    def schedule(costs, nworkers):
+        '''
+        Longest-processing-time-first schedule *costs* on *nworkers*.
+        Unknown costs (None) are taken as the mean of known ones.
+
+        Returns
+        -------
+        order: list, task indexes sorted by cost, longest first
+        assignment: list, worker index of each task, greedily balanced
+        makespan: float, predicted total time
+        '''
+        known = [c for c in costs if c is not None]
+        default = sum(known) / len(known) if known else 1.0
+        costs = [default if c is None else c for c in costs]
+        order = sorted(range(len(costs)), key=lambda i: -costs[i])
+        loads = [(0.0, w) for w in range(max(1, nworkers))]
+        assignment = [None] * len(costs)
+        for i in order:
+            load, w = heapq.heappop(loads)
+            assignment[i] = w
+            heapq.heappush(loads, (load + costs[i], w))
+        makespan = max(load for load, w in loads)
+        return order, assignment, makespan
+
+
+_default_digstats = None
+
+
+def get_digstats():
+    '''
+    Return the default :class:`DigStats` instance,
+    saved in __userbase__ if enabled.
+    '''
+    global _default_digstats
+    if _default_digstats is None:
+        if __ENABLE_USERBASE__:
+            path = os.path.join(__userbase__, 'digstats.json')
+        else:
+            path = None
+        _default_digstats = DigStats(path)
+    return _default_digstats
@@ -11,6 +11,7 @@ import importlib
 from ..__about__ import __ENABLE_USERBASE__, __userbase__
 from .processor import Processor, plog
 from .multiprocessor import MultiProcessor
+from .threadprocessor import ThreadProcessor
 
 __all__ = ['Processor_Lib', 'Processor_Names', 'Processor_Alias',
            'register_Processor', 'register_user_Processors', 'find_Processor']
@@ -98,8 +99,16 @@ def find_Processor(name, parallel):
                           {'__slots__': []})
             # cache in module scope, useful when multiprocessing
             globals()['Multi%s' % name] = gdpcls
+        elif parallel == 'thread':
+            gdpcls = type('Thread%s' % name, (base, ThreadProcessor),
+                          {'__slots__': []})
+            globals()['Thread%s' % name] = gdpcls
         elif parallel == 'mpi4py':
-            raise ValueError('TODO %s' % parallel)
+            # mpi4py is optional, import it only when needed
+            from .mpiprocessor import MPIProcessor
+            gdpcls = type('MPI%s' % name, (base, MPIProcessor),
+                          {'__slots__': []})
+            globals()['MPI%s' % name] = gdpcls
         else:
             raise ValueError('Unsupported parallel-lib: %s' % parallel)
         plog.debug("'lib' scope's global variables: %s" % globals().keys())
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains MPI processor class.
+'''
+
+import os
+import threading
+import contextlib
+
+try:
+    from mpi4py import MPI
+except ImportError as exc:
+    raise ImportError(
+        'MPIProcessor requires mpi4py(MPI for Python). But %s' % exc) from None
+
+from .processor import Processor, plog
+from .multiprocessor import MultiProcessor
+from .threadprocessor import _TaskCount
+from ..loaders import get_pckloader
+from ..utils import inherit_docstring
+
+
+__all__ = ['MPIProcessor']
+
+
+def _copydoc_func(docs):
+    name, doc = docs[0]
+    assert name == 'Processor'
+    return (doc[doc.find('Attributes'):],), {}
+
+
+@inherit_docstring((Processor,), _copydoc_func, template=None)
+class MPIProcessor(MultiProcessor):
+    '''
+    MPI Processor class.
+
+    {0}3. :attr:`comm` is the MPI communicator, default MPI.COMM_WORLD.
+    4. All ranks run the same script, and call the same methods,
+       :meth:`convert`, :meth:`multi_dig`, :meth:`multi_export` and
+       :meth:`multi_visplt` in the same order.
+       Rank 0 plans the tasks, sends them to other ranks one by one,
+       and saves the results, as the only writer of savers.
+       Other ranks work on the tasks, and their methods return None.
+    5. Run it like, ``mpirun -n 4 python script.py``.
+       With one rank, rank 0 does all tasks itself.
+    '''
+
+    parallel = 'mpi4py'
+    comm = MPI.COMM_WORLD
+
+    @property
+    def name(self):
+        return type(self).__name__[3:]
+
+    @property
+    def rank(self):
+        return self.comm.Get_rank()
+
+    @property
+    def size(self):
+        return self.comm.Get_size()
+
+    @contextlib.contextmanager
+    def _mpi_session(self):
+        '''
+        On rank 0, stop other ranks serving when outermost session ends.
+        '''
+        depth = getattr(self, '_mpi_depth', 0)
+        self._mpi_depth = depth + 1
+        try:
+            yield
+        finally:
+            self._mpi_depth = depth
+            if depth == 0:
+                for dest in range(1, self.size):
+                    self.comm.send(('stop',), dest=dest)
+
+    def _mpi_serve(self):
+        '''On other ranks, work on tasks from rank 0 until stop.'''
+        while True:
+            msg = self.comm.recv(source=0)
+            if msg[0] == 'stop':
+                break
+            idx, task = msg[1], msg[2]
+            try:
+                res = self._mpi_do_task(task)
+            except Exception:
+                plog.error("%s: Rank %d failed to do task %s!"
+                           % (self.name, self.rank, task[:2]), exc_info=1)
+                res = None
+            self.comm.send((idx, res), dest=0)
+
+    def _mpi_dispatch(self, tasks, on_result):
+        '''
+        On rank 0, send *tasks* to free ranks one by one, in order,
+        and call *on_result* with task index and result when it returns.
+        '''
+        if self.size == 1:
+            for idx, task in enumerate(tasks):
+                try:
+                    res = self._mpi_do_task(task)
+                except Exception:
+                    plog.error("%s: Failed to do task %s!"
+                               % (self.name, task[:2]), exc_info=1)
+                    res = None
+                on_result(idx, res)
+            return
+        pending = iter(enumerate(tasks))
+        busy = 0
+        for dest in range(1, self.size):
+            nxt = next(pending, None)
+            if nxt is None:
+                break
+            self.comm.send(('task', *nxt), dest=dest)
+            busy += 1
+        status = MPI.Status()
+        while busy > 0:
+            idx, res = self.comm.recv(source=MPI.ANY_SOURCE, status=status)
+            busy -= 1
+            nxt = next(pending, None)
+            if nxt is not None:
+                self.comm.send(('task', *nxt), dest=status.Get_source())
+                busy += 1
+            on_result(idx, res)
+
+    def _mpi_do_task(self, task):
+        '''Do one task, convert, dig or visplt.'''
+        kind = task[0]
+        if kind == 'convert':
+            core = self.converters[task[1]]
+            return core.group, core.convert()
+        elif kind == 'dig':
+            figlabel, kwargs = task[1], task[2]
+            digcore = self._get_digcore(figlabel)
+            accfiglabel, results, digtime = self._do_new_dig(digcore, kwargs)
+            return (accfiglabel, results, digcore.kwoptions,
+                    digtime, self._digcore_size(digcore))
+        elif kind == 'visplt':
+            data = self._visplt_worker(*task[1:], None, None, None,
+                                       name_it=False)
+            if data[0]:
+                self.visplter.close_figure(data[1])
+            return data
+        else:
+            raise ValueError("Unknown task %s!" % kind)
+
+    # # Start Convert Part
+
+    def set_prefer_pcksaver(self, savetype, ext2='converted'):
+        super(MPIProcessor, self).set_prefer_pcksaver(savetype, ext2=ext2)
+        # savetype may differ in ranks, when raw data dir isn't writable
+        path = self.comm.bcast(self.pcksaver.path, root=0)
+        if self.pcksaver.path != path:
+            raise IOError("%s: Rank %d got a different pcksaver path!"
+                          % (self.name, self.rank))
+
+    def _convert_if_needed(self, add_desc=None, overwrite=False):
+        '''Rank 0 decides to convert raw data or not.'''
+        need = None
+        if self.rank == 0:
+            exist = os.path.isfile(self.pcksaver.path)
+            need = overwrite or not exist
+            if exist and overwrite:
+                plog.warning("Remove old %s data file: %s!"
+                             % ('converted', self.pcksaver.path))
+                os.remove(self.pcksaver.path)
+        need = self.comm.bcast(need, root=0)
+        if need:
+            self.convert(add_desc=add_desc)
+
+    def convert(self, add_desc=None):
+        '''
+        Use all ranks to convert raw data, rank 0 saves them.
+        '''
+        if self.rank != 0:
+            self._mpi_serve()
+            return
+        with self._mpi_session():
+            self._pre_convert(add_desc=add_desc)
+            lock, count = threading.Lock(), _TaskCount()
+            total = len(self.converters)
+            tasks = [('convert', idx) for idx in range(total)]
+
+            def on_result(idx, res):
+                if res is None:
+                    plog.error("%s: Failed to convert data in group %s!"
+                               % (self.name, self.converters[idx].group))
+                else:
+                    plog.info("Writing data in group %s ..." % res[0])
+                    self.pcksaver.write(*res)
+                self._count_task_done(lock, count, total, 'Convert')
+
+            with self.pcksaver:
+                self._mpi_dispatch(tasks, on_result)
+            self._post_convert()
+
+    multi_convert = convert
+
+    # # End Convert Part
+
+    # # Start Dig Part
+
+    def set_prefer_ressaver(self, ext2='digged', oldext2='converted',
+                            overwrite=False):
+        # rank 0 creates or removes file first, plain dict store
+        if self.rank == 0:
+            Processor.set_prefer_ressaver(
+                self, ext2=ext2, oldext2=oldext2, overwrite=overwrite)
+        self.comm.Barrier()
+        if self.rank != 0:
+            Processor.set_prefer_ressaver(
+                self, ext2=ext2, oldext2=oldext2, overwrite=False)
+
+    def multi_dig(self, *couple_figlabels, whichlock=None,
+                  redig=False, callback=None, post=True, timings=False):
+        '''
+        Get digged results of *couple_figlabels*.
+        MPI version of :meth:`dig`.
+        On rank 0, return a list of :meth:`dig` return.
+        Other ranks return None.
+
+        Parameters
+        ----------
+        couple_figlabels: list of couple_figlabel
+            couple_figlabel can be figlabel str or dict, like
+            {'figlabel': 'group/fignum', 'other kwargs': True}
+        whichlock: ignored, only rank 0 saves results
+        timings: see :meth:`MultiProcessor.multi_dig`
+        others: see :meth:`dig`
+
+        Notes
+        -----
+        Only new_dig figlabels are dug by other ranks,
+        *callback* and *post* are called on rank 0.
+        '''
+        if self.rank != 0:
+            self._mpi_serve()
+            return
+        with self._mpi_session():
+            if len(couple_figlabels) == 0:
+                plog.warning("please pass at least one figlabel!")
+                return []
+            multi_timings = [dict(predicted=None, actual=None)
+                             for _ in couple_figlabels]
+            multi_results, couple_todo = self._split_couple_figlabels(
+                couple_figlabels, redig, callback, post)
+            if len(couple_todo) > 0:
+                order, predicted = self._schedule_dig(
+                    [c[1] for c in couple_todo], max(1, self.size - 1))
+                for jdx, ptime in enumerate(predicted):
+                    multi_timings[couple_todo[jdx][0]]['predicted'] = ptime
+                lock, count = threading.Lock(), _TaskCount()
+                total = len(couple_todo)
+                tasks = [('dig', couple_todo[jdx][1].figlabel,
+                          couple_todo[jdx][2]) for jdx in order]
+
+                def on_result(i, res):
+                    idx, digcore, kwargs, gotfiglabel = couple_todo[order[i]]
+                    self._count_task_done(lock, count, total, 'Dig')
+                    if res is None:
+                        multi_results[idx] = (None, 'Failed to dig', None)
+                        return
+                    accfiglabel, results, kwoptions, digtime, size = res
+                    if digcore.kwoptions is None:
+                        digcore.kwoptions = kwoptions
+                    self._cachesave_new_dig(accfiglabel, gotfiglabel, results)
+                    if (self.resfilesaver
+                            and digtime > self.dig_acceptable_time):
+                        # long execution time
+                        self._filesave_new_dig(
+                            accfiglabel, gotfiglabel, results, digcore)
+                    multi_timings[idx]['actual'] = digtime
+                    self._record_digtime(digcore, digtime, size=size)
+                    if callable(callback):
+                        callback(accfiglabel, results)
+                    if post:
+                        results = digcore.post_dig(results)
+                    multi_results[idx] = (
+                        accfiglabel, results, digcore.post_template)
+
+                self._mpi_dispatch(tasks, on_result)
+                self.digstats.save()
+                if self.resfilesaver:
+                    self.resfileloader = get_pckloader(
+                        self.resfilesaver.get_store())
+            if timings:
+                return [(*res, tm)
+                        for res, tm in zip(multi_results, multi_timings)]
+            return multi_results
+
+    # # End Dig Part
+
+    # # Start Export Part
+
+    def multi_export(self, *couple_figlabels, what='axes', fmt='dict',
+                     whichlock=None, callback=None):
+        '''
+        MPI version of :meth:`export`. Other ranks return None.
+        See :meth:`MultiProcessor.multi_export`.
+        '''
+        if self.rank != 0:
+            self._mpi_serve()
+            return
+        with self._mpi_session():
+            return super(MPIProcessor, self).multi_export(
+                *couple_figlabels, what=what, fmt=fmt,
+                whichlock=whichlock, callback=callback)
+
+    # # End Export Part
+
+    # # Start Visplt Part
+
+    def multi_visplt(self, *couple_figlabels, revis=False,
+                     savename='figlabel', saveext='png', savepath='.',
+                     mpl_backend='agg', whichlock=None, callback=None,
+                     timings=False):
+        '''
+        Get results of *couple_figlabels* and visualize(plot), save them.
+        MPI version of :meth:`visplt`. Other ranks return None.
+        See :meth:`MultiProcessor.multi_visplt`.
+        '''
+        if self.rank != 0:
+            self._mpi_serve()
+            return
+        with self._mpi_session():
+            if not self.visplter:
+                plog.error("%s: Need a visplter object!" % self.name)
+                return
+            multi_results = self.multi_export(
+                *couple_figlabels, what='axes', fmt='dict', callback=callback)
+            success, fail = [], []
+            if not os.path.isdir(savepath):
+                os.mkdir(savepath)
+            predicted = [self.digstats.predict(*self._visplt_stats_keys(res))
+                         if res['status'] == 200 else 0.0
+                         for res in multi_results]
+            order, assignment, makespan = self.digstats.schedule(
+                predicted, max(1, self.size - 1))
+            lock, count = threading.Lock(), _TaskCount()
+            total = len(multi_results)
+            tasks = [('visplt', multi_results[idx], revis, savename,
+                      saveext, savepath, mpl_backend) for idx in order]
+            outputs = [None] * total
+
+            def on_result(i, res):
+                self._count_task_done(lock, count, total, 'Visplt')
+                idx = order[i]
+                if res is None:
+                    res = (False, multi_results[idx].get('accfiglabel'),
+                           '(500) failed in rank', None)
+                elif res[3] is not None:
+                    for key in self._visplt_stats_keys(multi_results[idx]):
+                        self.digstats.record(key, res[3])
+                outputs[idx] = res
+
+            self._mpi_dispatch(tasks, on_result)
+            for idx, data in enumerate(outputs):
+                item = data[1:3]
+                if timings:
+                    item = (*item, dict(predicted=predicted[idx],
+                                        actual=data[3]))
+                if data[0]:
+                    success.append(item)
+                else:
+                    fail.append(item)
+            self.digstats.save()
+            return success, fail
+
+    # # End Visplt Part
@@ -7,6 +7,7 @@ Contains multiprocess processor class.
 '''
 
 import os
+import time
 import multiprocessing
 
 from .processor import Processor, plog
@@ -18,6 +19,17 @@ from ..utils import inherit_docstring
 
 __all__ = ['MultiProcessor']
 
+# read-write lock shared with pool workers by inheritance
+_worker_rwlock = None
+
+
+def _rwlock_worker_initializer(rwlock, initializer=None):
+    '''Set read-write lock for worker process, then call *initializer*.'''
+    global _worker_rwlock
+    _worker_rwlock = rwlock
+    if callable(initializer):
+        initializer()
+
 
 def _copydoc_func(docs):
     name, doc = docs[0]
@@ -46,11 +58,13 @@ class MultiProcessor(Processor):
         '''
         Parameters
         ----------
-        lock: multiprocessing lock
+        lock: multiprocessing lock, None means not counting
         count: multiprocessing value number of completed tasks
         total: total number of tasks
         desc: description of task
         '''
+        if lock is None:
+            return
         with lock:
             count.value += 1
             done = count.value
@@ -121,35 +135,54 @@ class MultiProcessor(Processor):
         self.ressaver.set_store(D)
         self.resloader = get_pckloader(D)
 
-    @staticmethod
-    def _filter_couple_figlabel(_couple):
-        '''Return figlabel, kwargs'''
-        if isinstance(_couple, str):
-            return _couple, {}
-        elif isinstance(_couple, dict):
-            copy = _couple.copy()
-            figlabel = copy.pop('figlabel', None)
-            if figlabel:
-                return figlabel, copy
+    def _split_couple_figlabels(self, couple_figlabels, redig, callback,
+                                post):
+        '''
+        Find old dig results of *couple_figlabels*, call *callback*, *post*.
+        Return multi_results and new_dig tasks. In multi_results,
+        new_dig figlabels are tagged by their index in *couple_figlabels*.
+        Task is a tuple (index, digcore, kwargs, gotfiglabel).
+        '''
+        multi_results, couple_todo = [], []
+        for idx, _couple in enumerate(couple_figlabels):
+            figlabel, kwargs = self._filter_couple_figlabel(_couple)
+            if figlabel is None:
+                multi_results.append((None, kwargs, None))
+                continue
+            data = self._before_new_dig(figlabel, redig, kwargs)
+            digcore, gotfiglabel, results = data
+            if digcore is None:
+                multi_results.append(data)
+            elif results is None:
+                # tag new_dig figlabels
+                multi_results.append(idx)
+                couple_todo.append((idx, digcore, kwargs, gotfiglabel))
             else:
-                return None, "No figlabel in couple_figlabel"
-        else:
-            return None, "Invalid couple_figlabel type"
+                # find saved dig results
+                accfiglabel = gotfiglabel
+                if callable(callback):
+                    callback(accfiglabel, results)
+                if post:
+                    results = self._post_dig(digcore, accfiglabel, results)
+                multi_results.append(
+                    (accfiglabel, results, digcore.post_template))
+        return multi_results, couple_todo
 
     def _dig_worker_with_rwlock(self, couple_figlabel, redig, callback, post,
-                                rwlock, lock, count, total, name_it=True):
+                                lock, count, total, name_it=True):
         '''
         Find old dig results, dig new if needed, then save them.
+        The read-write lock is inherited from the pool initializer.
 
         Parameters
         ----------
         couple_figlabel: figlabel str or dict contains figlabel
-        rwlock: read-write lock
         name_it: bool
             When using multiprocessing,
             *name_it* is True, processname is set to *figlabel*.
         '''
         update = 0
+        rwlock = _worker_rwlock
         figlabel, kwargs = self._filter_couple_figlabel(couple_figlabel)
         if figlabel is None:
             self._count_task_done(lock, count, total, 'Dig')
@@ -167,8 +200,11 @@ class MultiProcessor(Processor):
         if digcore is None:
             self._count_task_done(lock, count, total, 'Dig')
             return (*data, update)
+        digtime, size = None, None
         if results is None:
-            accfiglabel, results, digtime = self._do_new_dig(digcore, kwargs)
+            accfiglabel, results, digtime = self._do_new_dig(
+                digcore, kwargs, usecache=not redig)
+            size = self._digcore_size(digcore)
             try:
                 rwlock.writer_lock.acquire()
                 # ressaver, having multiprocessing DictProxy's own lock
@@ -190,7 +226,7 @@ class MultiProcessor(Processor):
         if post:
             results = digcore.post_dig(results)
         return (accfiglabel, results, digcore.post_template,
-                update, figlabel, digcore.kwoptions)
+                update, figlabel, digcore.kwoptions, digtime, size)
 
     def _dig_worker_with_lock(self, digcore, kwargs, gotfiglabel, callback,
                               post, lock, count, total, name_it=True):
@@ -207,6 +243,7 @@ class MultiProcessor(Processor):
         if name_it:
             multiprocessing.current_process().name = digcore.figlabel
         accfiglabel, results, digtime = self._do_new_dig(digcore, kwargs)
+        size = self._digcore_size(digcore)
         try:
             lock.acquire()
             self._cachesave_new_dig(accfiglabel, gotfiglabel, results)
@@ -222,10 +259,33 @@ class MultiProcessor(Processor):
         if post:
             results = digcore.post_dig(results)
         return (accfiglabel, results, digcore.post_template,
-                digcore.kwoptions)
+                digcore.kwoptions, digtime, size)
+
+    def _schedule_dig(self, cores, nworkers, redig=False, kwargslist=None):
+        '''
+        Predict dig time of *cores*, then sort them longest first.
+        For digged results, predicted time is 0.
+        Return task order and predicted times.
+        '''
+        predicted = []
+        for i, core in enumerate(cores):
+            if core is None:
+                predicted.append(0.0)
+                continue
+            if kwargslist is not None and not redig:
+                kwargstr = core.str_dig_kwargs(kwargslist[i]) or 'DEFAULT'
+                if '%s/%s' % (core.figlabel, kwargstr) in self.diggedlabels:
+                    predicted.append(0.0)
+                    continue
+            predicted.append(self._predict_digtime(core))
+        order, assignment, makespan = self.digstats.schedule(
+            predicted, nworkers)
+        plog.debug("Predicted dig makespan %.3fs with %d workers."
+                   % (makespan, nworkers))
+        return order, predicted
 
     def multi_dig(self, *couple_figlabels, whichlock='write',
-                  redig=False, callback=None, post=True):
+                  redig=False, callback=None, post=True, timings=False):
         '''
         Get digged results of *couple_figlabels*.
         Multiprocess version of :meth:`dig`.
@@ -238,6 +298,11 @@ class MultiProcessor(Processor):
             {'figlabel': 'group/fignum', 'other kwargs': True}
         whichlock: str, 'write' or 'read-write'
             default 'write', means only using a write lock
+        timings: bool
+            If True, append a dict of predicted and actual dig time
+            to each :meth:`dig` return, default False.
+            For old results found in savers, actual time is None,
+            except when using for loop with one worker process.
         others: see :meth:`dig`
 
         Notes
@@ -255,44 +320,30 @@ class MultiProcessor(Processor):
            are multiprocessing, except saving results.
         3. Useing a write lock or read write lock depends on how many digged
            figlabels, their results size and where they saved.
+        4. New dig tasks are submitted longest predicted time first,
+           according to :attr:`digstats`, so that workers are balanced.
         '''
         if len(couple_figlabels) == 0:
             plog.warning("please pass at least one figlabel!")
             return []
         multi_results = []
+        multi_timings = [dict(predicted=None, actual=None)
+                         for _ in couple_figlabels]
         if self.multiproc > 1:
             if whichlock not in ('write', 'read-write'):
                 plog.warning("Set default write lock, not %s!" % whichlock)
                 whichlock = 'write'
             if whichlock == 'write':
-                couple_todo = []
-                for idx, _couple in enumerate(couple_figlabels):
-                    figlabel, kwargs = self._filter_couple_figlabel(_couple)
-                    if figlabel is None:
-                        multi_results.append((None, kwargs, None))
-                    else:
-                        data = self._before_new_dig(figlabel, redig, kwargs)
-                        digcore, gotfiglabel, results = data
-                        if digcore is None:
-                            multi_results.append(data)
-                        else:
-                            if results is None:
-                                # tag new_dig figlabels
-                                multi_results.append(idx)
-                                couple_todo.append(
-                                    (idx, digcore, kwargs, gotfiglabel))
-                            else:
-                                # find saved dig results
-                                accfiglabel = gotfiglabel
-                                if callable(callback):
-                                    callback(accfiglabel, results)
-                                if post:
-                                    results = digcore.post_dig(results)
-                                multi_results.append((accfiglabel, results,
-                                                      digcore.post_template))
+                multi_results, couple_todo = self._split_couple_figlabels(
+                    couple_figlabels, redig, callback, post)
                 # do new_dig figlabels
                 if len(couple_todo) > 0:
                     nworkers = min(self.multiproc, len(couple_todo))
+                    order, predicted = self._schedule_dig(
+                        [c[1] for c in couple_todo], nworkers)
+                    for jdx, ptime in enumerate(predicted):
+                        multi_timings[couple_todo[jdx][0]]['predicted'] = ptime
+                    couple_todo = [couple_todo[jdx] for jdx in order]
                     with get_glogger_work_initializer() as loginitializer:
                         plog.debug("Using a write lock!")
                         lock = self.manager.RLock()
@@ -316,8 +367,12 @@ class MultiProcessor(Processor):
                             data = res.get()
                             assert multi_results[idx] == idx
                             multi_results[idx] = data[:3]
+                            self.postcache.discard(data[0])
                             if core.kwoptions is None:
                                 core.kwoptions = data[3]
+                            multi_timings[idx]['actual'] = data[4]
+                            self._record_digtime(core, data[4], size=data[5])
+                        self.digstats.save()
                         self.resloader = get_pckloader(
                             self.ressaver.get_store())
                         self.resfileloader = get_pckloader(
@@ -325,9 +380,18 @@ class MultiProcessor(Processor):
             else:
                 # with 'read-write' lock
                 nworkers = min(self.multiproc, len(couple_figlabels))
+                cores, kwargslist = [], []
+                for _couple in couple_figlabels:
+                    figlabel, kwargs = self._filter_couple_figlabel(_couple)
+                    cores.append(self._get_digcore(figlabel))
+                    kwargslist.append(kwargs)
+                order, predicted = self._schedule_dig(
+                    cores, nworkers, redig=redig, kwargslist=kwargslist)
+                for idx, ptime in enumerate(predicted):
+                    multi_timings[idx]['predicted'] = ptime
                 with get_glogger_work_initializer() as loginitializer:
                     plog.debug("Using a read-write lock!")
-                    rwlock = MP_RWLock(self.manager)
+                    rwlock = MP_RWLock()
                     lock = self.manager.RLock()  # for count
                     count = self.manager.Value('i', 0, lock=False)
                     total = len(couple_figlabels)
@@ -335,23 +399,28 @@ class MultiProcessor(Processor):
                     self.resfileloader = None
                     with multiprocessing.Pool(
                             processes=nworkers,
-                            initializer=loginitializer) as pool:
-                        async_results = [pool.apply_async(
+                            initializer=_rwlock_worker_initializer,
+                            initargs=(rwlock, loginitializer)) as pool:
+                        async_results = {idx: pool.apply_async(
                             self._dig_worker_with_rwlock,
-                            (couple_figlabel, redig, callback, post, rwlock,
+                            (couple_figlabels[idx], redig, callback, post,
                                 lock, count, total))
-                            for couple_figlabel in couple_figlabels]
+                            for idx in order}
                         pool.close()
                         pool.join()
                     update = 0
-                    for res in async_results:
-                        data = res.get()
+                    for idx in range(len(couple_figlabels)):
+                        data = async_results[idx].get()
                         multi_results.append(data[:3])
                         update = max(data[3], update)
                         if data[3] > 0:
-                            core = self._availablelabels_lib[data[4]]
+                            self.postcache.discard(data[0])
+                            core = self._get_digcore(data[4])
                             if core.kwoptions is None:
                                 core.kwoptions = data[5]
+                            multi_timings[idx]['actual'] = data[6]
+                            self._record_digtime(core, data[6], size=data[7])
+                    self.digstats.save()
                 # reset resfileloader in mainprocess
                 self.resfileloader = get_pckloader(
                     self.resfilesaver.get_store())
@@ -360,14 +429,18 @@ class MultiProcessor(Processor):
         else:
             plog.warning("Max number of worker processes is one, "
                          "use for loop to multi_dig!")
-            for _couple in couple_figlabels:
+            for idx, _couple in enumerate(couple_figlabels):
                 figlabel, kwargs = self._filter_couple_figlabel(_couple)
                 if figlabel is None:
                     multi_results.append((None, kwargs, None))
                 else:
+                    start = time.time()
                     multi_results.append(self.dig(
                         figlabel, redig=redig, callback=callback, post=post,
                         **kwargs))
+                    multi_timings[idx]['actual'] = time.time() - start
+        if timings:
+            return [(*res, tm) for res, tm in zip(multi_results, multi_timings)]
         return multi_results
 
     # # End Dig Part
@@ -403,8 +476,9 @@ class MultiProcessor(Processor):
                     multi_results.append(idx)
                     couple_todo.append((idx, figlabel, kwargs, _couple))
                 elif what == 'options':
-                    digcore = self._availablelabels_lib[figlabel]
-                    if digcore.post_template in self.exportertemplates:
+                    digcore = self._get_digcore(figlabel)
+                    if (digcore and
+                            digcore.post_template in self.exportertemplates):
                         if digcore.kwoptions is None:
                             # todo
                             multi_results.append(idx)
@@ -457,7 +531,7 @@ class MultiProcessor(Processor):
                 multi_dig_res = self.multi_dig(
                     *_couple_dig, post=False, whichlock=whichlock)
                 for idx, figlabel, kwargs, _couple in couple_todo:
-                    digcore = self._availablelabels_lib[figlabel]
+                    digcore = self._get_digcore(figlabel)
                     exportcore = self._exporters_lib[digcore.post_template]
                     # add
                     assert multi_results[idx] == idx
@@ -476,6 +550,7 @@ class MultiProcessor(Processor):
                        mpl_backend, lock, count, total, name_it=True):
         '''
         Use results create figure, then save it.
+        Return status, accfiglabel, save file or failed reason, and time.
 
         Parameters
         ----------
@@ -486,11 +561,13 @@ class MultiProcessor(Processor):
         figlabel = results['figlabel']
         if name_it:
             multiprocessing.current_process().name = figlabel
+        start = time.time()
         if results['status'] == 200:
             accfiglabel = results['accfiglabel']
             try:
-                self.visplter.subprocess_fix_backend_etc(
-                    mpl_backend=mpl_backend)
+                if mpl_backend:
+                    self.visplter.subprocess_fix_backend_etc(
+                        mpl_backend=mpl_backend)
                 plog.debug("Start creating %s ..." % accfiglabel)
                 figure = self.visplter.create_template_figure(
                     results, replace=revis)
@@ -498,7 +575,8 @@ class MultiProcessor(Processor):
                 plog.error("%s: Failed to create figure %s!" % (
                     self.name, accfiglabel),  exc_info=1)
                 self._count_task_done(lock, count, total, 'Visplt')
-                return False, accfiglabel, '(500) failed to create'
+                return (False, accfiglabel, '(500) failed to create',
+                        time.time() - start)
             else:
                 _fl = accfiglabel if savename == 'accfiglabel' else figlabel
                 fname = '%s.%s' % (_fl.replace('/', '-'), saveext)
@@ -510,23 +588,31 @@ class MultiProcessor(Processor):
                     plog.error("%s: Failed to save figure %s!" % (
                         self.name, accfiglabel),  exc_info=1)
                     self._count_task_done(lock, count, total, 'Visplt')
-                    return False, accfiglabel, '(500) failed to save'
+                    return (False, accfiglabel, '(500) failed to save',
+                            time.time() - start)
                 else:
                     self._count_task_done(lock, count, total, 'Visplt')
-                    return True, accfiglabel, fname
+                    return True, accfiglabel, fname, time.time() - start
         else:
             status, reason = results['status'], results['reason']
             plog.error("%s: Failed to create figure %s: (%d) %s" % (
                 self.name, figlabel, status, reason),  exc_info=1)
             self._count_task_done(lock, count, total, 'Visplt')
-            return False, results['accfiglabel'], "(%d) %s" % (status, reason)
+            return (False, results['accfiglabel'],
+                    "(%d) %s" % (status, reason), None)
+
+    def _visplt_stats_keys(self, results):
+        return ('visplt:%s/%s' % (self.name, results.get('figlabel')),
+                'visplt:%s/%s' % (self.name, results.get('template')))
 
     def multi_visplt(self, *couple_figlabels, revis=False,
                      savename='figlabel', saveext='png', savepath='.',
-                     mpl_backend='agg', whichlock='write', callback=None):
+                     mpl_backend='agg', whichlock='write', callback=None,
+                     timings=False):
         '''
         Get results of *couple_figlabels* and visualize(plot), save them.
         Multiprocess version of :meth:`visplt`.
+        Figures are plotted longest predicted time first.
 
         Returns
         -------
@@ -550,6 +636,9 @@ class MultiProcessor(Processor):
             Recommand using non_interactive backends, like 'agg', 'cairo' etc.
         whichlock: see :meth:`multi_dig`
         callback: see :meth:`multi_dig`
+        timings: bool
+            If True, append a dict of predicted and actual plot time
+            to each item in two returned lists, default False.
         others: see :meth:`visplt`
         '''
         if not self.visplter:
@@ -562,6 +651,13 @@ class MultiProcessor(Processor):
         if not os.path.isdir(savepath):
             os.mkdir(savepath)
         nworkers = min(self.multiproc, len(multi_results))
+        predicted = [self.digstats.predict(*self._visplt_stats_keys(res))
+                     if res['status'] == 200 else 0.0
+                     for res in multi_results]
+        order, assignment, makespan = self.digstats.schedule(
+            predicted, nworkers)
+        plog.debug("Predicted visplt makespan %.3fs with %d workers."
+                   % (makespan, nworkers))
         with get_glogger_work_initializer() as loginitializer:
             lock = self.manager.RLock()
             count = self.manager.Value('i', 0, lock=False)
@@ -569,19 +665,27 @@ class MultiProcessor(Processor):
             with multiprocessing.Pool(
                     processes=nworkers,
                     initializer=loginitializer) as pool:
-                async_results = [pool.apply_async(
+                async_results = {idx: pool.apply_async(
                     self._visplt_worker,
-                    (results, revis, savename, saveext, savepath,
+                    (multi_results[idx], revis, savename, saveext, savepath,
                         mpl_backend, lock, count, total))
-                    for results in multi_results]
+                    for idx in order}
                 pool.close()
                 pool.join()
-            for res in async_results:
-                data = res.get()
+            for idx in range(len(multi_results)):
+                data = async_results[idx].get()
+                if data[3] is not None:
+                    for key in self._visplt_stats_keys(multi_results[idx]):
+                        self.digstats.record(key, data[3])
+                item = data[1:3]
+                if timings:
+                    item = (*item, dict(predicted=predicted[idx],
+                                        actual=data[3]))
                 if data[0]:
-                    success.append(data[1:])
+                    success.append(item)
                 else:
-                    fail.append(data[1:])
+                    fail.append(item)
+            self.digstats.save()
         return success, fail
 
     # # End Visplt Part
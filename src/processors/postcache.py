@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains bounded in-memory cache of post-dig and export outputs.
+'''
+
+import threading
+import collections
+
+__all__ = ['PostCache']
+
+
+class PostCache(object):
+    '''
+    Least recently used cache of post-dig results and export payloads.
+
+    Attributes
+    ----------
+    maxsize: int
+        max number of entries, 0 means disabled
+    hits: int
+    misses: int
+
+    Notes
+    -----
+    1. Keys are tuples, and the second item is the accfiglabel,
+       like ('post', accfiglabel) or ('export', accfiglabel, ...).
+       :meth:`discard` drops all entries of one accfiglabel.
+    2. Only the entries count is bounded, not their size in bytes.
+    3. Cache is not pickled, new copies in worker processes start empty.
+    '''
+    __slots__ = ['maxsize', 'hits', 'misses', '_data', '_lock']
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits, self.misses = 0, 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        '''Return value of *key* and mark it as recently used.'''
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        '''Add *key*, drop the least recently used entries if full.'''
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, accfiglabel):
+        '''Drop all entries of *accfiglabel*.'''
+        with self._lock:
+            for key in [k for k in self._data if k[1] == accfiglabel]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getstate__(self):
+        return self.maxsize
+
+    def __setstate__(self, maxsize):
+        self.__init__(maxsize)
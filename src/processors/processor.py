@@ -11,6 +11,9 @@ import re
 import time
 import pickle
 import hashlib
+import asyncio
+import functools
+import threading
 
 from .. import __gversion__
 from ..glogger import getGLogger
@@ -19,9 +22,17 @@ from ..savers import is_pcksaver, get_pcksaver
 from ..cores.exporter import (TmplLoader, ContourfExporter, LineExporter,
                               SharexTwinxExporter, Z111pExporter)
 from ..visplters import get_visplter, is_visplter
+from .digstats import get_digstats
+from .digmanifest import get_digmanifest
+from .postcache import PostCache
+from .digcache import get_digcache
+from .warmup import WarmUp
+from .asyncrunner import AsyncRunner
 
 __all__ = ['Processor']
 plog = getGLogger('P')
+_lazy_lock = threading.Lock()
+_save_lock = threading.Lock()
 
 
 class Processor(object):
@@ -59,6 +70,27 @@ class Processor(object):
        :attr:`saltstr` is the salt string generated from salt file.
     2. :attr:`dig_acceptable_time` means if :meth:`dig` spends more
        time than this, the results will be saved in :attr:`resfilesaver`.
+    3. :attr:`digstats` records dig time and input size of figlabels,
+       used to predict and schedule the costs of tasks.
+    4. If :attr:`lazy_dig` is True, digger cores are initialized only
+       when their figlabels are dug or exported. :attr:`availablelabels`
+       come from a cached manifest of figlabels, :attr:`digmanifest`.
+       Only the first time, all digger cores are initialized to build it.
+    5. :attr:`postcache` keeps at most :attr:`postcache_size` outputs of
+       post_dig and export in memory, so repeated :meth:`dig`,
+       :meth:`export` or :meth:`visplt` with the same kwargs are lookups.
+       Set :attr:`postcache_size` to 0 to disable it.
+    6. New dig results which take more than :attr:`digcache_min_time`
+       are also saved in :attr:`digcache`, shared across sessions, keyed
+       by saltstr, figlabel, kwargs, digger code version and input data.
+       *redig* skips reading it in :meth:`dig`, but new results are saved.
+    7. :meth:`warm` digs default results of figlabels in background
+       threads and saves them in :attr:`resfilesaver`, so later
+       :meth:`dig` of them are just loads.
+    8. Coroutines :meth:`adig`, :meth:`aexport`, :meth:`avisplt` and
+       :meth:`amulti_export` run in the threads of :attr:`asyncrunner`,
+       at most :attr:`async_workers`. Concurrent requests of the same
+       figlabel and kwargs share one call.
     '''
 
     @property
@@ -210,15 +242,30 @@ class Processor(object):
                 self.pcksaver.write(core.group, core.convert())
         self._post_convert()
 
+    def _convert_if_needed(self, add_desc=None, overwrite=False):
+        '''Convert raw data if pcksaver.path doesn't exist or *overwrite*.'''
+        if os.path.isfile(self.pcksaver.path):
+            if overwrite:
+                plog.warning("Remove old %s data file: %s!"
+                             % ('converted', self.pcksaver.path))
+                os.remove(self.pcksaver.path)
+                self.convert(add_desc=add_desc)
+        else:
+            self.convert(add_desc=add_desc)
+
     # # End Convert Part
 
     # # Start Dig Part
 
     __slots__.extend(['_pckloader', '_ressaver', '_resfilesaver',
                       '_diggers', '_availablelabels_lib', '_availablelabels',
-                      '_resloader', '_resfileloader', '_diggedlabels'])
+                      '_resloader', '_resfileloader', '_diggedlabels',
+                      '_postcache'])
     DiggerCores = []
     dig_acceptable_time = 30
+    lazy_dig = False
+    postcache_size = 128
+    digcache_min_time = 1
 
     def _check_pckloader_backward_version(self, pckloader):
         return False
@@ -249,19 +296,83 @@ class Processor(object):
 
     def _set_pckloader(self, pckloader):
         self._diggers = []
+        self._availablelabels_lib = {}
         if pckloader and self.__check_pckloader(pckloader):
             self._pckloader = pckloader
-            for Dc in self.DiggerCores:
-                self._diggers.extend(Dc.generate_cores(pckloader))
+            if self.lazy_dig:
+                self._availablelabels_lib = self._lazy_digcores(pckloader)
+            else:
+                for Dc in self.DiggerCores:
+                    self._diggers.extend(Dc.generate_cores(pckloader))
+                self._availablelabels_lib = {
+                    dc.figlabel: dc for dc in self._diggers}
         else:
             self._pckloader = None
-        self._availablelabels_lib = {dc.figlabel: dc for dc in self._diggers}
         self._availablelabels = sorted(self._availablelabels_lib.keys())
 
     pckloader = property(_get_pckloader, _set_pckloader)
 
+    @property
+    def digmanifest(self):
+        return get_digmanifest()
+
+    def _lazy_digcores(self, pckloader):
+        '''
+        Return {figlabel: (core, numseed)} of *pckloader*,
+        using figlabels in :attr:`digmanifest`.
+        '''
+        specs = {}
+        for Dc in self.DiggerCores:
+            for dc, numseed in Dc.generate_specs(pckloader):
+                specs[(dc.clsname, tuple(dc.section), numseed)] = (
+                    dc, numseed)
+        key = self.digmanifest.key(self.name, pckloader)
+        manifest = self.digmanifest.load(key)
+        if manifest is not None:
+            try:
+                return {figlabel: specs[(c, tuple(s), n)]
+                        for figlabel, (c, s, n) in manifest.items()}
+            except (KeyError, TypeError, ValueError):
+                plog.warning("%s: Invalid digger manifest %s, rebuild it!"
+                             % (self.name, key))
+        plog.info("%s: Building digger manifest %s ..." % (self.name, key))
+        lib, manifest = {}, {}
+        for (c, s, n), (dc, numseed) in specs.items():
+            if dc.__second_init__(numseed=numseed):
+                lib[dc.figlabel] = dc
+                manifest[dc.figlabel] = [c, s, n]
+        self._diggers.extend(lib.values())
+        self.digmanifest.save(key, manifest)
+        return lib
+
+    def _get_digcore(self, figlabel):
+        '''
+        Return digger core of *figlabel*, or None if not found.
+        Initialize it now if it is lazy.
+        '''
+        core = self._availablelabels_lib.get(figlabel, None)
+        if isinstance(core, tuple):
+            with _lazy_lock:
+                core = self._availablelabels_lib[figlabel]
+                if isinstance(core, tuple):
+                    dc, numseed = core
+                    if (dc.__second_init__(numseed=numseed)
+                            and dc.figlabel == figlabel):
+                        self._availablelabels_lib[figlabel] = dc
+                        self._diggers.append(dc)
+                        core = dc
+                    else:
+                        plog.error("%s: Failed to initialize digger of %s!"
+                                   % (self.name, figlabel))
+                        core = None
+        return core
+
     @property
     def diggers(self):
+        '''Digger cores, all lazy ones are initialized now.'''
+        if len(self._diggers) < len(self._availablelabels_lib):
+            for figlabel in self.availablelabels:
+                self._get_digcore(figlabel)
         return self._diggers
 
     @property
@@ -369,6 +480,65 @@ class Processor(object):
                            % (self.name, respath), exc_info=1)
                 self.resfilesaver = None
 
+    @property
+    def digstats(self):
+        return get_digstats()
+
+    @property
+    def digcache(self):
+        return get_digcache()
+
+    def _digcache_key(self, digcore, kwargs):
+        '''Return :attr:`digcache` key of *digcore* with *kwargs*.'''
+        loader = digcore.pckloader
+        keys = (*digcore.srckeys, *digcore.extrakeys)
+        if isinstance(loader.path, str) and os.path.isfile(loader.path):
+            # converted file, changed after converting again
+            data = 'mtime:%s' % os.path.getmtime(loader.path)
+        else:
+            data = 'size:%d' % loader.sizeof(*keys)
+        fingerprint = '%s;%s' % (','.join(keys), data)
+        return self.digcache.key(
+            self.saltstr, digcore.figlabel,
+            digcore.str_dig_kwargs(kwargs) or 'DEFAULT',
+            digcore.code_version(), fingerprint)
+
+    @property
+    def postcache(self):
+        if getattr(self, '_postcache', None) is None:
+            self._postcache = PostCache(self.postcache_size)
+        return self._postcache
+
+    def _post_dig(self, digcore, accfiglabel, results):
+        '''Call post_dig of *digcore*, use :attr:`postcache` if possible.'''
+        key = ('post', accfiglabel)
+        new_results = self.postcache.get(key)
+        if new_results is None:
+            new_results = digcore.post_dig(results)
+            self.postcache.put(key, new_results)
+        # exporters add their kwargs in a shallow copy
+        return dict(new_results)
+
+    def _digstats_keys(self, digcore):
+        return ('dig:%s/%s' % (self.name, digcore.figlabel),
+                'dig:%s/%s' % (self.name, digcore.clsname))
+
+    def _digcore_size(self, digcore):
+        '''Size of data needed by *digcore* in bytes.'''
+        return digcore.pckloader.sizeof(*digcore.srckeys, *digcore.extrakeys)
+
+    def _predict_digtime(self, digcore):
+        '''Predict dig time of *digcore*, return None if unknown.'''
+        return self.digstats.predict(*self._digstats_keys(digcore),
+                                     size=self._digcore_size(digcore))
+
+    def _record_digtime(self, digcore, digtime, size=None):
+        '''Record dig time and input size of *digcore*.'''
+        if size is None:
+            size = self._digcore_size(digcore)
+        for key in self._digstats_keys(digcore):
+            self.digstats.record(key, digtime, size)
+
     def _before_new_dig(self, figlabel, redig, kwargs):
         '''Get digcore, try old dig results'''
         if not self.pckloader:
@@ -380,15 +550,17 @@ class Processor(object):
         if figlabel not in self.availablelabels:
             plog.error("%s: Figure %s not found!" % (self.name, figlabel))
             return None, 'Invalid figlabel', None
-        digcore = self._availablelabels_lib[figlabel]
+        digcore = self._get_digcore(figlabel)
+        if digcore is None:
+            return None, 'Invalid digcore', None
         gotkwargstr = digcore.str_dig_kwargs(kwargs) or 'DEFAULT'
         gotfiglabel = '%s/%s' % (figlabel, gotkwargstr)
         if not redig and gotfiglabel in self.diggedlabels:
-            if gotfiglabel in self.resloader.datagroups:
+            if self.resloader.group_keys(gotfiglabel):
                 # use resloader first
                 gotresloader, fileloader = self.resloader, False
             elif (self.resfileloader and
-                    gotfiglabel in self.resfileloader.datagroups):
+                    self.resfileloader.group_keys(gotfiglabel)):
                 gotresloader, fileloader = self.resfileloader, True
             else:
                 plog.error('%s: Not found %s in diggedlabels!'
@@ -403,7 +575,7 @@ class Processor(object):
                     plog.debug('Find %s digged results link to %s.' % (
                         gotfiglabel, linkgotfiglabel))
                     gotfiglabel = linkgotfiglabel
-            allkeys = gotresloader.refind('^%s/' % re.escape(gotfiglabel))
+            allkeys = gotresloader.group_keys(gotfiglabel)
             basekeys = [os.path.basename(k) for k in allkeys]
             resultstuple = gotresloader.get_many(*allkeys)
             results = {k: v for k, v in zip(basekeys, resultstuple)}
@@ -415,22 +587,51 @@ class Processor(object):
         else:
             return digcore, gotfiglabel, None
 
-    def _do_new_dig(self, digcore, kwargs):
-        '''Dig new results.'''
+    def _do_new_dig(self, digcore, kwargs, usecache=True):
+        '''
+        Dig new results, or get them from :attr:`digcache`.
+        Return accfiglabel, results and the original dig time.
+        '''
+        key = None
+        if self.digcache.path:
+            key = self._digcache_key(digcore, kwargs)
+            entry = self.digcache.load(key) if usecache else None
+            if entry is not None:
+                plog.info('Find %s digged results in digcache.'
+                          % entry['accfiglabel'])
+                if digcore.kwoptions is None:
+                    digcore.kwoptions = entry['kwoptions']
+                return entry['accfiglabel'], entry['results'], entry['digtime']
         results, acckwargstr, digtime = digcore.dig(**kwargs)
         if not acckwargstr:
             acckwargstr = 'DEFAULT'
         accfiglabel = '%s/%s' % (digcore.figlabel, acckwargstr)
+        if key and results and digtime > self.digcache_min_time:
+            self.digcache.save(key, dict(
+                accfiglabel=accfiglabel, results=results,
+                kwoptions=digcore.kwoptions, digtime=digtime))
         return accfiglabel, results, digtime
 
     def _cachesave_new_dig(self, accfiglabel, gotfiglabel, results):
-        '''Cache dig results, link DEFAULT to accfiglabel.'''
+        '''
+        Cache dig results, link DEFAULT to accfiglabel.
+        Then add the new keys to :attr:`resloader`, no rebuilding,
+        and drop old outputs of accfiglabel in :attr:`postcache`.
+        '''
+        newkeys = ['%s/%s' % (accfiglabel, k) for k in results]
         with self.ressaver:
             self.ressaver.write(accfiglabel, results)
             if (gotfiglabel.endswith('/DEFAULT')
                     and not accfiglabel.endswith('/DEFAULT')):
                 # link double cache
                 self.ressaver.write(gotfiglabel, dict(_LINK=accfiglabel))
+                newkeys.append('%s/_LINK' % gotfiglabel)
+        self.postcache.discard(accfiglabel)
+        if self.resloader:
+            self.resloader.add_keys(*newkeys)
+            self._diggedlabels.update(os.path.dirname(k) for k in newkeys)
+        else:
+            self.resloader = get_pckloader(self.ressaver.get_store())
 
     def _filesave_new_dig(self, accfiglabel, gotfiglabel, results, digcore):
         '''Save dig results in file, link DEFAULT to accfiglabel.'''
@@ -450,6 +651,21 @@ class Processor(object):
                 self.resfilesaver.write(
                     gotfiglabel, dict(_LINK=accfiglabel))
 
+    @staticmethod
+    def _filter_couple_figlabel(_couple):
+        '''Return figlabel, kwargs'''
+        if isinstance(_couple, str):
+            return _couple, {}
+        elif isinstance(_couple, dict):
+            copy = _couple.copy()
+            figlabel = copy.pop('figlabel', None)
+            if figlabel:
+                return figlabel, copy
+            else:
+                return None, "No figlabel in couple_figlabel"
+        else:
+            return None, "Invalid couple_figlabel type"
+
     def dig(self, figlabel, redig=False, callback=None, post=True, **kwargs):
         '''
         Get digged results of *figlabel*.
@@ -476,21 +692,24 @@ class Processor(object):
             return data
         digcore, gotfiglabel, results = data
         if results is None:
-            accfiglabel, results, digtime = self._do_new_dig(digcore, kwargs)
-            self._cachesave_new_dig(accfiglabel, gotfiglabel, results)
-            self.resloader = get_pckloader(self.ressaver.get_store())
-            if self.resfilesaver and digtime > self.dig_acceptable_time:
-                # long execution time
-                self._filesave_new_dig(
-                    accfiglabel, gotfiglabel, results, digcore)
-                self.resfileloader = get_pckloader(
-                    self.resfilesaver.get_store())
+            accfiglabel, results, digtime = self._do_new_dig(
+                digcore, kwargs, usecache=not redig)
+            with _save_lock:
+                self._record_digtime(digcore, digtime)
+                self.digstats.save()
+                self._cachesave_new_dig(accfiglabel, gotfiglabel, results)
+                if self.resfilesaver and digtime > self.dig_acceptable_time:
+                    # long execution time
+                    self._filesave_new_dig(
+                        accfiglabel, gotfiglabel, results, digcore)
+                    self.resfileloader = get_pckloader(
+                        self.resfilesaver.get_store())
         else:
             accfiglabel = gotfiglabel
         if callable(callback):
             callback(accfiglabel, results)
         if post:
-            results = digcore.post_dig(results)
+            results = self._post_dig(digcore, accfiglabel, results)
         return accfiglabel, results, digcore.post_template
 
     def dig_doc(self, figlabel, see='help'):
@@ -505,7 +724,9 @@ class Processor(object):
         if figlabel not in self.availablelabels:
             plog.error("%s: Figure %s not found!" % (self.name, figlabel))
             return
-        digcore = self._availablelabels_lib[figlabel]
+        digcore = self._get_digcore(figlabel)
+        if digcore is None:
+            return
         if see == 'help':
             help(digcore.dig)
         elif see == 'print':
@@ -521,6 +742,86 @@ class Processor(object):
         return tuple(filter(
             lambda k: True if re.match(pat, k) else False, self.availablelabels))
 
+    def _warm_order(self, figlabels):
+        '''
+        Sort *figlabels* by predicted dig time times popularity, the
+        number of past digs. Return sorted figlabels and predicted times.
+        '''
+        items = []
+        for figlabel in figlabels:
+            digcore = self._get_digcore(figlabel)
+            if digcore is None:
+                continue
+            count = self.digstats.count(self._digstats_keys(digcore)[0])
+            items.append((figlabel, self._predict_digtime(digcore), count))
+        known = [p for f, p, c in items if p is not None]
+        default = sum(known) / len(known) if known else 1.0
+        items.sort(key=lambda it: -(default if it[1] is None else it[1])
+                   * (1 + it[2]))
+        return [it[0] for it in items], [it[1] for it in items]
+
+    def _warm_worker(self, figlabel):
+        '''
+        Dig DEFAULT results of *figlabel* if needed, save them in
+        :attr:`resfilesaver`. Return 'done', 'failed' or 'skipped'.
+        '''
+        digcore, gotfiglabel, results = self._before_new_dig(
+            figlabel, False, {})
+        if digcore is None:
+            return 'failed'
+        if (self.resfileloader
+                and self.resfileloader.group_keys(gotfiglabel)):
+            return 'skipped'
+        if results is None:
+            accfiglabel, results, digtime = self._do_new_dig(digcore, {})
+            with _save_lock:
+                self._record_digtime(digcore, digtime)
+                self.digstats.save()
+                self._cachesave_new_dig(accfiglabel, gotfiglabel, results)
+        else:
+            # only in resloader, gotfiglabel may be linked
+            accfiglabel = gotfiglabel
+            gotfiglabel = '%s/DEFAULT' % figlabel
+        with _save_lock:
+            self._filesave_new_dig(accfiglabel, gotfiglabel, results, digcore)
+            self.resfileloader = get_pckloader(self.resfilesaver.get_store())
+        plog.info('Warmed %s.' % accfiglabel)
+        return 'done'
+
+    def warm(self, patterns=('.*',), budget_seconds=None, workers=1):
+        '''
+        Dig DEFAULT results of figlabels matching *patterns* in background
+        threads, and save them in :attr:`resfilesaver`. Figlabels already
+        saved are skipped. The others are ordered by predicted dig time
+        and popularity, costly and popular first.
+        Return a :class:`WarmUp` handle, which can wait or cancel them.
+
+        Parameters
+        ----------
+        patterns: list of str
+            regular expressions to select figlabels, see :meth:`refind`
+        budget_seconds: float
+            no new dig starts after it, and figlabels predicted to take
+            longer than the remaining time are skipped, default no limit
+        workers: int
+            number of worker threads, default 1
+        '''
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        figlabels = []
+        for pattern in patterns:
+            figlabels.extend(f for f in self.refind(pattern)
+                             if f not in figlabels)
+        if not self.resfilesaver:
+            plog.error("%s: Need a results file pcksaver object to warm!"
+                       % self.name)
+            figlabels = []
+        figlabels, predicted = self._warm_order(figlabels)
+        plog.info("%s: Warm %d figlabels in background."
+                  % (self.name, len(figlabels)))
+        return WarmUp(figlabels, predicted=predicted,
+                      budget=budget_seconds).start(self._warm_worker, workers)
+
     # # End Dig Part
 
     # # Start Export Part
@@ -580,19 +881,29 @@ class Processor(object):
         if figlabel in self.availablelabels:
             if what == 'axes':
                 label_kw, res, tmpl = self.dig(
-                    figlabel, callback=callback, post=True, **kwargs)
+                    figlabel, callback=callback, post=False, **kwargs)
                 if tmpl in self.exportertemplates:
                     exportcore = self._exporters_lib[tmpl]
-                    return exportcore.export(
-                        res, otherinfo=dict(status=200,
-                                            figlabel=figlabel,
-                                            accfiglabel=label_kw,
-                                            ), fmt=fmt, **kwargs)
+                    key = ('export', label_kw,
+                           exportcore.str_export_kwargs(kwargs), fmt)
+                    output = self.postcache.get(key)
+                    if output is None:
+                        res = self._post_dig(
+                            self._get_digcore(figlabel), label_kw, res)
+                        output = exportcore.export(
+                            res, otherinfo=dict(status=200,
+                                                figlabel=figlabel,
+                                                accfiglabel=label_kw,
+                                                ), fmt=fmt, **kwargs)
+                        self.postcache.put(key, output)
+                    if fmt == 'dict':
+                        output = dict(output, results=dict(output['results']))
+                    return output
                 else:
                     status, reason = 500, 'invalid template'
             elif what == 'options':
-                digcore = self._availablelabels_lib[figlabel]
-                if digcore.post_template in self.exportertemplates:
+                digcore = self._get_digcore(figlabel)
+                if digcore and digcore.post_template in self.exportertemplates:
                     if digcore.kwoptions is None:
                         a, b, c = self.dig(figlabel, post=False, **kwargs)
                     exportcore = self._exporters_lib[digcore.post_template]
@@ -674,6 +985,10 @@ class Processor(object):
                  for k in tuple(kwargs.keys()) if k.startswith('_show_')}
         results = self.export(
             figlabel, what='axes', fmt='dict', callback=callback, **kwargs)
+        return self._visplt_results(figlabel, results, revis, show, shkws)
+
+    def _visplt_results(self, figlabel, results, revis, show, shkws):
+        '''Visualize exported *results* of *figlabel*.'''
         if results['status'] == 200:
             try:
                 figure = self.visplter.create_template_figure(
@@ -691,6 +1006,137 @@ class Processor(object):
 
     # # End Visplt Part
 
+    # # Start Async Part
+
+    __slots__.extend(['_asyncrunner'])
+    async_workers = None
+
+    @property
+    def asyncrunner(self):
+        if getattr(self, '_asyncrunner', None) is None:
+            self._asyncrunner = AsyncRunner(self.async_workers)
+        return self._asyncrunner
+
+    def _async_label(self, figlabel, kwargs):
+        '''Return 'figlabel/digkwargstr' and digcore of *figlabel*.'''
+        if figlabel in self.availablelabels:
+            digcore = self._get_digcore(figlabel)
+            if digcore is not None:
+                return '%s/%s' % (
+                    figlabel, digcore.str_dig_kwargs(kwargs) or 'DEFAULT'
+                ), digcore
+        return '%s/%r' % (figlabel, sorted(kwargs.items())), None
+
+    async def adig(self, figlabel, redig=False, post=True,
+                   timeout=None, progress=None, **kwargs):
+        '''
+        Coroutine version of :meth:`dig`, run in :attr:`asyncrunner`.
+
+        Parameters
+        ----------
+        timeout: float
+            seconds to wait, then raise asyncio.TimeoutError
+        progress: callable
+            accept progress events, dicts like {'event': 'started',
+            'label': 'figlabel/digkwargstr', 'time': time.time()},
+            called in the event loop thread
+        others: see :meth:`dig`, *callback* is not supported
+        '''
+        label, digcore = self._async_label(figlabel, kwargs)
+        accfiglabel, results, template = await self.asyncrunner.run(
+            ('dig', label, redig, post), functools.partial(
+                self.dig, figlabel, redig=redig, post=post, **kwargs),
+            label=label, timeout=timeout, progress=progress)
+        if isinstance(results, dict):
+            # shared by concurrent requests
+            results = dict(results)
+        return accfiglabel, results, template
+
+    async def aexport(self, figlabel, what='axes', fmt='dict',
+                      timeout=None, progress=None, **kwargs):
+        '''
+        Coroutine version of :meth:`export`, run in :attr:`asyncrunner`.
+        *timeout*, *progress*: see :meth:`adig`
+        '''
+        label, digcore = self._async_label(figlabel, kwargs)
+        if digcore and digcore.post_template in self.exportertemplates:
+            exportcore = self._exporters_lib[digcore.post_template]
+            exportkwstr = exportcore.str_export_kwargs(kwargs)
+        else:
+            exportkwstr = ''
+        output = await self.asyncrunner.run(
+            ('export', label, exportkwstr, what, fmt), functools.partial(
+                self.export, figlabel, what=what, fmt=fmt, **kwargs),
+            label=label, timeout=timeout, progress=progress)
+        if fmt == 'dict' and 'results' in output:
+            output = dict(output, results=dict(output['results']))
+        return output
+
+    async def avisplt(self, figlabel, revis=False, show=True,
+                      timeout=None, progress=None, **kwargs):
+        '''
+        Coroutine version of :meth:`visplt`. Results are got by
+        :meth:`aexport`, then plotted in the calling thread, because
+        :attr:`visplter` is not thread-safe.
+        *timeout*, *progress*: see :meth:`adig`
+        '''
+        if not self.visplter:
+            plog.error("%s: Need a visplter object!" % self.name)
+            return
+        shkws = {k[6:]: kwargs.pop(k)
+                 for k in tuple(kwargs.keys()) if k.startswith('_show_')}
+        results = await self.aexport(
+            figlabel, what='axes', fmt='dict',
+            timeout=timeout, progress=progress, **kwargs)
+        return self._visplt_results(figlabel, results, revis, show, shkws)
+
+    async def amulti_export(self, *couple_figlabels, what='axes', fmt='dict',
+                            timeout=None, progress=None):
+        '''
+        Get results of *couple_figlabels* concurrently by :meth:`aexport`.
+        Return a list of :meth:`export` return in format *fmt*.
+        Failed or timeout ones are like {'status': 500 or 504, ...}.
+
+        Parameters
+        ----------
+        couple_figlabels: list of couple_figlabel
+            couple_figlabel can be figlabel str or dict, like
+            {'figlabel': 'group/fignum', 'other kwargs': True}
+        timeout: float
+            seconds to wait for each couple_figlabel
+        progress: callable
+            see :meth:`adig`, also accept events like
+            {'event': 'progress', 'done': 1, 'total': 3, 'time': ...}
+        '''
+        total, count = len(couple_figlabels), [0]
+
+        async def one(_couple):
+            figlabel, kwargs = self._filter_couple_figlabel(_couple)
+            if figlabel is None:
+                output = dict(status=500, reason=kwargs, figlabel=None)
+            else:
+                try:
+                    output = await self.aexport(
+                        figlabel, what=what, fmt=fmt, timeout=timeout,
+                        progress=progress, **kwargs)
+                except asyncio.TimeoutError:
+                    output = dict(status=504, reason='timeout',
+                                  figlabel=figlabel)
+                except Exception as exc:
+                    plog.error("%s: Failed to export %s!"
+                               % (self.name, figlabel), exc_info=1)
+                    output = dict(status=500, reason=repr(exc),
+                                  figlabel=figlabel)
+            count[0] += 1
+            if callable(progress):
+                progress(dict(event='progress', done=count[0], total=total,
+                              time=time.time()))
+            return output
+
+        return list(await asyncio.gather(*(one(c) for c in couple_figlabels)))
+
+    # # End Async Part
+
     def __repr__(self):
         # i = (' rawloader: %r\n pcksaver: %r\n'
         #     ' pckloader: %r\n ressaver: %r\n resfilesaver: %r\n'
@@ -801,14 +1247,7 @@ class Processor(object):
                       ('converted', self.pcksaver.path))
             if Sid and self.pcksaver._extension not in ['.npz', '.hdf5']:
                 return
-            if os.path.isfile(self.pcksaver.path):
-                if overwrite:
-                    plog.warning("Remove old %s data file: %s!"
-                                 % ('converted', self.pcksaver.path))
-                    os.remove(self.pcksaver.path)
-                    self.convert(add_desc=add_desc)
-            else:
-                self.convert(add_desc=add_desc)
+            self._convert_if_needed(add_desc=add_desc, overwrite=overwrite)
             if Sid and self.pcksaver._extension in ['.npz', '.hdf5']:
                 return
             try:
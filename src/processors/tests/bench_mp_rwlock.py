@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Benchmark native MP_RWLock against Manager-based MP_ManagerRWLock.
+Run it by ``python benchmarks-run.py bench_mp_rwlock.py``.
+'''
+
+import time
+import unittest
+import multiprocessing
+
+from .._mp_rwlock import MP_RWLock, MP_ManagerRWLock
+
+NPROC = 4
+NLOOP = 500
+
+
+def _loop(rwlock, nloop):
+    for i in range(nloop):
+        lock = rwlock.writer_lock if i % 5 == 0 else rwlock.reader_lock
+        lock.acquire()
+        lock.release()
+
+
+def _bench(rwlock, nproc=NPROC, nloop=NLOOP):
+    start = time.time()
+    procs = [multiprocessing.Process(target=_loop, args=(rwlock, nloop))
+             for i in range(nproc)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return time.time() - start
+
+
+class BenchMPRWLock(unittest.TestCase):
+    '''
+    Acquire and release locks in processes, one fifth are writer locks.
+    '''
+
+    def test_bench_rwlock(self):
+        manager = multiprocessing.Manager()
+        tmanager = _bench(MP_ManagerRWLock(manager))
+        manager.shutdown()
+        tnative = _bench(MP_RWLock())
+        print("\n%d x %d acquire-release: manager %.3fs, native %.3fs, "
+              "speedup %.1fx" % (NPROC, NLOOP, tmanager, tnative,
+                                 tmanager / tnative))
+        self.assertLess(tnative, tmanager)
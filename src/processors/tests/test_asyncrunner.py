@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import time
+import pickle
+import asyncio
+import threading
+import unittest
+
+from ..asyncrunner import AsyncRunner
+
+
+class TestAsyncRunner(unittest.TestCase):
+    '''
+    Test class AsyncRunner
+    '''
+
+    def setUp(self):
+        self.runner = AsyncRunner(max_workers=2)
+        self.calls = 0
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.runner.shutdown()
+
+    def work(self, value=1):
+        self.calls += 1
+        self.release.wait(10)
+        return value
+
+    def test_asyncrunner_share(self):
+        events = []
+
+        async def main():
+            tasks = [asyncio.ensure_future(self.runner.run(
+                'k', self.work, progress=events.append)) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(self.runner), 1)
+            self.release.set()
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(asyncio.run(main()), [1, 1, 1])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(self.runner), 0)
+        names = [e['event'] for e in events]
+        self.assertEqual(names.count('queued'), 1)
+        self.assertEqual(names.count('shared'), 2)
+        self.assertEqual(names.count('started'), 1)
+        self.assertEqual(names.count('done'), 3)
+
+    def test_asyncrunner_timeout_cancel(self):
+        async def main():
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.runner.run('k', self.work, timeout=0.1)
+            # running call is still shared after timeout
+            task = asyncio.ensure_future(self.runner.run('k', self.work))
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(self.runner), 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.release.set()
+
+        asyncio.run(main())
+        self.assertEqual(self.calls, 1)
+
+    def test_asyncrunner_cancel_queued(self):
+        async def main():
+            busy = [asyncio.ensure_future(self.runner.run(i, self.work))
+                    for i in range(2)]
+            await asyncio.sleep(0.1)
+            queued = asyncio.ensure_future(self.runner.run('q', self.work))
+            await asyncio.sleep(0.1)
+            queued.cancel()
+            await asyncio.sleep(0.1)
+            self.assertEqual(len(self.runner), 2)
+            self.release.set()
+            await asyncio.gather(*busy)
+
+        asyncio.run(main())
+        time.sleep(0.1)
+        self.assertEqual(self.calls, 2)
+
+    def test_asyncrunner_pickle(self):
+        runner = pickle.loads(pickle.dumps(self.runner))
+        self.assertEqual(runner.max_workers, 2)
+        self.assertIsNone(runner._executor)
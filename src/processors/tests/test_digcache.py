@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import os
+import time
+import shutil
+import unittest
+import tempfile
+
+from ..digcache import DigCache
+
+
+class TestDigCache(unittest.TestCase):
+    '''
+    Test class DigCache
+    '''
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(suffix='-test')
+
+    def tearDown(self):
+        if os.path.isdir(self.tmp):
+            shutil.rmtree(self.tmp)
+
+    def test_digcache_key(self):
+        args = ['salt', 'g/f', 'DEFAULT', 'v1', 'g/a:8']
+        key = DigCache.key(*args)
+        self.assertEqual(key, DigCache.key(*args))
+        for i in range(len(args)):
+            changed = list(args)
+            changed[i] += '0'
+            self.assertNotEqual(key, DigCache.key(*changed))
+
+    def test_digcache_save_load(self):
+        cache = DigCache(self.tmp)
+        self.assertIsNone(cache.load('ab12'))
+        cache.save('ab12', dict(results=dict(x=[1, 2])))
+        self.assertEqual(cache.load('ab12'), dict(results=dict(x=[1, 2])))
+        self.assertIsNone(DigCache().load('ab12'))
+
+    def test_digcache_evict(self):
+        cache = DigCache(self.tmp, maxsize=2**40)
+        for key in ('aa01', 'bb02', 'cc03'):
+            cache.save(key, dict(results=bytes(1000)))
+            time.sleep(0.02)
+        # read, most recently used
+        self.assertIsNotNone(cache.load('aa01'))
+        cache.maxsize = 2500
+        cache.evict()
+        self.assertIsNotNone(cache.load('aa01'))
+        self.assertIsNone(cache.load('bb02'))
+        self.assertIsNotNone(cache.load('cc03'))
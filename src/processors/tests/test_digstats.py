@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import os
+import unittest
+import tempfile
+
+from ..digstats import DigStats
+
+
+class TestDigStats(unittest.TestCase):
+    '''
+    Test class DigStats
+    '''
+
+    def setUp(self):
+        self.tmpfile = tempfile.mktemp(suffix='-test.json')
+
+    def tearDown(self):
+        if os.path.isfile(self.tmpfile):
+            os.remove(self.tmpfile)
+
+    def test_digstats_record_predict(self):
+        stats = DigStats(self.tmpfile)
+        self.assertIsNone(stats.predict('dig:T/test/mnpq'))
+        stats.record('dig:T/test/mnpq', 2.0, size=100)
+        stats.record('dig:T/test/mnpq', 4.0, size=100)
+        self.assertAlmostEqual(stats.predict('dig:T/test/mnpq'), 3.0)
+        self.assertAlmostEqual(
+            stats.predict('dig:T/a/b', 'dig:T/test/mnpq', size=200), 6.0)
+        self.assertEqual(stats.count('dig:T/a/b', 'dig:T/test/mnpq'), 2)
+        self.assertEqual(stats.count('dig:T/a/b'), 0)
+
+    def test_digstats_save_merge(self):
+        stats1, stats2 = DigStats(self.tmpfile), DigStats(self.tmpfile)
+        stats1.record('a', 1.0)
+        stats1.save()
+        stats2.record('b', 2.0)
+        stats2.save()
+        stats = DigStats(self.tmpfile)
+        self.assertEqual(stats.predict('a'), 1.0)
+        self.assertEqual(stats.predict('b'), 2.0)
+
+    def test_digstats_schedule(self):
+        order, assignment, makespan = DigStats.schedule(
+            [1.0, 5.0, None, 3.0, 3.0], 2)
+        self.assertEqual(order[0], 1)
+        self.assertListEqual(sorted(order), list(range(5)))
+        # 5 + 3 | 3(mean) + 3 + 1
+        self.assertEqual(assignment[1], assignment[4])
+        self.assertEqual(assignment[2], assignment[3])
+        self.assertAlmostEqual(makespan, 8.0)
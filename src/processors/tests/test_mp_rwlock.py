@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import time
+import unittest
+import multiprocessing
+
+from .._mp_rwlock import MP_RWLock
+
+
+def _try_acquire(rwlock, which, timeout, result):
+    lock = getattr(rwlock, which)
+    if lock.acquire(timeout=timeout):
+        result.value = 1
+        lock.release()
+    else:
+        result.value = -1
+
+
+class TestMPRWLock(unittest.TestCase):
+    '''
+    Test native MP_RWLock class.
+    '''
+
+    def setUp(self):
+        self.rwlock = MP_RWLock()
+        self.result = multiprocessing.Value('i', 0)
+
+    def child(self, which, timeout):
+        p = multiprocessing.Process(
+            target=_try_acquire,
+            args=(self.rwlock, which, timeout, self.result))
+        p.start()
+        return p
+
+    def test_rwlock_readers_share(self):
+        with self.rwlock.reader_lock:
+            p = self.child('reader_lock', 2)
+            p.join()
+        self.assertEqual(self.result.value, 1)
+
+    def test_rwlock_writer_exclusive(self):
+        with self.rwlock.reader_lock:
+            p = self.child('writer_lock', 0.2)
+            p.join()
+        self.assertEqual(self.result.value, -1)
+        with self.rwlock.writer_lock:
+            p = self.child('reader_lock', 0.2)
+            p.join()
+        self.assertEqual(self.result.value, -1)
+        self.assertTrue(self.rwlock.writer_lock.acquire(timeout=0.2))
+        self.rwlock.writer_lock.release()
+
+    def test_rwlock_writer_preferring(self):
+        self.rwlock.reader_lock.acquire()
+        p = self.child('writer_lock', 5)
+        core = self.rwlock.writer_lock.lock
+        while core.waiting.value == 0:
+            time.sleep(0.01)
+        # writer is waiting, new readers must yield
+        self.assertFalse(self.rwlock.reader_lock.acquire(timeout=0.2))
+        self.rwlock.reader_lock.release()
+        p.join()
+        self.assertEqual(self.result.value, 1)
+        self.assertTrue(self.rwlock.reader_lock.acquire(timeout=0.2))
+        self.rwlock.reader_lock.release()
+
+    def test_rwlock_release_unacquired(self):
+        with self.assertRaises(RuntimeError):
+            self.rwlock.reader_lock.release()
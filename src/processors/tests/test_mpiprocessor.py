@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Run with more ranks:
+    mpirun -n 4 python -m unittest gdpy3.processors.tests.test_mpiprocessor
+'''
+
+import os
+import unittest
+import tempfile
+import shutil
+
+try:
+    from mpi4py import MPI
+    HAVE_MPI4PY = True
+except ImportError:
+    HAVE_MPI4PY = False
+
+from .. import get_processor
+from ..lib import *
+
+register_Processor('TDP', '.tests', 'T')
+
+
+@unittest.skipUnless(HAVE_MPI4PY, "requires mpi4py")
+class TestMPIProcessor(unittest.TestCase):
+    '''
+    Test MPI Processor class. Only rank 0 checks results.
+    '''
+
+    def setUp(self):
+        self.comm = MPI.COMM_WORLD
+        self.rank = self.comm.Get_rank()
+        tmp = None
+        if self.rank == 0:
+            tmp = tempfile.mktemp(suffix='-test')
+            os.mkdir(tmp)
+            with open(os.path.join(tmp, 'test.out'), mode='w') as f:
+                f.write('10\n20\n30\n40')
+        self.tmp = self.comm.bcast(tmp, root=0)
+        self.figlabel = 'test/mnpq'
+
+    def tearDown(self):
+        self.comm.Barrier()
+        if self.rank == 0 and os.path.isdir(self.tmp):
+            shutil.rmtree(self.tmp)
+
+    def test_processor_mpi_name(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='mpi4py')
+        self.assertEqual(gdp.name, 'TDP')
+        self.assertEqual(gdp.pckloader.get('processor'), 'TDP')
+        self.assertEqual(gdp.size, self.comm.Get_size())
+
+    def test_processor_mpi_multi_dig(self):
+        gdpcls = get_processor(name='TDP', parallel='mpi4py')
+        gdpcls.dig_acceptable_time = 0
+        gdp = gdpcls(self.tmp)
+        X = []
+
+        def get_X(accfiglabel, res):
+            X.append(res['x'])
+
+        out = gdp.multi_dig(self.figlabel, {'figlabel': self.figlabel},
+                            'test/notexist', callback=get_X, timings=True)
+        if self.rank == 0:
+            accfiglabel, results, template, timing = out[0]
+            self.assertTrue(accfiglabel in gdp.diggedlabels)
+            self.assertTrue(accfiglabel in gdp.resfileloader.datagroups)
+            self.assertEqual(len(X), 2)
+            self.assertIsNotNone(timing['actual'])
+            self.assertIsNone(out[2][0])
+        else:
+            self.assertIsNone(out)
+
+    def test_processor_mpi_multi_visplt(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='mpi4py')
+        out = gdp.multi_visplt(self.figlabel, 'test/notexist',
+                               savepath=self.tmp)
+        if self.rank == 0:
+            success, fail = out
+            self.assertEqual(len(success), 1)
+            self.assertEqual(len(fail), 1)
+            self.assertTrue(
+                os.path.isfile(os.path.join(self.tmp, success[0][1])))
+        else:
+            self.assertIsNone(out)
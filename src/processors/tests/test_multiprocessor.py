@@ -43,6 +43,27 @@ class TestMultiprocessProcessor(unittest.TestCase):
         accfiglabel, results, template = out[0]
         self.assertTrue(accfiglabel in gdp.resfileloader.datagroups)
 
+    def test_processor_multi_dig_timings(self):
+        gdpcls = get_processor(name='TDP', parallel='multiprocess')
+        gdpcls.multiproc = 2
+        gdp = gdpcls(self.tmp)
+        out = gdp.multi_dig(self.figlabel, timings=True)
+        accfiglabel, results, template, timing = out[0]
+        self.assertGreaterEqual(timing['actual'], 0)
+        self.assertIsNotNone(gdp.digstats.predict('dig:TDP/%s' % self.figlabel))
+        out = gdp.multi_dig(self.figlabel, timings=True)
+        self.assertIsNone(out[0][3]['actual'])
+
+    def test_processor_multi_dig_rwlock(self):
+        gdpcls = get_processor(name='TDP', parallel='multiprocess')
+        gdpcls.dig_acceptable_time = 0
+        gdpcls.multiproc = 2
+        gdp = gdpcls(self.tmp)
+        out = gdp.multi_dig(self.figlabel, whichlock='read-write')
+        accfiglabel, results, template = out[0]
+        self.assertTrue(accfiglabel in gdp.diggedlabels)
+        self.assertTrue(accfiglabel in gdp.resfileloader.datagroups)
+
     def test_processor_multi_visplt(self):
         gdp = get_processor(self.tmp, name='TDP', parallel='multiprocess')
         accfiglabels = gdp.multi_visplt(self.figlabel, savepath=self.tmp)
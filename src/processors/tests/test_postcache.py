@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import pickle
+import unittest
+
+from ..postcache import PostCache
+
+
+class TestPostCache(unittest.TestCase):
+    '''
+    Test class PostCache
+    '''
+
+    def test_postcache_lru(self):
+        cache = PostCache(maxsize=2)
+        cache.put(('post', 'a/1'), 1)
+        cache.put(('post', 'b/1'), 2)
+        self.assertEqual(cache.get(('post', 'a/1')), 1)
+        cache.put(('export', 'c/1', '', 'dict'), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(('post', 'b/1')))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_postcache_discard(self):
+        cache = PostCache()
+        cache.put(('post', 'a/1'), 1)
+        cache.put(('export', 'a/1', 'k=1', 'dict'), 2)
+        cache.put(('post', 'a/2'), 3)
+        cache.discard('a/1')
+        self.assertEqual(len(cache), 1)
+        self.assertTrue(('post', 'a/2') in cache)
+
+    def test_postcache_disabled_and_pickle(self):
+        cache = PostCache(maxsize=0)
+        cache.put(('post', 'a/1'), 1)
+        self.assertEqual(len(cache), 0)
+        cache = PostCache(maxsize=4)
+        cache.put(('post', 'a/1'), 1)
+        new = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((new.maxsize, len(new)), (4, 0))
@@ -55,6 +55,9 @@ class TestSerialProcessor(unittest.TestCase):
         self.assertTrue(accfiglabel in gdp.diggedlabels)
         self.assertTrue(isinstance(results, dict))
         self.assertEqual(template, 'tmpl_line')
+        self.assertTrue(gdp.resloader.group_keys(accfiglabel))
+        again = gdp.dig(self.figlabel, post=False)
+        self.assertEqual(again[0], accfiglabel)
 
     def test_processor_dig_save2file(self):
         gdpcls = get_processor(name='TDP', parallel='off')
@@ -70,6 +73,100 @@ class TestSerialProcessor(unittest.TestCase):
         options = gdp.export(self.figlabel, what='options')
         self.assertEqual(options['digoptions'], {})
 
+    def test_processor_postcache(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='off')
+        res1 = gdp.export(self.figlabel)
+        misses = gdp.postcache.misses
+        res2 = gdp.export(self.figlabel)
+        self.assertEqual(gdp.postcache.misses, misses)
+        self.assertEqual(res1['accfiglabel'], res2['accfiglabel'])
+        self.assertEqual(res1['results'], res2['results'])
+        self.assertIsNot(res1['results'], res2['results'])
+        json1 = gdp.export(self.figlabel, fmt='json')
+        self.assertEqual(json1, gdp.export(self.figlabel, fmt='json'))
+        self.assertTrue(
+            ('export', res1['accfiglabel'], '', 'json') in gdp.postcache)
+        # redig drops old outputs
+        accfiglabel = gdp.dig(self.figlabel, redig=True, post=False)[0]
+        self.assertFalse(('post', accfiglabel) in gdp.postcache)
+        self.assertFalse(('export', accfiglabel, '', 'json') in gdp.postcache)
+        gdp.dig(self.figlabel)
+        self.assertTrue(('post', accfiglabel) in gdp.postcache)
+
+    def test_processor_digcache(self):
+        from ..digcache import DigCache
+        gdpcls = get_processor(name='TDP', parallel='off')
+        gdpcls.digcache = DigCache(os.path.join(self.tmp, 'digcache'))
+        gdpcls.digcache_min_time = -1
+        try:
+            gdp = gdpcls(self.tmp)
+            accfiglabel, results, template = gdp.dig(self.figlabel)
+            digcore = gdp._get_digcore(self.figlabel)
+            key = gdp._digcache_key(digcore, {})
+            self.assertEqual(
+                gdp.digcache.load(key)['accfiglabel'], accfiglabel)
+            # new session, results from digcache
+            entry = gdp.digcache.load(key)
+            entry['results'] = dict(entry['results'], title='cached')
+            gdp.digcache.save(key, entry)
+            for f in os.listdir(self.tmp):
+                if '.digged.' in f:
+                    os.remove(os.path.join(self.tmp, f))
+            gdp = gdpcls(self.tmp)
+            self.assertFalse(accfiglabel in gdp.diggedlabels)
+            label, res, tmpl = gdp.dig(self.figlabel, post=False)
+            self.assertEqual(label, accfiglabel)
+            self.assertEqual(res['title'], 'cached')
+            self.assertTrue(accfiglabel in gdp.diggedlabels)
+            # redig skips it
+            label, res, tmpl = gdp.dig(self.figlabel, redig=True, post=False)
+            self.assertNotEqual(res['title'], 'cached')
+        finally:
+            del gdpcls.digcache
+            del gdpcls.digcache_min_time
+
+    def test_processor_warm(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='off')
+        handle = gdp.warm(['^test/'], workers=2)
+        self.assertTrue(handle.wait(timeout=60))
+        self.assertIn(self.figlabel, handle.done)
+        self.assertFalse(handle.failed)
+        accfiglabel = gdp.dig(self.figlabel, post=False)[0]
+        self.assertTrue(gdp.resfileloader.group_keys(accfiglabel))
+        # already saved
+        handle = gdp.warm(self.figlabel)
+        self.assertTrue(handle.wait(timeout=60))
+        self.assertEqual(handle.skipped, [self.figlabel])
+        # cancelled before start
+        handle = gdp.warm('^test/', budget_seconds=60)
+        handle.cancel()
+        handle.wait()
+        self.assertFalse(handle.running)
+
+    def test_processor_async(self):
+        import asyncio
+        gdp = get_processor(self.tmp, name='TDP', parallel='off')
+        events = []
+
+        async def main():
+            return await asyncio.gather(
+                gdp.adig(self.figlabel, post=False, progress=events.append),
+                gdp.adig(self.figlabel, post=False, progress=events.append),
+                gdp.aexport(self.figlabel),
+                gdp.amulti_export(self.figlabel, 'no/figlabel',
+                                  progress=events.append))
+
+        dig1, dig2, output, multi = asyncio.run(main())
+        self.assertEqual(dig1[0], dig2[0])
+        self.assertEqual(dig1[1], dig2[1])
+        self.assertIsNot(dig1[1], dig2[1])
+        self.assertEqual(output['status'], 200)
+        self.assertEqual(multi[0]['accfiglabel'], output['accfiglabel'])
+        self.assertEqual(multi[1]['status'], 404)
+        names = [e['event'] for e in events]
+        self.assertEqual(names.count('progress'), 2)
+        self.assertEqual(names.count('done'), 4)
+
     def test_processor_visplt(self):
         gdp = get_processor(self.tmp, name='TDP', parallel='off')
         accfiglabel = gdp.visplt(self.figlabel, show=False)
@@ -87,3 +184,22 @@ class TestSerialProcessor(unittest.TestCase):
         accfiglabel = gdp.visplt(self.figlabel, show=False, callback=get_X)
         self.assertEqual(X1[0][0], X2[0][0])
         self.assertListEqual(X1[0][1], X2[0][1])
+
+    def test_processor_lazy_dig(self):
+        from ..digmanifest import get_digmanifest
+        gdpcls = get_processor(name='TDP', parallel='off')
+        gdpcls.lazy_dig = True
+        try:
+            gdp = gdpcls(self.tmp)
+            self.assertTrue(self.figlabel in gdp.availablelabels)
+            key = gdp.digmanifest.key(gdp.name, gdp.pckloader)
+            self.assertTrue(self.figlabel in get_digmanifest().load(key))
+            # from manifest, lazy
+            gdp = gdpcls(self.tmp)
+            self.assertEqual(gdp._diggers, [])
+            accfiglabel, results, template = gdp.dig(self.figlabel)
+            self.assertTrue(accfiglabel in gdp.diggedlabels)
+            self.assertEqual(len(gdp._diggers), 1)
+            self.assertEqual(len(gdp.diggers), len(gdp.availablelabels))
+        finally:
+            gdpcls.lazy_dig = False
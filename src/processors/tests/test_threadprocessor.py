@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import os
+import unittest
+import tempfile
+import shutil
+
+from .. import get_processor
+from ..lib import *
+
+register_Processor('TDP', '.tests', 'T')
+
+
+class TestThreadProcessor(unittest.TestCase):
+    '''
+    Test Multithread Processor class.
+    '''
+
+    def setUp(self):
+        self.tmp = tempfile.mktemp(suffix='-test')
+        os.mkdir(self.tmp)
+        with open(os.path.join(self.tmp, 'test.out'), mode='w') as f:
+            f.write('10\n20\n30\n40')
+        self.figlabel = 'test/mnpq'
+
+    def tearDown(self):
+        if os.path.isdir(self.tmp):
+            shutil.rmtree(self.tmp)
+
+    def test_processor_thread_name(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='thread')
+        self.assertEqual(gdp.name, 'TDP')
+        self.assertEqual(gdp.pckloader.get('processor'), 'TDP')
+        self.assertIsInstance(gdp.ressaver.get_store(), dict)
+
+    def test_processor_thread_multi_dig(self):
+        gdpcls = get_processor(name='TDP', parallel='thread')
+        gdpcls.dig_acceptable_time = 0
+        gdp = gdpcls(self.tmp)
+        X = []
+
+        def get_X(accfiglabel, res):
+            X.append(res['x'])
+
+        out = gdp.multi_dig(self.figlabel, {'figlabel': self.figlabel},
+                            callback=get_X, timings=True)
+        accfiglabel, results, template, timing = out[0]
+        self.assertTrue(accfiglabel in gdp.diggedlabels)
+        self.assertTrue(accfiglabel in gdp.resfileloader.datagroups)
+        self.assertEqual(len(X), 2)
+        self.assertIsNotNone(timing['actual'])
+
+    def test_processor_thread_multi_export(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='thread')
+        out = gdp.multi_export(self.figlabel, 'test/notexist')
+        self.assertEqual(out[0]['status'], 200)
+        self.assertEqual(out[1]['status'], 404)
+
+    def test_processor_thread_multi_visplt(self):
+        gdp = get_processor(self.tmp, name='TDP', parallel='thread')
+        success, fail = gdp.multi_visplt(self.figlabel, savepath=self.tmp)
+        self.assertEqual(len(success), 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp, success[0][1])))
+        self.assertTrue(success[0][0] not in gdp.visplter.figures)
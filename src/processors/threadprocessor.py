@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains multithread processor class.
+'''
+
+import os
+import threading
+import concurrent.futures
+
+from .processor import Processor, plog, _save_lock
+from .multiprocessor import MultiProcessor
+from ..loaders import get_pckloader
+from ..utils import inherit_docstring
+
+
+__all__ = ['ThreadProcessor']
+
+
+def _copydoc_func(docs):
+    name, doc = docs[0]
+    assert name == 'Processor'
+    return (doc[doc.find('Attributes'):],), {}
+
+
+class _TaskCount(object):
+    '''Number of completed tasks, like multiprocessing Value.'''
+    __slots__ = ['value']
+
+    def __init__(self):
+        self.value = 0
+
+
+@inherit_docstring((Processor,), _copydoc_func, template=None)
+class ThreadProcessor(MultiProcessor):
+    '''
+    Multithread Processor class.
+
+    {0}3. :attr:`multithread` is the max number of worker threads,
+       default min(32, os.cpu_count() + 4).
+    4. Worker threads share :attr:`pckloader` and the results cache,
+       so nothing is pickled and no Manager process is needed.
+       Most heavy work in diggers, like numpy FFTs, reductions, zlib
+       and h5py reads, releases the GIL.
+    5. Only raw data in a directory or zip archive is converted with
+       threads, because other rawloaders are not thread-safe.
+    '''
+
+    parallel = 'thread'
+    multithread = min(32, (os.cpu_count() or 1) + 4)
+
+    @property
+    def name(self):
+        return type(self).__name__[6:]
+
+    # # Start Convert Part
+
+    def convert(self, add_desc=None):
+        '''
+        Use threads to convert raw data.
+        '''
+        if (self.multithread > 1 and self.rawloader
+                and self.rawloader.loader_type in ('directory', '.zip')):
+            self._pre_convert(add_desc=add_desc)
+            nworkers = min(self.multithread, len(self.converters))
+            plog.debug('%d threads to work!' % nworkers)
+            lock, count = threading.Lock(), _TaskCount()
+            total = len(self.converters)
+            with concurrent.futures.ThreadPoolExecutor(nworkers) as executor:
+                futures = {executor.submit(core.convert): core
+                           for core in self.converters}
+                # write in this thread
+                with self.pcksaver:
+                    for fut in concurrent.futures.as_completed(futures):
+                        core = futures[fut]
+                        plog.info("Writing data in group %s ..." % core.group)
+                        self.pcksaver.write(core.group, fut.result())
+                        self._count_task_done(lock, count, total, 'Convert')
+            self._post_convert()
+        else:
+            plog.warning("Use for loop to convert data!")
+            Processor.convert(self, add_desc=add_desc)
+
+    multi_convert = convert
+
+    # # End Convert Part
+
+    # # Start Dig Part
+
+    def set_prefer_ressaver(self, ext2='digged', oldext2='converted',
+                            overwrite=False):
+        # plain dict store, shared by threads
+        Processor.set_prefer_ressaver(
+            self, ext2=ext2, oldext2=oldext2, overwrite=overwrite)
+
+    def _dig_worker_in_thread(self, digcore, kwargs, gotfiglabel, callback,
+                              post, lock, count, total):
+        '''
+        Dig new results, and save them with *lock*.
+        '''
+        accfiglabel, results, digtime = self._do_new_dig(digcore, kwargs)
+        size = self._digcore_size(digcore)
+        with lock, _save_lock:
+            self._cachesave_new_dig(accfiglabel, gotfiglabel, results)
+            if self.resfilesaver and digtime > self.dig_acceptable_time:
+                # long execution time
+                self._filesave_new_dig(
+                    accfiglabel, gotfiglabel, results, digcore)
+        self._count_task_done(lock, count, total, 'Dig')
+        if callable(callback):
+            callback(accfiglabel, results)
+        if post:
+            results = self._post_dig(digcore, accfiglabel, results)
+        return (accfiglabel, results, digcore.post_template, digtime, size)
+
+    def multi_dig(self, *couple_figlabels, whichlock=None,
+                  redig=False, callback=None, post=True, timings=False):
+        '''
+        Get digged results of *couple_figlabels*.
+        Multithread version of :meth:`dig`.
+        Return a list of :meth:`dig` return.
+
+        Parameters
+        ----------
+        couple_figlabels: list of couple_figlabel
+            couple_figlabel can be figlabel str or dict, like
+            {'figlabel': 'group/fignum', 'other kwargs': True}
+        whichlock: ignored, results are saved with a thread lock
+        timings: see :meth:`MultiProcessor.multi_dig`
+        others: see :meth:`dig`
+
+        Notes
+        -----
+        Only new_dig figlabel and its *callback*, *post* run in threads,
+        so *callback* should be thread-safe.
+        '''
+        if len(couple_figlabels) == 0:
+            plog.warning("please pass at least one figlabel!")
+            return []
+        multi_timings = [dict(predicted=None, actual=None)
+                         for _ in couple_figlabels]
+        multi_results, couple_todo = self._split_couple_figlabels(
+            couple_figlabels, redig, callback, post)
+        if len(couple_todo) > 0:
+            nworkers = min(self.multithread, len(couple_todo))
+            order, predicted = self._schedule_dig(
+                [c[1] for c in couple_todo], nworkers)
+            for jdx, ptime in enumerate(predicted):
+                multi_timings[couple_todo[jdx][0]]['predicted'] = ptime
+            lock, count = threading.Lock(), _TaskCount()
+            total = len(couple_todo)
+            with concurrent.futures.ThreadPoolExecutor(nworkers) as executor:
+                futures = [(idx, core, executor.submit(
+                    self._dig_worker_in_thread,
+                    core, kws, gotfgl, callback, post, lock, count, total))
+                    for idx, core, kws, gotfgl in
+                    (couple_todo[jdx] for jdx in order)]
+            for idx, core, fut in futures:
+                data = fut.result()
+                assert multi_results[idx] == idx
+                multi_results[idx] = data[:3]
+                multi_timings[idx]['actual'] = data[3]
+                self._record_digtime(core, data[3], size=data[4])
+            self.digstats.save()
+            if self.resfilesaver:
+                self.resfileloader = get_pckloader(
+                    self.resfilesaver.get_store())
+        if timings:
+            return [(*res, tm) for res, tm in zip(multi_results, multi_timings)]
+        return multi_results
+
+    # # End Dig Part
+
+    # # Start Visplt Part
+
+    def multi_visplt(self, *couple_figlabels, revis=False,
+                     savename='figlabel', saveext='png', savepath='.',
+                     mpl_backend=None, whichlock=None, callback=None,
+                     timings=False):
+        '''
+        Get results of *couple_figlabels* and visualize(plot), save them.
+        Results are got by threads, but figures are plotted one by one
+        in the calling thread, because :attr:`visplter` is not thread-safe.
+        Saved figures are closed.
+
+        Returns
+        -------
+        two list:
+            1. [(accfiglabel, save file), ...]
+            2. [(accfiglabel, failed reason), ...]
+
+        Parameters
+        ----------
+        see :meth:`MultiProcessor.multi_visplt`, *mpl_backend* is ignored.
+        '''
+        if not self.visplter:
+            plog.error("%s: Need a visplter object!" % self.name)
+            return
+        multi_results = self.multi_export(
+            *couple_figlabels, what='axes', fmt='dict', callback=callback)
+        success, fail = [], []
+        if not os.path.isdir(savepath):
+            os.mkdir(savepath)
+        lock, count = threading.Lock(), _TaskCount()
+        total = len(multi_results)
+        for results in multi_results:
+            if results['status'] == 200:
+                ptime = self.digstats.predict(
+                    *self._visplt_stats_keys(results))
+            else:
+                ptime = 0.0
+            data = self._visplt_worker(
+                results, revis, savename, saveext, savepath,
+                None, lock, count, total, name_it=False)
+            if data[3] is not None:
+                for key in self._visplt_stats_keys(results):
+                    self.digstats.record(key, data[3])
+            item = data[1:3]
+            if timings:
+                item = (*item, dict(predicted=ptime, actual=data[3]))
+            if data[0]:
+                success.append(item)
+                self.visplter.close_figure(data[1])
+            else:
+                fail.append(item)
+        self.digstats.save()
+        return success, fail
+
+    # # End Visplt Part
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Contains handle of background warm-up digs.
+'''
+
+import time
+import atexit
+import threading
+
+from ..glogger import getGLogger
+
+__all__ = ['WarmUp']
+plog = getGLogger('P')
+
+
+class WarmUp(object):
+    '''
+    Handle of warm-up digs running in background threads.
+
+    Attributes
+    ----------
+    figlabels: list
+        figlabels to warm, in order
+    budget: float or None
+        max seconds, no new dig starts after it, None means no limit
+    done: list of figlabels digged or found in cache
+    failed: list of figlabels failed to dig
+    skipped: list of figlabels already saved or predicted over budget
+
+    Notes
+    -----
+    1. :meth:`cancel` only stops starting new digs, the running ones
+       are finished and saved.
+    2. Threads are daemons, but at exit they are cancelled and waited,
+       so no results file is left half written.
+    '''
+    __slots__ = ['figlabels', 'budget', 'done', 'failed', 'skipped',
+                 '_queue', '_start', '_event', '_lock', '_threads']
+
+    def __init__(self, figlabels, predicted=None, budget=None):
+        self.figlabels = list(figlabels)
+        self.budget = budget if budget and budget > 0 else None
+        self.done, self.failed, self.skipped = [], [], []
+        if predicted is None:
+            predicted = [None] * len(self.figlabels)
+        self._queue = list(zip(self.figlabels, predicted))
+        self._start = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _next(self):
+        '''Pop next figlabel to dig, or None if cancelled or over budget.'''
+        with self._lock:
+            while self._queue and not self._event.is_set():
+                figlabel, ptime = self._queue.pop(0)
+                if self.budget is None:
+                    return figlabel
+                remaining = self.budget - (time.time() - self._start)
+                if remaining <= 0:
+                    plog.info("Warm-up budget %.1fs used up." % self.budget)
+                    self.skipped.extend(f for f, p in self._queue)
+                    self.skipped.append(figlabel)
+                    self._queue.clear()
+                    return None
+                if ptime is not None and ptime > remaining:
+                    plog.debug("Skip warming %s, predicted %.1fs > %.1fs."
+                               % (figlabel, ptime, remaining))
+                    self.skipped.append(figlabel)
+                    continue
+                return figlabel
+            return None
+
+    def _loop(self, worker):
+        while True:
+            figlabel = self._next()
+            if figlabel is None:
+                break
+            try:
+                status = worker(figlabel)
+            except Exception:
+                plog.error("Failed to warm %s!" % figlabel, exc_info=1)
+                status = 'failed'
+            with self._lock:
+                getattr(self, status).append(figlabel)
+
+    def start(self, worker, workers=1):
+        '''
+        Start *workers* threads, calling *worker(figlabel)* which returns
+        'done', 'failed' or 'skipped'.
+        '''
+        self._start = time.time()
+        nworkers = max(1, min(workers, len(self._queue)))
+        self._threads = [threading.Thread(
+            target=self._loop, args=(worker,), daemon=True,
+            name='gdpy3-warm-%d' % i) for i in range(nworkers)]
+        atexit.register(self._atexit)
+        for t in self._threads:
+            t.start()
+        return self
+
+    def cancel(self):
+        '''Stop starting new digs.'''
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def wait(self, timeout=None):
+        '''
+        Wait for the threads to finish, at most *timeout* seconds.
+        Return True if they are finished.
+        '''
+        end = None if timeout is None else time.time() + timeout
+        for t in self._threads:
+            t.join(None if end is None else max(0, end - time.time()))
+        finished = not self.running
+        if finished:
+            atexit.unregister(self._atexit)
+        return finished
+
+    def _atexit(self):
+        self.cancel()
+        self.wait()
+
+    def __repr__(self):
+        return ('<%s: %d figlabels, %d done, %d failed, %d skipped%s>'
+                % (type(self).__name__, len(self.figlabels), len(self.done),
+                   len(self.failed), len(self.skipped),
+                   ', running' if self.running else ''))
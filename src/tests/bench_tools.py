@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+'''
+Benchmark vectorized tools against their old loop versions.
+Run it by ``python benchmarks-run.py bench_tools.py``.
+'''
+
+import time
+import unittest
+import numpy as np
+
+from .. import tools
+
+N = 20000
+
+
+def _old_max_subarray(A):
+    max_ending_here = max_so_far = A[0]
+    for x in A[1:]:
+        max_ending_here = max(x, max_ending_here + x)
+        max_so_far = max(max_so_far, max_ending_here)
+    return max_so_far
+
+
+def _old_longest_run(mask):
+    Xg = [1 if g else -mask.size**2 for g in mask]
+    _len = _old_max_subarray(Xg)
+    if _len < 0:
+        return 0, 0
+    for _start in range(mask.size):
+        if sum(Xg[_start:_start + _len]) == _len:
+            break
+    return _start, _len
+
+
+def _old_argrelextrema(X, m='both'):
+    from scipy.signal import argrelextrema
+    if m == 'max':
+        return argrelextrema(X, np.greater)[0]
+    elif m == 'min':
+        return argrelextrema(X, np.less)[0]
+    else:
+        g, l = argrelextrema(X, np.greater)[0], argrelextrema(X, np.less)[0]
+        return np.sort(np.append(g, l))
+
+
+def _old_high_envelope(Y, X, add_indexs, **kwargs):
+    from scipy.interpolate import interp1d
+    old_indexs = _old_argrelextrema(Y, m='max')
+    uadd = []
+    if 0 not in add_indexs:
+        add_indexs.insert(0, 0)
+    if len(Y)-1 not in add_indexs:
+        add_indexs.append(len(Y)-1)
+    for i in add_indexs:
+        if i not in old_indexs and 0 <= i <= len(Y)-1:
+            uadd.append(i)
+    new_indexs = np.concatenate((old_indexs, uadd))
+    new_indexs.sort(kind='mergesort')
+    Yinterp = interp1d(X[new_indexs], Y[new_indexs], kind='linear',
+                       bounds_error=False, fill_value=0.0)
+    return Yinterp(X)
+
+
+def _timeit(func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, time.time() - start
+
+
+class BenchTools(unittest.TestCase):
+    '''
+    Vectorized tools, same results as old loop versions.
+    '''
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = np.linspace(0, 50, N)
+        self.Y = np.sin(self.X) * np.exp(0.05*self.X) + 0.1*rng.random(N)
+
+    def _report(self, name, told, tnew):
+        print("\n%s, size %d: old %.4fs, new %.4fs, speedup %.1fx"
+              % (name, N, told, tnew, told / max(tnew, 1e-9)))
+
+    def test_bench_max_subarray(self):
+        A = list(np.diff(self.Y))
+        old, told = _timeit(_old_max_subarray, A)
+        new, tnew = _timeit(tools.max_subarray, A)
+        self._report('max_subarray', told, tnew)
+        self.assertAlmostEqual(old, new)
+
+    def test_bench_longest_run(self):
+        # findgrowth, findflat
+        mask = np.gradient(self.Y) > 0
+        mask[:N//2] = mask[:N//2] | (np.arange(N//2) % 97 != 0)
+        old, told = _timeit(_old_longest_run, mask)
+        new, tnew = _timeit(tools._longest_run, mask)
+        self._report('findgrowth run', told, tnew)
+        self.assertEqual(old, new)
+        self.assertEqual(tools._longest_run(np.zeros(10, bool)), (0, 0))
+
+    def test_bench_argrelextrema(self):
+        try:
+            import scipy.signal
+        except ImportError:
+            self.skipTest("requires scipy")
+        for m in ('max', 'min', 'both'):
+            old, told = _timeit(_old_argrelextrema, self.Y, m=m)
+            new, tnew = _timeit(tools.argrelextrema, self.Y, m=m)
+            self._report('argrelextrema %s' % m, told, tnew)
+            self.assertTrue(np.array_equal(old, new))
+
+    def test_bench_high_envelope(self):
+        try:
+            import scipy.interpolate
+        except ImportError:
+            self.skipTest("requires scipy")
+        add = list(range(0, N, 7))
+        old, told = _timeit(_old_high_envelope, self.Y, self.X, add.copy())
+        new, tnew = _timeit(tools.high_envelope, self.Y, X=self.X,
+                            add_indexs=add.copy())
+        self._report('high_envelope', told, tnew)
+        self.assertTrue(np.allclose(old, new))
+
+    def test_bench_curve_fit(self):
+        try:
+            import scipy.optimize
+        except ImportError:
+            self.skipTest("requires scipy")
+        Y = 2.0*np.exp(0.05*self.X) + 1.0
+
+        def func(x, a, b, c):
+            return a*np.exp(b*x) + c
+        popt, pcov, new = tools.curve_fit(func, self.X, Y, p0=[1, 0.1, 0])
+        old, told = _timeit(
+            lambda: np.array([func(i, *popt) for i in self.X]))
+        fit, tnew = _timeit(func, self.X, *popt)
+        self._report('curve_fit fitY', told, tnew)
+        self.assertTrue(np.allclose(old, new))
+
+    def test_bench_fft2(self):
+        signal = np.outer(np.sin(np.linspace(0, 9, 256)), self.Y[:4001])
+        old, told = _timeit(lambda: np.fft.fftshift(np.fft.fft2(signal)))
+        res, tnew = _timeit(tools.fft2, 0.1, 0.2, signal)
+        self._report('fft2 real input', told, tnew)
+        self.assertTrue(np.allclose(old, res[2]))
+        res = tools.fft2(0.1, 0.2, signal, fast_len=True)
+        self.assertEqual(res[2].shape, (res[1].size, res[0].size))
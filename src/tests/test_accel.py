@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2020 shmilee
+
+import unittest
+import numpy as np
+
+from .. import accel, tools
+
+
+class TestAccel(unittest.TestCase):
+    '''
+    Test kernels in module accel, NumPy version vs loop version
+    '''
+
+    def setUp(self):
+        self.rng = np.random.default_rng(1)
+        self.mode = accel._accel_mode
+
+    def tearDown(self):
+        accel.set_accel(self.mode)
+
+    def paths(self, kernel):
+        funcs = [kernel.numpy_func, kernel.loop_func]
+        if accel.numba is not None:
+            funcs.append(kernel.jitted)
+        return funcs
+
+    def test_accel_switch(self):
+        tools.set_accel('numpy')
+        self.assertEqual(tools.get_accel(), 'numpy')
+        self.assertRaises(ValueError, tools.set_accel, 'cuda')
+        if accel.numba is None:
+            self.assertRaises(ImportError, tools.set_accel, 'numba')
+        else:
+            tools.set_accel('numba')
+            self.assertEqual(tools.get_accel(), 'numba')
+
+    def test_accel_max_subarray(self):
+        for n in (1, 2, 100):
+            A = self.rng.normal(size=n)
+            res = [f(A) for f in self.paths(accel.max_subarray)]
+            for r in res[1:]:
+                self.assertAlmostEqual(r, res[0])
+        A = np.array([-2, 1, -3, 4, -1, 2, 1, -5, 4])
+        tools.set_accel('numpy')
+        self.assertEqual(tools.max_subarray(A), 6)
+
+    def test_accel_near_peak_bounds(self):
+        Y = self.rng.random(200)
+        for idx in (0, 50, 199):
+            for limit in (0.2, Y[idx], 2.0):
+                for greedy in (True, False):
+                    res = [f(Y, idx, limit, greedy)
+                           for f in self.paths(accel.near_peak_bounds)]
+                    for r in res[1:]:
+                        self.assertEqual(tuple(r), tuple(res[0]))
+
+    def test_accel_zero_crossings(self):
+        t = np.linspace(0, 20, 500)
+        R, Z = 1.0 + 0.1 * np.cos(t), np.sin(t)
+        res = [f(R, Z) for f in self.paths(accel.zero_crossings)]
+        self.assertEqual(res[0].size, 6)
+        for r in res[1:]:
+            self.assertTrue(np.array_equal(r, res[0]))
+
+    def test_accel_trackp_records(self):
+        nspecies, nparam = 2, 8
+        tokens = []
+        for istep, counts in ((2, (1, 2)), (4, (0, 0)), (6, (3, 0))):
+            tokens.extend((istep,) + counts)
+            tokens.extend(self.rng.random(sum(counts) * nparam))
+        tokens = np.array(tokens)
+        res = [f(tokens, nspecies, nparam)
+               for f in self.paths(accel.trackp_records)]
+        self.assertEqual(res[0][1].shape, (6, 1 + nparam))
+        self.assertTrue(np.array_equal(res[0][0], [0, 1, 1, 0, 0, 0]))
+        self.assertTrue(np.array_equal(res[0][1][:, 0], [2, 2, 2, 6, 6, 6]))
+        for species, records in res[1:]:
+            self.assertTrue(np.array_equal(species, res[0][0]))
+            self.assertTrue(np.array_equal(records, res[0][1]))
@@ -9,8 +9,10 @@ Some tools for Core.
 import numpy as np
 
 from .glogger import getGLogger
+from . import accel
+from .accel import set_accel, get_accel
 
-__all__ = ['max_subarray', 'line_fit', 'curve_fit',
+__all__ = ['set_accel', 'get_accel', 'max_subarray', 'line_fit', 'curve_fit',
            'argrelextrema', 'intersection_4points',
            'near_peak', 'high_envelope',
            'fft', 'fft2', 'savgolay_filter',
@@ -22,13 +24,9 @@ log = getGLogger('C')
 
 def max_subarray(A):
     '''
-    Maximum subarray problem
+    Maximum subarray problem, max(prefix sum - min of prior prefix sums)
     '''
-    max_ending_here = max_so_far = A[0]
-    for x in A[1:]:
-        max_ending_here = max(x, max_ending_here + x)
-        max_so_far = max(max_so_far, max_ending_here)
-    return max_so_far
+    return accel.max_subarray(np.asarray(A))
 
 
 def line_fit(X, Y, deg, fitX=None, info=None, **kwargs):
@@ -123,36 +121,36 @@ def curve_fit(f, X, Y, fitX=None, f_constant=None, info=None, **kwargs):
         return (None,)*3
     popt, pcov = curve_fit(func, X, Y, **kwargs)
     log.debug("Fitting %s result: popt=%s, pcov=%s" % (info, popt, pcov))
-    newX = X if fitX is None else fitX
-    fitY = np.array([func(i, *popt) for i in newX])
+    newX = np.asarray(X if fitX is None else fitX)
+    # func is vectorized, as scipy.optimize.curve_fit needs
+    fitY = np.asarray(func(newX, *popt))
+    if fitY.shape != newX.shape:
+        fitY = np.array([func(i, *popt) for i in newX])
     return popt, pcov, fitY
 
 
 def argrelextrema(X, m='both'):
     '''
-    Call `scipy.signal.argrelextrema`, get indexes of relative extrema.
+    Get indexes of relative extrema along the first axis,
+    like `scipy.signal.argrelextrema` with order=1.
 
     Parameters
     ----------
     m: str
         'max', 'min' or 'both', default 'both'
     '''
-    try:
-        from scipy.signal import argrelextrema
-    except ImportError:
-        log.error("'%s' needs package 'scipy'!'" % 'argrelextrema',
-                  exc_info=1)
-        return None
     if not isinstance(X, np.ndarray):
         X = np.array(X)
+    if X.shape[0] < 3:
+        return np.array([], dtype=np.intp)
+    mid, prev, nxt = X[1:-1], X[:-2], X[2:]
     if m == 'max':
-        index = argrelextrema(X, np.greater)[0]
+        mask = (mid > prev) & (mid > nxt)
     elif m == 'min':
-        index = argrelextrema(X, np.less)[0]
+        mask = (mid < prev) & (mid < nxt)
     else:
-        g, l = argrelextrema(X, np.greater)[0], argrelextrema(X, np.less)[0]
-        index = np.sort(np.append(g, l))
-    return index
+        mask = ((mid > prev) & (mid > nxt)) | ((mid < prev) & (mid < nxt))
+    return np.sort(np.nonzero(mask)[0] + 1)
 
 
 def intersection_4points(P1x, P1y, P2x, P2y, P3x, P3y, P4x, P4y):
@@ -167,7 +165,7 @@ def intersection_4points(P1x, P1y, P2x, P2y, P3x, P3y, P4x, P4y):
 
 
 def near_peak(Y, X=None, intersection=False, lowerlimit=1.0/np.e,
-              select='all', greedy=False):
+              select='all', greedy=False, axis=None):
     '''
     Find 1D Y values >= lowerlimit * peak value, near the peak.
     Return new sub array X and Y, if no X given, use index.
@@ -181,7 +179,15 @@ def near_peak(Y, X=None, intersection=False, lowerlimit=1.0/np.e,
     greedy: bool
         If select not 'all' and greedy is True,
         search from edge where Y values >= lowerlimit * peak value.
+    axis: int
+        If axis is given, find the max peak of all 1D Y along *axis* at
+        once, *select* is ignored. X is 1D coordinate along *axis*.
+        Return two masked arrays, new X and Y, values out of the peak
+        are masked. If *intersection* is True, they have two more points
+        along *axis* than Y, for intersections before and after Y.
     '''
+    if axis is not None:
+        return _near_peak_axis(Y, X, intersection, lowerlimit, greedy, axis)
     if select == 'all':
         indexs = argrelextrema(Y, m='max')
         greedy = False
@@ -190,30 +196,8 @@ def near_peak(Y, X=None, intersection=False, lowerlimit=1.0/np.e,
     res = []
     for idx in indexs:
         limit = lowerlimit*Y[idx]
-        if select != 'all' and greedy:
-            left_idx = 0
-            for i in range(idx):
-                if Y[i] >= limit:
-                    left_idx = i
-                    break
-            right_idx = len(Y)-1
-            for i in range(len(Y)-1, idx, -1):
-                if Y[i] >= limit:
-                    right_idx = i
-                    break
-        else:
-            left_idx = idx
-            for i in range(idx, -1, -1):
-                if Y[i] >= limit:
-                    left_idx = i
-                else:
-                    break
-            right_idx = idx
-            for i in range(idx, len(Y), 1):
-                if Y[i] >= limit:
-                    right_idx = i
-                else:
-                    break
+        left_idx, right_idx = accel.near_peak_bounds(
+            Y, int(idx), limit, bool(select != 'all' and greedy))
         newY = Y[left_idx:right_idx+1]
         if X is None:
             newX = np.array(range(left_idx, right_idx+1))
@@ -238,6 +222,61 @@ def near_peak(Y, X=None, intersection=False, lowerlimit=1.0/np.e,
         return res[0]
 
 
+def _near_peak_axis(Y, X, intersection, lowerlimit, greedy, axis):
+    '''Vectorized :func:`near_peak` along *axis*, max peak only.'''
+    Y = np.moveaxis(np.asarray(Y), axis, 0)
+    shape = Y.shape
+    n = shape[0]
+    Y = Y.reshape(n, -1)
+    X = np.arange(n) if X is None else np.asarray(X)
+    X = np.broadcast_to(X.reshape(n, 1), Y.shape)
+    cols = np.arange(Y.shape[1])
+    rows = np.arange(n).reshape(n, 1)
+    idx = np.argmax(Y, axis=0)
+    limit = lowerlimit*Y[idx, cols]
+    above = Y >= limit
+    if greedy:
+        # first above in [0, idx), else 0
+        left = np.argmax(above & (rows < idx), axis=0)
+        # last above in (idx, n), else n-1
+        right = n - 1 - np.argmax((above & (rows > idx))[::-1], axis=0)
+    else:
+        # last below in [0, idx), else -1
+        below = ~above & (rows < idx)
+        left = np.where(below.any(axis=0),
+                        n - 1 - np.argmax(below[::-1], axis=0), -1) + 1
+        # first below in (idx, n), else n
+        below = ~above & (rows > idx)
+        right = np.where(below.any(axis=0), np.argmax(below, axis=0), n) - 1
+        # peak itself is below limit
+        left = np.where(above[idx, cols], left, idx)
+        right = np.where(above[idx, cols], right, idx)
+    if intersection:
+        newX = np.empty((n + 2, Y.shape[1]), dtype=np.result_type(X, float))
+        newY = np.empty((n + 2, Y.shape[1]), dtype=np.result_type(Y, float))
+        newX[1:-1], newY[1:-1] = X, Y
+        newX[[0, -1]], newY[[0, -1]] = X[[0, -1]], Y[[0, -1]]
+        # put intersections in the slots next to the peak region
+        addleft = (Y[left, cols] > limit) & (left > 0)
+        addright = (Y[right, cols] > limit) & (right < n - 1)
+        for add, i0, i1, slot in ((addleft, left - 1, left, left),
+                                  (addright, right, right + 1, right + 2)):
+            c, i0, i1 = cols[add], i0[add], i1[add]
+            x0, x1, y0, y1 = X[i0, c], X[i1, c], Y[i0, c], Y[i1, c]
+            newX[slot[add], c] = x0 + (limit[c] - y0)*(x1 - x0)/(y1 - y0)
+            newY[slot[add], c] = limit[c]
+        start, stop = left + 1 - addleft, right + 1 + addright
+        rows = np.arange(n + 2).reshape(n + 2, 1)
+    else:
+        newX, newY = X.copy(), Y.copy()
+        start, stop = left, right
+    mask = (rows < start) | (rows > stop)
+    newshape = (newX.shape[0],) + shape[1:]
+    newX = np.ma.array(newX, mask=mask).reshape(newshape)
+    newY = np.ma.array(newY, mask=mask).reshape(newshape)
+    return np.moveaxis(newX, 0, axis), np.moveaxis(newY, 0, axis)
+
+
 def high_envelope(Y, X=None, add_indexs=[], **kwargs):
     '''
     Call `scipy.interpolate.interp1d`, return high envelope of Y.
@@ -256,16 +295,9 @@ def high_envelope(Y, X=None, add_indexs=[], **kwargs):
                   exc_info=1)
         return None
     old_indexs = argrelextrema(Y, m='max')
-    uadd = []
-    if 0 not in add_indexs:
-        add_indexs.insert(0, 0)
-    if len(Y)-1 not in add_indexs:
-        add_indexs.append(len(Y)-1)
-    for i in add_indexs:
-        if i not in old_indexs and 0 <= i <= len(Y)-1:
-            uadd.append(i)
-    new_indexs = np.concatenate((old_indexs, uadd))
-    new_indexs.sort(kind='mergesort')
+    uadd = np.append(np.asarray(add_indexs, dtype=np.intp), [0, len(Y)-1])
+    uadd = uadd[(0 <= uadd) & (uadd <= len(Y)-1)]
+    new_indexs = np.union1d(old_indexs, uadd)
     # print(new_indexs,type(new_indexs[0]))
     if X is None:
         X = np.array(range(len(Y)))
@@ -279,18 +311,68 @@ def high_envelope(Y, X=None, add_indexs=[], **kwargs):
     return Yinterp(X)
 
 
-def fft(dt, signal):
+try:
+    import scipy.fft as _scipy_fft
+except ImportError:
+    _scipy_fft = None
+    log.debug("Use numpy.fft, because package 'scipy' is not found.")
+
+
+def _fft_freq(size, d):
+    '''Shifted angular frequency of *size* samples with spacing *d*.'''
+    if size % 2 == 0:
+        f = np.linspace(-0.5, 0.5, size, endpoint=False)
+    else:
+        f = np.linspace(-0.5, 0.5, size, endpoint=True)
+    return 2 * np.pi / d * f
+
+
+def _fft_full(signal, axes, workers, fast_len):
     '''
-    FFT in one dimension, return tf, af, pf
+    Full complex FFT of *signal* over *axes*, not shifted.
+    Use `scipy.fft` if available, and real FFT for real input,
+    then mirror the spectrum by conjugate symmetry.
+    Zero padded to `next_fast_len` if *fast_len* is True.
     '''
-    if isinstance(dt, float) and isinstance(signal, np.ndarray):
-        size = signal.size
-        if size % 2 == 0:
-            tf = np.linspace(-0.5, 0.5, size, endpoint=False)
+    axes = [a % signal.ndim for a in axes]
+    shape = [signal.shape[a] for a in axes]
+    if fast_len:
+        if _scipy_fft:
+            shape = [_scipy_fft.next_fast_len(n, real=True) for n in shape]
         else:
-            tf = np.linspace(-0.5, 0.5, size, endpoint=True)
-        tf = 2 * np.pi / dt * tf
-        af = np.fft.fftshift(np.fft.fft(signal))
+            # power of 2
+            shape = [1 << (n - 1).bit_length() for n in shape]
+    if _scipy_fft is None:
+        return np.fft.fftn(signal, s=shape, axes=axes)
+    if np.iscomplexobj(signal):
+        return _scipy_fft.fftn(signal, s=shape, axes=axes, workers=workers)
+    half = _scipy_fft.rfftn(signal, s=shape, axes=axes, workers=workers)
+    # X[-k] = conj(X[k]), k -> -k in all axes but the last one
+    neg = half
+    for a in axes[:-1]:
+        neg = np.roll(np.flip(neg, axis=a), 1, axis=a)
+    last, n = axes[-1], shape[-1]
+    tail = np.flip(np.take(neg, range(1, (n + 1) // 2), axis=last), axis=last)
+    return np.concatenate((half, np.conj(tail)), axis=last)
+
+
+def fft(dt, signal, axis=-1, workers=-1, fast_len=False):
+    '''
+    FFT in one dimension, return tf, af, pf.
+    If *signal* is N-D, FFT along *axis*.
+
+    Parameters
+    ----------
+    workers: int
+        number of threads used by `scipy.fft`, -1 means all CPUs.
+        Ignored when `scipy` is not available.
+    fast_len: bool
+        zero pad signal to a fast FFT length, then tf is longer.
+    '''
+    if isinstance(dt, float) and isinstance(signal, np.ndarray):
+        af = _fft_full(signal, (axis,), workers, fast_len)
+        tf = _fft_freq(af.shape[axis], dt)
+        af = np.fft.fftshift(af, axes=axis)
         # pf = np.sqrt(np.power(af.real, 2) + np.power(af.imag, 2))
         pf = abs(af)
         return tf, af, pf
@@ -299,26 +381,20 @@ def fft(dt, signal):
         return None, None, None
 
 
-def fft2(dt, dx, signal):
+def fft2(dt, dx, signal, workers=-1, fast_len=False):
     '''
     FFT in two dimension, return tf, xf, af, pf
     signal.shape == (X.size, T.size)
+    *workers*, *fast_len*: see :func:`fft`
     '''
     if (isinstance(dt, float) and isinstance(dx, float)
             and isinstance(signal, np.ndarray)
             and len(signal.shape) == 2):
-        xsize, tsize = signal.shape
-        if xsize % 2 == 0:
-            xf = np.linspace(-0.5, 0.5, xsize, endpoint=False)
-        else:
-            xf = np.linspace(-0.5, 0.5, xsize, endpoint=True)
-        if tsize % 2 == 0:
-            tf = np.linspace(-0.5, 0.5, tsize, endpoint=False)
-        else:
-            tf = np.linspace(-0.5, 0.5, tsize, endpoint=True)
-        xf = 2 * np.pi / dx * xf
-        tf = 2 * np.pi / dt * tf
-        af = np.fft.fftshift(np.fft.fft2(signal))
+        af = _fft_full(signal, (0, 1), workers, fast_len)
+        xsize, tsize = af.shape
+        xf = _fft_freq(xsize, dx)
+        tf = _fft_freq(tsize, dt)
+        af = np.fft.fftshift(af)
         pf = abs(af)
         return tf, xf, af, pf
     else:
@@ -340,6 +416,7 @@ def savgolay_filter(x, window_size=None, polyorder=None, info=None, **kwargs):
     info: str
         info of data x
     kwargs: passed to `scipy.signal.savgol_filter`
+        like *axis*, then window length is limited by len(x) along axis
     '''
     try:
         from scipy.signal import savgol_filter
@@ -348,7 +425,7 @@ def savgolay_filter(x, window_size=None, polyorder=None, info=None, **kwargs):
                   exc_info=1)
         return None
     if not window_size:
-        window_size = min(51, len(x))
+        window_size = min(51, np.shape(x)[kwargs.get('axis', -1)])
         if window_size % 2 == 0:
             window_size = window_size - 1
     if not polyorder:
@@ -358,19 +435,23 @@ def savgolay_filter(x, window_size=None, polyorder=None, info=None, **kwargs):
     return savgol_filter(x, window_size, polyorder, **kwargs)
 
 
+def _longest_run(mask):
+    '''Return start, len of the first longest run of True in 1D *mask*.'''
+    edges = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8),
+                                    [0])))
+    starts, stops = np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]
+    if starts.size == 0:
+        return 0, 0
+    i = np.argmax(stops - starts)
+    return int(starts[i]), int(stops[i] - starts[i])
+
+
 def findflat(X, upperlimit, info=None):
     '''
     Return flat region: start, len. *upperlimit* limits abs(gradient(X))
     '''
     Xg = np.abs(np.gradient(savgolay_filter(X, info=info)))
-    Xg = [1 if g < upperlimit else -X.size**2 for g in Xg]
-    _len = max_subarray(Xg)
-    if _len < 0:
-        return 0, 0
-    for _start in range(X.size):
-        if sum(Xg[_start:_start + _len]) == _len:
-            break
-    return _start, _len
+    return _longest_run(Xg < upperlimit)
 
 
 def findgrowth(X, lowerlimit, info=None):
@@ -378,19 +459,12 @@ def findgrowth(X, lowerlimit, info=None):
     Return growth region: start, len. *lowerlimit* limits gradient(X)
     '''
     Xg = np.gradient(savgolay_filter(X, info=info))
-    Xg = [1 if g > lowerlimit else -X.size**2 for g in Xg]
-    _len = max_subarray(Xg)
-    if _len < 0:
-        return 0, 0
-    for _start in range(X.size):
-        if sum(Xg[_start:_start + _len]) == _len:
-            break
-    return _start, _len
+    return _longest_run(Xg > lowerlimit)
 
 
 def correlation(data, r0, r1, c0, c1, dr, dc,
                 ruler_r=None, ruler_r_use='little',
-                ruler_c=None, ruler_c_use='little'):
+                ruler_c=None, ruler_c_use='little', method='fft'):
     '''
     Calculate correlation length or autocorrelation time
     xiao2010, POP, 17, 022302
@@ -403,6 +477,11 @@ def correlation(data, r0, r1, c0, c1, dr, dc,
     ruler_r, ruler_c: index [0,dr] [0,dc] -> value [vdr0, vdr1] [vdc0, vdc1]
         (ruler_r.size, ruler_c.size) == data.shape
     ruler_r_use, ruler_c_use: use ruler little or big endian
+    method: str, 'fft' or 'direct'
+        'fft', use zero-padded FFT (Wiener-Khinchin theorem) to get the
+        products of all lags, and 2d cumulative sums of squares to get
+        the normalizations, O(N*log(N)).
+        'direct', sum products lag by lag, O(dr*dc*N).
 
     Returns
     -------
@@ -410,8 +489,35 @@ def correlation(data, r0, r1, c0, c1, dr, dc,
     vdr: delta row array
     vdc: delta column array
     '''
+    if method == 'fft':
+        tau = _correlation_fft(data[r0:r1, c0:c1], dr, dc)
+    elif method == 'direct':
+        tau = _correlation_direct(data, r0, r1, c0, c1, dr, dc)
+    else:
+        raise ValueError("Invalid method: %s!" % method)
+    if ruler_r is None:
+        vdr = None
+    else:
+        idx = np.arange(dr)
+        if ruler_r_use == 'little':
+            vdr = ruler_r[r0+idx] - ruler_r[r0]
+        else:
+            vdr = ruler_r[r1] - ruler_r[r1-idx]
+    if ruler_c is None:
+        vdc = None
+    else:
+        idx = np.arange(dc)
+        if ruler_c_use == 'little':
+            vdc = ruler_c[c0+idx] - ruler_c[c0]
+        else:
+            vdc = ruler_c[c1] - ruler_c[c1-idx]
+    return tau, vdr, vdc
+
+
+def _correlation_direct(data, r0, r1, c0, c1, dr, dc):
+    '''Sum products of data lag by lag.'''
     tau = np.zeros((dr, dc))
-    logstep = round(dr/10)
+    logstep = max(1, round(dr/10))
     for i in range(dr):
         for j in range(dc):
             #tmptau, tmpinten0, tmpinten1 = 0, 0, 0
@@ -430,24 +536,24 @@ def correlation(data, r0, r1, c0, c1, dr, dc,
             tau[i, j] = tmptau/np.sqrt(tmpinten0*tmpinten1)
         if (i+1) % logstep == 0 or i == 0 or i+1 == dr:
             log.info('correlation row %d/%d' % (i+1, dr))
-            # print('row %d: %s' % (i, tau[i, :]))
-            # print(tau[i,:])
-    if ruler_r is None:
-        vdr = None
-    else:
-        vdr = np.zeros(dr)
-        for i in range(dr):
-            if ruler_r_use == 'little':
-                vdr[i] = ruler_r[r0+i] - ruler_r[r0]
-            else:
-                vdr[i] = ruler_r[r1] - ruler_r[r1-i]
-    if ruler_c is None:
-        vdc = None
-    else:
-        vdc = np.zeros(dc)
-        for j in range(dc):
-            if ruler_c_use == 'little':
-                vdc[j] = ruler_c[c0+j] - ruler_c[c0]
-            else:
-                vdc[j] = ruler_c[c1] - ruler_c[c1-j]
-    return tau, vdr, vdc
+    return tau
+
+
+def _correlation_fft(sub, dr, dc):
+    '''
+    Products of all lags from the autocorrelation of zero-padded *sub*,
+    normalizations from 2d cumulative sums of sub**2.
+    '''
+    sub = np.asarray(sub, dtype=float)
+    R, C = sub.shape
+    # pad to avoid circular wrap of lags [0, dr), [0, dc)
+    shape = (R + dr, C + dc)
+    F = np.fft.rfft2(sub, s=shape)
+    tmptau = np.fft.irfft2(F.real**2 + F.imag**2, s=shape)[:dr, :dc]
+    # S[a, b] = sum(sub[:a, :b]**2)
+    S = np.zeros((R + 1, C + 1))
+    S[1:, 1:] = np.cumsum(np.cumsum(sub**2, axis=0), axis=1)
+    i, j = np.arange(dr)[:, None], np.arange(dc)[None, :]
+    tmpinten0 = S[R-i, C-j]
+    tmpinten1 = S[R, C] - S[i, C] - S[R, j] + S[i, j]
+    return tmptau/np.sqrt(tmpinten0*tmpinten1)